@@ -0,0 +1,321 @@
+"""Offline throughput benchmark for screenshot_enricher using a deterministic fake model."""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import screenshot_enricher as enricher
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+OCR_POOL_SIZE = 512
+WORDS = (
+    "terminal build error commit branch dashboard revenue chart slack message inbox "
+    "invoice meeting calendar figma layout player quest inventory level score settings "
+    "browser tab python import function class deploy docker kubernetes pod latency"
+).split()
+
+
+class BenchmarkBudgetReached(Exception):
+    """Raised by the fake model once its call budget is spent to end a run early."""
+
+
+@dataclass
+class FakeModel:
+    """Stand-in for `call_llama` with configurable latency and failure modes.
+
+    Responses are rendered as text and parsed through `parse_llama_output`, so JSON
+    extraction cost is measured exactly as in production. All randomness is seeded.
+    """
+
+    latency: float = 0.0
+    malformed_rate: float = 0.0
+    short_list_rate: float = 0.0
+    low_confidence_rate: float = 0.0
+    seed: int = 0
+    max_calls: int | None = None
+    calls: int = 0
+    parse_seconds: float = 0.0
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def __call__(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        log_dir: Path | None,
+        log_id: str,
+        expect_list: bool = True,
+    ) -> Any:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            raise BenchmarkBudgetReached
+        self.calls += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        stdout_text = self.render(prompt)
+        started = time.perf_counter()
+        parsed = enricher.parse_llama_output(stdout_text, log_dir=None, expect_list=expect_list)
+        self.parse_seconds += time.perf_counter() - started
+        return parsed
+
+    def render(self, prompt: str) -> str:
+        filenames = _prompt_filenames(prompt)
+        results = []
+        for name in filenames:
+            low = self._rng.random() < self.low_confidence_rate
+            results.append(
+                {
+                    "filename": name,
+                    "tags_ai": self._rng.sample(WORDS, 3),
+                    "summary": f"Synthetic summary for {name}",
+                    "confidence": 0.3 if low else 0.9,
+                    "ask_user": False,
+                }
+            )
+        if results and self._rng.random() < self.short_list_rate:
+            results = results[:-1]
+        body = json.dumps(results, indent=2)
+        if self._rng.random() < self.malformed_rate:
+            # Prose around a truncated array exercises the slow fallback in _extract_json_block.
+            return "Sure! Here are the tags:\n" + body[: max(len(body) // 2, 1)]
+        return body
+
+
+def _prompt_filenames(prompt: str) -> list[str]:
+    start = prompt.rfind("\n[\n")
+    if start == -1:
+        return []
+    try:
+        items = json.loads(prompt[start + 1 :])
+    except json.JSONDecodeError:
+        return []
+    return [item.get("filename", "") for item in items if isinstance(item, dict)]
+
+
+def generate_synthetic_metadata(count: int, *, seed: int = 0) -> list[dict[str, Any]]:
+    """Build `count` screenshot records shaped like generate_screenshots_metadata output.
+
+    Capture times arrive in bursts so group_by_time produces realistic group sizes,
+    and OCR text length varies from empty to a few thousand characters.
+    """
+    rng = random.Random(seed)
+    ocr_pool = []
+    for _ in range(OCR_POOL_SIZE):
+        line_count = rng.choice((0, 2, 10, 40))
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(3, 12))) for _ in range(line_count)]
+        ocr_pool.append("\n".join(lines))
+    moment = datetime(2024, 1, 1, tzinfo=UTC)
+    records: list[dict[str, Any]] = []
+    for index in range(count):
+        gap = rng.choice((2, 5, 10, 20)) if rng.random() < 0.8 else rng.randint(60, 7200)
+        moment += timedelta(seconds=gap)
+        records.append(
+            {
+                "id": f"sha1_{index:08x}",
+                "filename": f"Screenshot {index:06d}.png",
+                "path": f"/tmp/screenshots/Screenshot {index:06d}.png",
+                "created_at": enricher.isoformat_utc(moment),
+                "year": moment.year,
+                "year_month": f"{moment.year}-{moment.month:02d}",
+                "tags": [],
+                "notes": "",
+                "ocr_text": rng.choice(ocr_pool),
+                "processed": 0,
+            }
+        )
+    return records
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _time_extract(text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        enricher._extract_json_block(text)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def bench_extract_json_block(items: int = 25, repeat: int = 20) -> dict[str, float]:
+    """Microsecond timings of _extract_json_block on clean, wrapped and truncated output."""
+    model = FakeModel()
+    prompt = enricher.build_prompt([{"filename": f"{idx}.png"} for idx in range(items)])
+    body = model.render(prompt)
+    return {
+        "clean_us": _time_extract(body, repeat),
+        "prose_us": _time_extract("Here you go:\n" + body + "\nThanks!", repeat),
+        "truncated_us": _time_extract("Here you go:\n" + body[: len(body) // 2], repeat),
+    }
+
+
+def run_benchmark(
+    count: int,
+    model: FakeModel,
+    *,
+    batch_size: int = enricher.BATCH_SIZE,
+    token_budget: int = 0,
+    checkpoint: bool = True,
+    merge_every: int = enricher.MERGE_EVERY_DEFAULT,
+    seed: int = 0,
+    trace_memory: bool = False,
+) -> dict[str, Any]:
+    """Enrich a synthetic dataset of `count` records and return timing/memory figures."""
+    data = generate_synthetic_metadata(count, seed=seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "screenshots.json"
+
+        started = time.perf_counter()
+        enricher.save_metadata(json_path, data)
+        initial_save = time.perf_counter() - started
+        started = time.perf_counter()
+        data = enricher.load_metadata(json_path)
+        load_seconds = time.perf_counter() - started
+
+        log = enricher.CheckpointLog(json_path) if checkpoint else None
+        budget = enricher.TokenBudget(token_budget) if token_budget > 0 else None
+        timings: dict[str, float] = {}
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        completed = True
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+                enricher.enrich_batches(
+                    data=data,
+                    json_path=json_path,
+                    batch_size=batch_size,
+                    model="fake",
+                    sleep_seconds=0,
+                    interactive=False,
+                    log_dir=None,
+                    confidence_threshold=0.6,
+                    defer_hours=12,
+                    auto=True,
+                    confirm=False,
+                    progress={},
+                    checkpoint=log,
+                    merge_every=merge_every,
+                    scheduler=enricher.DeferredScheduler(data),
+                    token_budget=budget,
+                    call_model=model,
+                    timings=timings,
+                )
+        except BenchmarkBudgetReached:
+            completed = False
+        elapsed = time.perf_counter() - started
+        if log is not None:
+            merge_started = time.perf_counter()
+            log.merge(data)
+            timings["persist"] = timings.get("persist", 0.0) + time.perf_counter() - merge_started
+        peak_traced = 0.0
+        if trace_memory:
+            peak_traced = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    handled = sum(1 for entry in data if entry.get("status") in {"processed", "deferred"})
+    return {
+        "items": count,
+        "handled": handled,
+        "completed": completed,
+        "batches": model.calls,
+        "seconds": elapsed,
+        "items_per_sec": handled / elapsed if elapsed else 0.0,
+        "load_seconds": load_seconds,
+        "initial_save_seconds": initial_save,
+        "batching_seconds": timings.get("batching", 0.0),
+        "model_seconds": timings.get("model", 0.0),
+        "parse_seconds": model.parse_seconds,
+        "persist_seconds": timings.get("persist", 0.0),
+        "max_rss_mb": _max_rss_mb(),
+        "traced_peak_mb": peak_traced,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark screenshot_enricher offline with a fake model.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Dataset sizes to run")
+    parser.add_argument("--batch-size", type=int, default=enricher.BATCH_SIZE, help="Maximum items per batch")
+    parser.add_argument("--token-budget", type=int, default=0, help="Enable adaptive token budgeting (0 = off)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake model latency per call in seconds")
+    parser.add_argument("--malformed-rate", type=float, default=0.02, help="Share of truncated responses")
+    parser.add_argument("--short-list-rate", type=float, default=0.05, help="Share of responses missing one item")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.1, help="Share of low-confidence results")
+    parser.add_argument(
+        "--max-batches",
+        type=int,
+        default=200,
+        help="Stop each run after this many model calls (0 = run to completion)",
+    )
+    parser.add_argument("--no-checkpoint", action="store_true", help="Rewrite the JSON file after every batch")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report tracemalloc peak (slower)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for data and fake model")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON lines")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    extract = bench_extract_json_block()
+    if args.json:
+        print(json.dumps({"extract_json_block": extract}))
+    else:
+        print(
+            "🔬 _extract_json_block (25 items): "
+            f"clean {extract['clean_us']:.0f}µs | prose {extract['prose_us']:.0f}µs | "
+            f"truncated {extract['truncated_us']:.0f}µs"
+        )
+
+    for size in args.sizes:
+        model = FakeModel(
+            latency=args.latency,
+            malformed_rate=args.malformed_rate,
+            short_list_rate=args.short_list_rate,
+            low_confidence_rate=args.low_confidence_rate,
+            seed=args.seed,
+            max_calls=args.max_batches or None,
+        )
+        result = run_benchmark(
+            size,
+            model,
+            batch_size=args.batch_size,
+            token_budget=args.token_budget,
+            checkpoint=not args.no_checkpoint,
+            seed=args.seed,
+            trace_memory=args.tracemalloc,
+        )
+        if args.json:
+            print(json.dumps(result))
+            continue
+        partial = "" if result["completed"] else f" (stopped after {result['batches']} batches)"
+        print(
+            f"\n📦 {size} items{partial}"
+            f"\n   Throughput: {result['items_per_sec']:.1f} items/s "
+            f"({result['handled']} items in {result['seconds']:.2f}s)"
+            f"\n   Batching: {result['batching_seconds']:.3f}s | Model: {result['model_seconds']:.3f}s"
+            f" | Parse: {result['parse_seconds']:.3f}s | Persist: {result['persist_seconds']:.3f}s"
+            f"\n   Load: {result['load_seconds']:.3f}s | Max RSS: {result['max_rss_mb']:.1f} MB"
+            + (f" | Traced peak: {result['traced_peak_mb']:.1f} MB" if args.tracemalloc else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,14 @@ from __future__ import annotations
 
 import argparse
 import hashlib
-import json
 import os
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable, List
 
+import json_io
+
 SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg"}
 
 
@@ -124,6 +125,28 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Include the full SHA-1 hash in output (ignored when --skip-hash is set).",
     )
+    parser.add_argument(
+        "--ocr",
+        action="store_true",
+        help="Run Tesseract OCR over the images (in a process pool) into ocr.sqlite3 next to the output.",
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=None,
+        help="Worker processes for --ocr (defaults to all cores).",
+    )
+    parser.add_argument(
+        "--phash",
+        action="store_true",
+        help="Add perceptual hashes (phash/dhash) for near-duplicate detection.",
+    )
+    parser.add_argument(
+        "--phash-workers",
+        type=int,
+        default=None,
+        help="Worker processes for --phash (defaults to all cores).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -145,16 +168,36 @@ def main() -> None:
         skip_file_hash=args.skip_hash,
     )
 
+    if args.ocr:
+        from ocr_screenshots import run_ocr
+        from ocr_store import DEFAULT_STORE_NAME, OCRStore
+
+        store_path = args.output.expanduser().resolve().with_name(DEFAULT_STORE_NAME)
+        with OCRStore(store_path) as store:
+            stats = run_ocr(metadata, store=store, inline=False, workers=args.ocr_workers)
+        print(f"OCR: {stats['ocr']} images read, {stats['failed']} failed → {store_path}", file=os.sys.stderr)
+
+    if args.phash:
+        from image_hashes import add_perceptual_hashes, cluster_near_duplicates
+
+        hashed = add_perceptual_hashes(metadata, workers=args.phash_workers)
+        clusters = cluster_near_duplicates(metadata)
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        print(
+            f"Perceptual hashes: {hashed} images, {len(clusters)} near-duplicate clusters "
+            f"({duplicates} redundant shots)",
+            file=os.sys.stderr,
+        )
+
     if args.dry_run:
-        json.dump(metadata, fp=os.sys.stdout, indent=2, ensure_ascii=False)
+        os.sys.stdout.write(json_io.dumps(metadata, pretty=True).decode("utf-8"))
         if metadata:
             print()
         return
 
     output_path = args.output.expanduser().resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as outfile:
-        json.dump(metadata, outfile, indent=2, ensure_ascii=False)
+    json_io.save(output_path, metadata)
 
     print(f"Saved {len(metadata)} entries to {output_path}")
 
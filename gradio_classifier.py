@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import math
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,6 +9,8 @@ from typing import Iterable, List
 
 import gradio as gr
 
+import json_io
+
 
 DATA_FILE = Path("screenshots.json")
 CATEGORY_FILE = Path("categories.json")
@@ -28,8 +29,7 @@ DEFAULT_CATEGORIES = [
 
 def save_json(path: Path, payload: list | dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+    json_io.save(path, payload)
 
 
 def ensure_files() -> None:
@@ -41,8 +41,7 @@ def ensure_files() -> None:
 
 def load_data() -> list[dict]:
     ensure_files()
-    with DATA_FILE.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return json_io.load(DATA_FILE)
 
 
 def save_data(records: list[dict]) -> None:
@@ -51,8 +50,7 @@ def save_data(records: list[dict]) -> None:
 
 def load_categories() -> list[str]:
     ensure_files()
-    with CATEGORY_FILE.open("r", encoding="utf-8") as fh:
-        payload = json.load(fh)
+    payload = json_io.load(CATEGORY_FILE)
     categories = payload.get("categories", [])
     if not categories:
         categories = list(DEFAULT_CATEGORIES)
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable, List
 
 import gradio as gr
 
+import json_io
+
 
 DATA_FILE = Path("screenshots.json")
 LEXICON_DIR = Path("lexicon")
@@ -17,14 +18,12 @@ CONF_THRESHOLD = 0.7
 
 
 def load_json(path: Path) -> list | dict:
-    with path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return json_io.load(path)
 
 
 def save_json(path: Path, payload: list | dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+    json_io.save(path, payload)
 
 
 if not DATA_FILE.exists():
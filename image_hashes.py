@@ -0,0 +1,223 @@
+"""Perceptual hashes (dHash/pHash) and a BK-tree for near-duplicate screenshot lookup."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Hashable, Iterable, Sequence
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+HASH_SIZE = 8
+PHASH_SCALE = 4  # pHash works on a (HASH_SIZE * PHASH_SCALE)² thumbnail
+DEFAULT_MAX_DISTANCE = 6
+CHUNK_SIZE = 64
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+_DCT = _dct_matrix(HASH_SIZE * PHASH_SCALE)
+
+
+def _pack(bits: np.ndarray) -> list[int]:
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return [int(value) for value in packed.view(">u8").ravel()]
+
+
+def dhash_array(pixels: np.ndarray) -> list[int]:
+    """Row-gradient hashes for a stack of (N, HASH_SIZE, HASH_SIZE + 1) grayscale thumbnails."""
+    return _pack(pixels[:, :, 1:] > pixels[:, :, :-1])
+
+
+def phash_array(pixels: np.ndarray) -> list[int]:
+    """DCT hashes for a stack of (N, 32, 32) grayscale thumbnails."""
+    coeffs = _DCT @ pixels.astype(np.float32) @ _DCT.T
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(pixels), -1)
+    # The DC term carries overall brightness, not structure, so it is left out of the median.
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack(low > median)
+
+
+def _thumbnails(path: str) -> tuple[np.ndarray, np.ndarray]:
+    with Image.open(path) as image:
+        gray = image.convert("L")
+    side = HASH_SIZE * PHASH_SCALE
+    small = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    large = gray.resize((side, side), Image.Resampling.BILINEAR)
+    return np.asarray(small, dtype=np.int16), np.asarray(large, dtype=np.float32)
+
+
+def _hash_chunk(paths: Sequence[str]) -> list[tuple[str, str | None, str | None]]:
+    loaded: list[str] = []
+    small: list[np.ndarray] = []
+    large: list[np.ndarray] = []
+    results: list[tuple[str, str | None, str | None]] = []
+    for path in paths:
+        try:
+            thumb_small, thumb_large = _thumbnails(path)
+        except (OSError, ValueError):
+            results.append((path, None, None))
+            continue
+        loaded.append(path)
+        small.append(thumb_small)
+        large.append(thumb_large)
+    if loaded:
+        dhashes = dhash_array(np.stack(small))
+        phashes = phash_array(np.stack(large))
+        results.extend(
+            (path, format_hash(p), format_hash(d)) for path, p, d in zip(loaded, phashes, dhashes)
+        )
+    return results
+
+
+def format_hash(value: int) -> str:
+    return f"{value:016x}"
+
+
+def parse_hash(value: str | int | None) -> int | None:
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(value, 16)
+    except ValueError:
+        return None
+
+
+def compute_hashes(
+    paths: Iterable[str],
+    *,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict[str, tuple[str | None, str | None]]:
+    """Return {path: (phash, dhash)} as hex strings, decoding images in a process pool.
+
+    Each worker loads a chunk of thumbnails and hashes the stack in one NumPy call.
+    `workers=None` uses every core, `workers=0` runs inline. Unreadable images map to None.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required for perceptual hashing (pip install -r requirements.txt)")
+    paths = list(paths)
+    chunks = [paths[start : start + chunk_size] for start in range(0, len(paths), chunk_size)]
+    if workers == 0:
+        batches = map(_hash_chunk, chunks)
+        return {path: (p, d) for batch in batches for path, p, d in batch}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return {path: (p, d) for batch in pool.map(_hash_chunk, chunks) for path, p, d in batch}
+
+
+def add_perceptual_hashes(entries: list[dict[str, Any]], *, workers: int | None = None) -> int:
+    """Fill `phash`/`dhash` on entries that lack them; returns how many were hashed."""
+    todo = [entry for entry in entries if entry.get("path") and not entry.get("phash")]
+    hashes = compute_hashes((entry["path"] for entry in todo), workers=workers)
+    hashed = 0
+    for entry in todo:
+        phash, dhash = hashes.get(entry["path"], (None, None))
+        if phash is None:
+            continue
+        entry["phash"] = phash
+        entry["dhash"] = dhash
+        hashed += 1
+    return hashed
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance.
+
+    Entries with identical hashes share a node. Queries prune every subtree whose edge
+    distance falls outside [d - radius, d + radius], so lookups touch a small fraction
+    of the tree for the tight radii used for near-duplicates.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Iterable[tuple[int, Hashable]] = ()) -> None:
+        self._root: list | None = None  # [hash, keys, {distance: child}]
+        self._size = 0
+        for value, key in items:
+            self.add(value, key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, key: Hashable) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [key], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> list[tuple[int, Hashable]]:
+        """Return (distance, key) pairs within `radius` of `value`, nearest first."""
+        if self._root is None:
+            return []
+        found: list[tuple[int, Hashable]] = []
+        stack = [self._root]
+        while stack:
+            node_value, keys, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                found.extend((distance, key) for key in keys)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+def cluster_near_duplicates(
+    entries: Sequence[dict[str, Any]],
+    *,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    field: str = "phash",
+) -> list[list[dict[str, Any]]]:
+    """Group entries whose hashes are within `max_distance` bits (transitively).
+
+    Only clusters with two or more members are returned, each in input order.
+    """
+    hashed = [(index, parse_hash(entry.get(field))) for index, entry in enumerate(entries)]
+    hashed = [(index, value) for index, value in hashed if value is not None]
+    tree = BKTree((value, index) for index, value in hashed)
+
+    parent = {index: index for index, _ in hashed}
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for index, value in hashed:
+        for _, other in tree.query(value, max_distance):
+            root_a, root_b = find(index), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups: dict[int, list[int]] = {}
+    for index, _ in hashed:
+        groups.setdefault(find(index), []).append(index)
+    clusters = [sorted(members) for members in groups.values() if len(members) > 1]
+    clusters.sort(key=lambda members: members[0])
+    return [[entries[index] for index in members] for members in clusters]
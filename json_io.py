@@ -0,0 +1,56 @@
+"""JSON load/save for the metadata scripts and the reviewer backend, using orjson when it is installed.
+
+Files are written compact by default; set JSON_PRETTY=1 (or pass pretty=True) for
+2-space indented output that is easier to read and diff by hand. Both forms load
+the same way. The backend re-exports this module as ``backend.serialization``.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+PRETTY_DEFAULT = os.getenv("JSON_PRETTY", "false").lower() in {"1", "true", "yes"}
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any, *, pretty: bool | None = None, sort_keys: bool = False) -> bytes:
+    """UTF-8 JSON bytes; ``pretty=None`` follows JSON_PRETTY."""
+    pretty = PRETTY_DEFAULT if pretty is None else pretty
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, option=option)
+    if pretty:
+        text = json.dumps(value, indent=2, ensure_ascii=False, sort_keys=sort_keys)
+    else:
+        text = json.dumps(value, ensure_ascii=False, sort_keys=sort_keys, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def load(path: Path) -> Any:
+    return loads(path.read_bytes())
+
+
+def save(path: Path, value: Any, *, pretty: bool | None = None, sort_keys: bool = False) -> None:
+    """Write atomically through a sibling .tmp file, so readers never see a partial file."""
+    pretty = PRETTY_DEFAULT if pretty is None else pretty
+    payload = dumps(value, pretty=pretty, sort_keys=sort_keys) + (b"\n" if pretty else b"")
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(payload)
+    tmp_path.replace(path)
@@ -0,0 +1,240 @@
+"""Run Tesseract OCR over screenshot metadata in a process pool."""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import json_io
+from generate_screenshots_metadata import compute_file_hash
+from ocr_store import DEFAULT_STORE_NAME, OCRRecord, OCRStore
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    pytesseract = None
+    Image = None
+
+DEFAULT_LANG = "eng"
+DEFAULT_MAX_DIMENSION = 2000
+PROGRESS_EVERY = 100
+
+
+def _limit_worker_threads() -> None:
+    # Tesseract spawns OpenMP threads per call; one per process avoids oversubscribing cores.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def ocr_image(
+    path: str,
+    *,
+    lang: str = DEFAULT_LANG,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+) -> tuple[str, float | None]:
+    """Grayscale and downscale the image, then return Tesseract's text and mean word confidence."""
+    if pytesseract is None or Image is None:
+        raise RuntimeError("pytesseract and Pillow are required for OCR (pip install -r requirements.txt)")
+    with Image.open(path) as image:
+        gray = image.convert("L")
+    if max_dimension > 0 and max(gray.size) > max_dimension:
+        gray.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    data = pytesseract.image_to_data(gray, lang=lang, output_type=pytesseract.Output.DICT)
+
+    lines: dict[tuple[int, int, int], list[str]] = {}
+    confidences: list[float] = []
+    for idx, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word:
+            continue
+        key = (data["block_num"][idx], data["par_num"][idx], data["line_num"][idx])
+        lines.setdefault(key, []).append(word)
+        conf = float(data["conf"][idx])
+        if conf >= 0:
+            confidences.append(conf)
+    text = "\n".join(" ".join(words) for words in lines.values())
+    mean_conf = sum(confidences) / len(confidences) / 100 if confidences else None
+    return text, mean_conf
+
+
+def _hash_worker(path: str) -> tuple[str, str | None]:
+    try:
+        return path, compute_file_hash(Path(path))
+    except OSError:
+        return path, None
+
+
+def _ocr_worker(job: tuple[str, str, str, int]) -> tuple[str, str | None, float | None, float, str | None]:
+    file_hash, path, lang, max_dimension = job
+    started = time.perf_counter()
+    try:
+        text, confidence = ocr_image(path, lang=lang, max_dimension=max_dimension)
+    except Exception as exc:  # pragma: no cover - depends on image/tesseract state
+        return file_hash, None, None, time.perf_counter() - started, str(exc)
+    return file_hash, text, confidence, time.perf_counter() - started, None
+
+
+def _map(func: Callable, jobs: Iterable, workers: int, chunksize: int = 8):
+    if workers == 0:
+        yield from map(func, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers or None, initializer=_limit_worker_threads) as pool:
+        yield from pool.map(func, jobs, chunksize=chunksize)
+
+
+def run_ocr(
+    entries: list[dict[str, Any]],
+    *,
+    store: OCRStore | None = None,
+    inline: bool = True,
+    workers: int | None = None,
+    lang: str = DEFAULT_LANG,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    force: bool = False,
+    ocr_worker: Callable = _ocr_worker,
+) -> dict[str, int]:
+    """OCR each distinct file hash once and record the result on every matching entry.
+
+    Hashes already in `store` (or, without a store, entries whose `ocr_hash` matches)
+    are skipped unless `force`. Entries gain `hash` and `ocr_hash`; `ocr_text` is
+    written only when `inline`. `workers=None` uses every core, `workers=0` runs inline.
+    """
+    stats = {"hashed": 0, "ocr": 0, "copied": 0, "skipped": 0, "failed": 0}
+
+    unhashed = [entry["path"] for entry in entries if entry.get("path") and not entry.get("hash")]
+    hashes: dict[str, str | None] = {}
+    for path, file_hash in _map(_hash_worker, unhashed, workers, chunksize=32):
+        hashes[path] = file_hash
+        stats["hashed"] += 1
+
+    by_hash: dict[str, list[dict[str, Any]]] = {}
+    for entry in entries:
+        file_hash = entry.get("hash") or hashes.get(entry.get("path", ""))
+        if not file_hash:
+            stats["failed"] += 1
+            continue
+        entry["hash"] = file_hash
+        by_hash.setdefault(file_hash, []).append(entry)
+
+    done_hashes: set[str] = set()
+    if not force:
+        if store is not None:
+            done_hashes = store.known_hashes(by_hash)
+        else:
+            done_hashes = {
+                file_hash
+                for file_hash, group in by_hash.items()
+                if any(entry.get("ocr_hash") == file_hash for entry in group)
+            }
+
+    jobs = [
+        (file_hash, group[0]["path"], lang, max_dimension)
+        for file_hash, group in by_hash.items()
+        if file_hash not in done_hashes
+    ]
+    results: dict[str, OCRRecord] = {}
+    total = len(jobs)
+    started = time.perf_counter()
+    for done, (file_hash, text, confidence, seconds, error) in enumerate(
+        _map(ocr_worker, jobs, workers), start=1
+    ):
+        if error is not None or text is None:
+            print(f"⚠️  OCR failed for {by_hash[file_hash][0]['path']}: {error}", file=sys.stderr)
+            stats["failed"] += len(by_hash[file_hash])
+            continue
+        results[file_hash] = OCRRecord(file_hash, text, lang=lang, confidence=confidence, runtime=seconds)
+        stats["ocr"] += 1
+        if done % PROGRESS_EVERY == 0:
+            rate = done / (time.perf_counter() - started)
+            print(f"🔎 OCR {done}/{total} ({rate:.1f} images/s)")
+
+    if store is not None and results:
+        store.put_many(results.values())
+
+    texts = {file_hash: record.text for file_hash, record in results.items()}
+    if inline and store is not None:
+        missing = [file_hash for file_hash in done_hashes if file_hash not in texts]
+        texts.update({file_hash: record.text for file_hash, record in store.get_many(missing).items()})
+    elif inline:
+        for file_hash in done_hashes:
+            for entry in by_hash[file_hash]:
+                if entry.get("ocr_hash") == file_hash and "ocr_text" in entry:
+                    texts[file_hash] = entry["ocr_text"]
+                    break
+
+    for file_hash, group in by_hash.items():
+        fresh = file_hash in results
+        if not fresh and file_hash not in done_hashes:
+            continue
+        for entry in group:
+            if not fresh and entry.get("ocr_hash") == file_hash and (not inline or "ocr_text" in entry):
+                stats["skipped"] += 1
+                continue
+            entry["ocr_hash"] = file_hash
+            if inline and file_hash in texts:
+                entry["ocr_text"] = texts[file_hash]
+            stats["copied"] += 1
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OCR screenshots listed in a JSON file into a content-addressed store.")
+    parser.add_argument("json_file", type=Path, help="Screenshots JSON produced by generate_screenshots_metadata.py")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores, 0 = inline)")
+    parser.add_argument("--lang", default=DEFAULT_LANG, help="Tesseract language code(s), e.g. eng+deu")
+    parser.add_argument(
+        "--max-dimension",
+        type=int,
+        default=DEFAULT_MAX_DIMENSION,
+        help="Downscale images so the longest side is at most this many pixels (0 = keep size)",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help=f"OCR result store (default: {DEFAULT_STORE_NAME} next to the JSON file)",
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="Also copy OCR text into the JSON file's ocr_text field",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-run OCR even for files already processed")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    json_path = args.json_file.expanduser().resolve()
+    if not json_path.exists():
+        raise SystemExit(f"JSON file not found: {json_path}")
+    if pytesseract is None:
+        raise SystemExit("pytesseract is not installed; run pip install -r requirements.txt")
+
+    entries = json_io.load(json_path)
+
+    store_path = (args.store or json_path.with_name(DEFAULT_STORE_NAME)).expanduser().resolve()
+    with OCRStore(store_path) as store:
+        stats = run_ocr(
+            entries,
+            store=store,
+            inline=args.inline,
+            workers=args.workers,
+            lang=args.lang,
+            max_dimension=args.max_dimension,
+            force=args.force,
+        )
+
+    json_io.save(json_path, entries)
+    print(
+        f"✅ OCR complete: {stats['ocr']} images read, {stats['copied']} entries updated, "
+        f"{stats['skipped']} already done, {stats['failed']} failed → {store_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Content-addressed OCR result store keyed by the SHA-1 from compute_file_hash.
+
+Results live in a single SQLite file with zlib-compressed text, so identical pixels
+are OCR'd once and OCR text stays out of screenshots.json. The backend reads the
+same schema through `connect_readonly` and `read_texts`, imported by backend/ocr_store.py.
+"""
+from __future__ import annotations
+
+import sqlite3
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_STORE_NAME = "ocr.sqlite3"
+# SQLite's default limit on bound parameters is 999; stay below it for IN (...) queries.
+_QUERY_CHUNK = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr (
+    hash TEXT PRIMARY KEY,
+    text BLOB NOT NULL,
+    lang TEXT,
+    confidence REAL,
+    runtime REAL,
+    created_at TEXT
+) WITHOUT ROWID
+"""
+
+
+@dataclass
+class OCRRecord:
+    hash: str
+    text: str
+    lang: str | None = None
+    confidence: float | None = None
+    runtime: float | None = None
+
+
+def _chunks(values: list[str]) -> Iterable[list[str]]:
+    for start in range(0, len(values), _QUERY_CHUNK):
+        yield values[start : start + _QUERY_CHUNK]
+
+
+def connect_readonly(path: Path) -> sqlite3.Connection:
+    """Open an existing store without write access (the backend never writes OCR)."""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def read_texts(conn: sqlite3.Connection, hashes: Iterable[str]) -> dict[str, str]:
+    """Decompressed OCR text for whichever of `hashes` are stored."""
+    texts: dict[str, str] = {}
+    for chunk in _chunks(list(dict.fromkeys(hashes))):
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT hash, text FROM ocr WHERE hash IN ({placeholders})", chunk)
+        for file_hash, blob in rows:
+            texts[file_hash] = zlib.decompress(blob).decode("utf-8")
+    return texts
+
+
+class OCRStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "OCRStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __contains__(self, file_hash: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM ocr WHERE hash = ?", (file_hash,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+
+    def known_hashes(self, hashes: Iterable[str]) -> set[str]:
+        wanted = list(dict.fromkeys(hashes))
+        found: set[str] = set()
+        for chunk in _chunks(wanted):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(f"SELECT hash FROM ocr WHERE hash IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def get(self, file_hash: str) -> OCRRecord | None:
+        return self.get_many([file_hash]).get(file_hash)
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, OCRRecord]:
+        wanted = list(dict.fromkeys(hashes))
+        records: dict[str, OCRRecord] = {}
+        for chunk in _chunks(wanted):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT hash, text, lang, confidence, runtime FROM ocr WHERE hash IN ({placeholders})",
+                chunk,
+            )
+            for file_hash, blob, lang, confidence, runtime in rows:
+                records[file_hash] = OCRRecord(
+                    hash=file_hash,
+                    text=zlib.decompress(blob).decode("utf-8"),
+                    lang=lang,
+                    confidence=confidence,
+                    runtime=runtime,
+                )
+        return records
+
+    def put_many(self, records: Iterable[OCRRecord]) -> int:
+        """Insert or replace records in a single transaction, returning the count."""
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (
+                record.hash,
+                zlib.compress(record.text.encode("utf-8"), 6),
+                record.lang,
+                record.confidence,
+                record.runtime,
+                now,
+            )
+            for record in records
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr (hash, text, lang, confidence, runtime, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
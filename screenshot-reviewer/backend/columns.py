@@ -0,0 +1,240 @@
+"""Columnar NumPy view of the screenshot dataset for vectorised filters and counts.
+
+Status and category are stored as small-int codes, confidence as float32 and
+created_at as int64 microseconds since the epoch. Filters return row indices into
+`records`; callers copy dicts only for the rows they actually return. `validated`
+flags rows whose write-time validation marker still matches their contents.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import DATASET_ITEMS, record_cache
+from .models import GroupsPayload, GroupSummary, ScreenshotFilter, ScreenshotStatus
+from .records import as_dict, to_records
+from .storage import screenshots_version
+from .validation import is_validated
+
+LOW_CONFIDENCE_THRESHOLD = 0.6
+GROUP_WINDOW_MINUTES = 3
+MISSING_TIME = np.iinfo(np.int64).min + 1  # +1 so negating for descending sorts cannot overflow
+STATUS_VALUES: Tuple[str, ...] = tuple(status.value for status in ScreenshotStatus)
+
+_CACHE_LOCK = threading.Lock()
+_CACHE: Dict[str, object] = {}
+
+
+def _epoch_us(value: object) -> int:
+    if not value or not isinstance(value, str):
+        return MISSING_TIME
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return MISSING_TIME
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    delta = parsed - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _to_datetime(epoch_us: int) -> Optional[datetime]:
+    if epoch_us == MISSING_TIME:
+        return None
+    return datetime.fromtimestamp(epoch_us / 1_000_000, tz=timezone.utc)
+
+
+def _confidence(value: object) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class DatasetColumns:
+    """Read-only columns built once per dataset version."""
+
+    def __init__(self, records: Sequence) -> None:
+        self.records = records
+        self.status_vocab: List[str] = list(STATUS_VALUES)
+        self.category_vocab: List[str] = []
+        status_codes = {value: code for code, value in enumerate(self.status_vocab)}
+        category_codes: Dict[str, int] = {}
+
+        count = len(records)
+        status = np.empty(count, dtype=np.int8)
+        category = np.empty(count, dtype=np.int32)
+        uncategorized = np.empty(count, dtype=bool)
+        confidence = np.empty(count, dtype=np.float32)
+        created_at = np.empty(count, dtype=np.int64)
+        validated = np.empty(count, dtype=bool)
+        for row, item in enumerate(records):
+            value = item.get("status")
+            value = ScreenshotStatus.PENDING.value if value is None else str(value)
+            code = status_codes.get(value)
+            if code is None:
+                code = status_codes[value] = len(self.status_vocab)
+                self.status_vocab.append(value)
+            status[row] = code
+
+            name = item.get("primary_category")
+            if name:
+                code = category_codes.get(name)
+                if code is None:
+                    code = category_codes[name] = len(self.category_vocab)
+                    self.category_vocab.append(name)
+                category[row] = code
+            else:
+                category[row] = -1
+            uncategorized[row] = not (name or "").strip()
+
+            confidence[row] = _confidence(item.get("confidence"))
+            created_at[row] = _epoch_us(item.get("created_at"))
+            validated[row] = is_validated(item)
+
+        self.status = status
+        self.category = category
+        self.uncategorized = uncategorized
+        self.confidence = confidence
+        self.created_at = created_at
+        self.validated = validated
+        self._status_codes = status_codes
+        self._category_codes = category_codes
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ── masks ──────────────────────────────────
+    def status_mask(self, *values: str) -> np.ndarray:
+        codes = [self._status_codes[value] for value in values if value in self._status_codes]
+        return np.isin(self.status, codes)
+
+    def category_mask(self, name: str) -> np.ndarray:
+        code = self._category_codes.get(name)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.category == code
+
+    def filter_mask(
+        self,
+        filter_mode: ScreenshotFilter = ScreenshotFilter.ALL,
+        *,
+        category: Optional[str] = None,
+        low_confidence: float = LOW_CONFIDENCE_THRESHOLD,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if category:
+            mask &= self.category_mask(category)
+        if filter_mode == ScreenshotFilter.PENDING:
+            # "Pending" means no category yet, whatever the status says.
+            mask &= self.uncategorized
+        elif filter_mode == ScreenshotFilter.DEFERRED:
+            mask &= self.status_mask(ScreenshotStatus.DEFERRED.value)
+        elif filter_mode == ScreenshotFilter.RE_REVIEW:
+            mask &= self.status_mask(ScreenshotStatus.RE_REVIEW.value)
+        elif filter_mode == ScreenshotFilter.LOW_CONFIDENCE:
+            mask &= self.confidence < low_confidence
+        if start is not None:
+            mask &= self.created_at >= _epoch_us(start.isoformat())
+        if end is not None:
+            mask &= (self.created_at <= _epoch_us(end.isoformat())) & (self.created_at != MISSING_TIME)
+        return mask
+
+    # ── ordering and grouping ──────────────────
+    def newest_first(self, indices: np.ndarray) -> np.ndarray:
+        order = np.argsort(-self.created_at[indices], kind="stable")
+        return indices[order]
+
+    def group_keys(self, indices: np.ndarray) -> np.ndarray:
+        """Time-bucket ids (GROUP_WINDOW_MINUTES wide) for the given rows; -1 = unknown time."""
+        times = self.created_at[indices]
+        window_us = GROUP_WINDOW_MINUTES * 60 * 1_000_000
+        return np.where(times == MISSING_TIME, -1, times // window_us)
+
+    def groups(self, indices: np.ndarray) -> Tuple[GroupsPayload, np.ndarray]:
+        if not len(indices):
+            return GroupsPayload(items=[], current_index=0), np.empty(0, dtype=np.int64)
+        keys = self.group_keys(indices)
+        times = self.created_at[indices]
+        buckets, inverse, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        starts = np.full(len(buckets), np.iinfo(np.int64).max, dtype=np.int64)
+        ends = np.full(len(buckets), MISSING_TIME, dtype=np.int64)
+        np.minimum.at(starts, inverse, times)
+        np.maximum.at(ends, inverse, times)
+        summaries = [
+            GroupSummary(
+                group_id=group_id_for(int(bucket)),
+                size=int(size),
+                start=_to_datetime(int(start)) if bucket != -1 else None,
+                end=_to_datetime(int(stop)) if bucket != -1 else None,
+            )
+            for bucket, size, start, stop in zip(buckets, sizes, starts, ends)
+        ]
+        minimum = datetime.min.replace(tzinfo=timezone.utc)
+        summaries.sort(key=lambda summary: summary.start or minimum, reverse=True)
+        return GroupsPayload(items=summaries, current_index=0), keys
+
+    # ── counts and materialisation ─────────────
+    def status_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.status, minlength=len(self.status_vocab))
+        return {value: int(counts[code]) for code, value in enumerate(self.status_vocab)}
+
+    def progress(self) -> dict:
+        counts = self.status_counts()
+        total = len(self)
+        reviewed = counts.get(ScreenshotStatus.REVIEWED.value, 0)
+        deleted = counts.get(ScreenshotStatus.DELETED.value, 0)
+        return {
+            "total": total,
+            "reviewed": reviewed,
+            "deferred": counts.get(ScreenshotStatus.DEFERRED.value, 0),
+            "re_review": counts.get(ScreenshotStatus.RE_REVIEW.value, 0),
+            "deleted": deleted,
+            "remaining": total - reviewed - deleted,
+        }
+
+    def materialize(self, indices: Sequence[int], *, include_heavy: bool = True) -> List[dict]:
+        """Dict copies of the selected rows, safe for per-request mutation."""
+        return [as_dict(self.records[int(row)], include_heavy=include_heavy) for row in indices]
+
+
+def group_id_for(bucket: int) -> str:
+    return "grp-unknown" if bucket == -1 else f"grp-{bucket}"
+
+
+def parse_group_id(group_id: str) -> Optional[int]:
+    suffix = group_id.removeprefix("grp-")
+    if suffix == "unknown":
+        return -1
+    try:
+        return int(suffix)
+    except ValueError:
+        return None
+
+
+def dataset_columns(loader: Callable[[], List[dict]]) -> DatasetColumns:
+    """Columns for the current screenshots.json, rebuilt only when the file changes."""
+    key = (screenshots_version(), loader)
+    with _CACHE_LOCK:
+        if _CACHE.get("key") == key:
+            record_cache("dataset_columns", hits=1)
+            return _CACHE["columns"]  # type: ignore[return-value]
+    record_cache("dataset_columns", misses=1)
+    # The cached view can live for many requests, so rows are held as slotted records.
+    columns = DatasetColumns(to_records(loader()))
+    DATASET_ITEMS.set((), len(columns))
+    with _CACHE_LOCK:
+        _CACHE["key"] = key
+        _CACHE["columns"] = columns
+    return columns
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -0,0 +1,153 @@
+"""Brotli/gzip compression for JSON API responses.
+
+Starlette's GZipMiddleware compresses every response type, including images that
+are already compressed, and cannot do Brotli. This middleware only touches JSON
+bodies of at least COMPRESSION_MIN_BYTES and picks the first encoding in COMPRESSION
+(default ``br,gzip``) that the client accepts. Brotli needs the optional ``Brotli``
+package and is skipped when it is not installed; COMPRESSION=off disables the
+middleware. Streamed bodies and partial or error responses pass through unchanged.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import Counter
+
+try:  # pragma: no cover - exercised implicitly when Brotli is installed
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Quality 4 keeps per-request latency close to gzip while still beating it on size.
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+COMPRESSIBLE_TYPES = ("application/json", "text/plain")
+
+RESPONSE_BYTES = Counter(
+    "compressed_response_bytes_total",
+    "Bytes of compressed responses before and after encoding.",
+    ("encoding", "stage"),
+)
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip}
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+
+
+def configured_encodings(raw: Optional[str] = None) -> Tuple[str, ...]:
+    """Encodings from COMPRESSION that are available here, in preference order."""
+    raw = os.getenv("COMPRESSION", "br,gzip") if raw is None else raw
+    if raw.strip().lower() in {"", "0", "off", "false", "no"}:
+        return ()
+    names = [name.strip().lower() for name in raw.split(",")]
+    return tuple(name for name in names if name in ENCODERS)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(accept_encoding: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """First of ``encodings`` the Accept-Encoding header allows, or None."""
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for name in encodings:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete JSON response bodies above a size threshold."""
+
+    def __init__(self, app, *, encodings: Optional[Tuple[str, ...]] = None, minimum_size: int = MIN_BYTES) -> None:
+        self.app = app
+        self.encodings = configured_encodings() if encodings is None else encodings
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = list(start.get("headers", []))
+            content_type = next((v for k, v in headers if k == b"content-type"), b"").decode("latin-1")
+            if (
+                start["status"] != 200
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or any(k == b"content-encoding" for k, _ in headers)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            encoded = ENCODERS[encoding](body)
+            RESPONSE_BYTES.inc((encoding, "identity"), len(body))
+            RESPONSE_BYTES.inc((encoding, "encoded"), len(encoded))
+            headers = [(k, v) for k, v in headers if k != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(encoded)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            passthrough = True
+            await send({**start, "headers": headers})
+            await send({**message, "body": encoded})
+
+        await self.app(scope, receive, send_compressed)
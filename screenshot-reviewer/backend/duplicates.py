@@ -0,0 +1,45 @@
+"""Near-duplicate clustering over the perceptual hashes written by the metadata generator."""
+
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+# image_hashes.py lives at the repository root; the BK-tree and clustering are shared from there.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from image_hashes import DEFAULT_MAX_DISTANCE, cluster_near_duplicates as _cluster  # noqa: E402
+
+HASH_FIELD = "phash"
+
+
+def _parse_hash(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=8)
+def _cluster_indices(hashes: Tuple[Optional[int], ...], max_distance: int) -> Tuple[Tuple[int, ...], ...]:
+    rows = [{HASH_FIELD: value, "index": index} for index, value in enumerate(hashes)]
+    clusters = _cluster(rows, max_distance=max_distance, field=HASH_FIELD)
+    return tuple(tuple(row["index"] for row in members) for members in clusters)
+
+
+def cluster_near_duplicates(
+    items: Sequence[dict], *, max_distance: int = DEFAULT_MAX_DISTANCE
+) -> List[List[dict]]:
+    """Transitively group items whose perceptual hashes differ by at most `max_distance` bits.
+
+    The result is memoised on the hash column, so repeated requests against an unchanged
+    dataset skip rebuilding the tree.
+    """
+    hashes = tuple(_parse_hash(item.get(HASH_FIELD)) for item in items)
+    return [[items[index] for index in members] for members in _cluster_indices(hashes, max_distance)]
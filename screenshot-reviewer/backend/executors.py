@@ -0,0 +1,200 @@
+"""Bounded worker pools for blocking route handlers.
+
+Sync endpoints on an `OffloadingRouter` run on the shared ``io`` thread pool rather
+than Starlette's default threadpool. Endpoints marked `@cpu_bound` (listing, search,
+counts) go to a separate ``cpu`` pool instead. That pool uses threads, or a process
+pool when CPU_POOL_PROCESSES is set. Each pool caps how many calls may wait for a
+worker and answers 503 beyond that, so one slow search cannot starve health checks
+or state saves. `pool_metrics()` reports queue depth and throughput per pool.
+Coalesced screenshot edits are flushed before a call goes to the process pool,
+since the child processes only see what is on disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from . import metrics, profiling, storage
+
+logger = logging.getLogger(__name__)
+
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "8"))
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_POOL_PROCESSES = os.getenv("CPU_POOL_PROCESSES", "false").lower() in {"1", "true", "yes"}
+POOL_MAX_QUEUE = int(os.getenv("POOL_MAX_QUEUE", "64"))
+
+
+def _call_reporting_http_errors(func: Callable[..., Any], args: tuple, kwargs: dict) -> tuple:
+    """Process-pool trampoline: HTTPException does not survive pickling, so return its fields."""
+    try:
+        return True, func(*args, **kwargs)
+    except HTTPException as exc:
+        return False, (exc.status_code, exc.detail, exc.headers)
+
+
+class BoundedPool:
+    """Lazily created executor with an admission limit and queue-depth counters."""
+
+    def __init__(self, name: str, workers: int, *, processes: bool = False, max_queue: int = POOL_MAX_QUEUE) -> None:
+        self.name = name
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                logger.warning("⚠️ %s pool saturated (%d queued), rejecting request", self.name, self.queued)
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"{self.name} pool is saturated, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or not isinstance(future.exception(), (type(None), HTTPException)):
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        self._admit()
+        try:
+            if self.processes:
+                future = self.executor.submit(func, *args, **kwargs)
+            else:
+                # Carry the request's context (e.g. Server-Timing stages) into the worker thread.
+                future = self.executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        # Counters follow the worker future, so a disconnected client does not skew them.
+        if not self.processes:
+            return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+        await asyncio.to_thread(storage.flush_screenshots)
+        ok, value = await asyncio.wrap_future(self.submit(_call_reporting_http_errors, func, args, kwargs))
+        if not ok:
+            raise HTTPException(status_code=value[0], detail=value[1], headers=value[2])
+        return value
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": self.name,
+                "kind": "process" if self.processes else "thread",
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "active": min(self.in_flight, self.workers),
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+IO_POOL = BoundedPool("io", IO_POOL_WORKERS)
+CPU_POOL = BoundedPool("cpu", CPU_POOL_WORKERS, processes=CPU_POOL_PROCESSES)
+POOLS = (IO_POOL, CPU_POOL)
+
+
+def cpu_bound(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a sync endpoint for the cpu pool; apply below the route decorator."""
+    func.__cpu_bound__ = True  # type: ignore[attr-defined]
+    return func
+
+
+def offload(func: Callable[..., Any], pool: BoundedPool) -> Callable[..., Any]:
+    """Async endpoint running ``func`` on ``pool``; FastAPI reads the signature via __wrapped__."""
+    if profiling.ENABLED and not pool.processes:
+        # The profiler has to run on the worker thread that executes the handler.
+        func = profiling.profiled(func)
+
+    @functools.wraps(func)
+    async def endpoint(*args: Any, **kwargs: Any) -> Any:
+        return await pool.run(func, *args, **kwargs)
+
+    return endpoint
+
+
+class OffloadingRouter(APIRouter):
+    """APIRouter that runs sync endpoints on the bounded pools instead of Starlette's threadpool.
+
+    The decorated module-level functions stay plain sync callables, so they can
+    still be called directly and pickled by name for the process pool.
+    """
+
+    def add_api_route(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if not asyncio.iscoroutinefunction(endpoint):
+            pool = CPU_POOL if getattr(endpoint, "__cpu_bound__", False) else IO_POOL
+            endpoint = offload(endpoint, pool)
+        super().add_api_route(path, endpoint, **kwargs)
+
+
+def pool_metrics() -> List[Dict[str, Any]]:
+    return [pool.metrics() for pool in POOLS]
+
+
+def _collect_pool_metrics():
+    snapshots = pool_metrics()
+    for field in ("in_flight", "queued", "peak_queued", "workers"):
+        samples = [({"pool": snapshot["pool"]}, snapshot[field]) for snapshot in snapshots]
+        yield f"pool_{field}", f"Worker pool {field.replace('_', ' ')}.", "gauge", samples
+    for field in ("completed", "failed", "rejected"):
+        samples = [({"pool": snapshot["pool"]}, snapshot[field]) for snapshot in snapshots]
+        yield f"pool_{field}_total", f"Worker pool calls {field}.", "counter", samples
+
+
+metrics.COLLECTORS.append(_collect_pool_metrics)
+
+
+def shutdown_pools(*, wait: bool = True) -> None:
+    for pool in POOLS:
+        pool.shutdown(wait=wait)
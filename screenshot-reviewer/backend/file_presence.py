@@ -0,0 +1,248 @@
+"""In-memory file-presence cache so list requests do not stat screenshots per item.
+
+SCREENSHOTS_DIR usually lives on an external volume where each stat is slow. The
+cache is filled by a directory scan at startup, kept current by a watchdog observer
+when watchdog is installed, and otherwise refreshed by a background sweeper once
+entries are older than FILE_PRESENCE_TTL seconds. The sweeper also checks every
+dataset path in bulk (one directory listing per folder), including paths no request
+has asked about yet, and logs newly missing files once instead of a warning per
+request. Request handlers never stat: `FilePresenceCache.check` answers from the
+cache or returns None, and a path nobody has checked yet is served as missing.
+`flag_missing_files` stores the sweep result on the records as ``file_missing``, so process-pool workers and other uvicorn workers, whose caches
+the watcher and sweeper never fill, can read it from the dataset.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .metrics import record_cache
+from .storage import load_screenshots, screenshots_transaction
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TTL_SECONDS = float(os.getenv("FILE_PRESENCE_TTL", "300"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("FILE_SWEEP_INTERVAL", "60"))
+SCAN_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg"})
+
+
+def _key(path: str) -> str:
+    return os.path.normpath(path)
+
+
+class FilePresenceCache:
+    """Thread-safe path → (present, checked_at) map."""
+
+    def __init__(self, *, ttl: float = PRESENCE_TTL_SECONDS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[str, Tuple[bool, float]] = {}
+        self._reported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(self, path: str, present: bool) -> bool:
+        """Record presence; returns True when this changes what the cache knew."""
+        key = _key(path)
+        now = self._clock()
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = (present, now)
+            if present:
+                self._reported.discard(key)
+        return previous is None or previous[0] != present
+
+    def lookup(self, path: str) -> Optional[bool]:
+        """Cached presence, stale or not; None if the path has never been checked."""
+        entry = self._entries.get(_key(path))
+        return None if entry is None else entry[0]
+
+    def check(self, path: str) -> Optional[bool]:
+        """Cached presence for the request path; None until the sweeper has seen ``path``."""
+        present = self.lookup(path)
+        if present is None:
+            record_cache("file_presence", misses=1)
+        else:
+            record_cache("file_presence", hits=1)
+        return present
+
+    def report_missing(self, path: str) -> bool:
+        """True the first time a missing path is reported, so callers log it once."""
+        key = _key(path)
+        with self._lock:
+            if key in self._reported:
+                return False
+            self._reported.add(key)
+            return True
+
+    def stale(self, paths: Iterable[str]) -> List[str]:
+        """Paths that are unknown or were last checked more than ``ttl`` seconds ago."""
+        cutoff = self._clock() - self.ttl
+        entries = self._entries
+        result = []
+        for path in paths:
+            entry = entries.get(_key(path))
+            if entry is None or entry[1] < cutoff:
+                result.append(path)
+        return result
+
+    def missing(self) -> Set[str]:
+        with self._lock:
+            return {path for path, (present, _) in self._entries.items() if not present}
+
+    # ── bulk updates ───────────────────────────
+    def scan(self, directory: Path) -> int:
+        """Walk ``directory`` and mark every image found as present; returns the count."""
+        found = 0
+        seen: Set[str] = set()
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in SCAN_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    self.set(path, True)
+                    seen.add(_key(path))
+                    found += 1
+        prefix = _key(str(directory)) + os.sep
+        with self._lock:
+            gone = [key for key, (present, _) in self._entries.items() if present and key.startswith(prefix)]
+        for key in gone:
+            if key not in seen:
+                self.set(key, False)
+        return found
+
+    def refresh(self, paths: Iterable[str]) -> List[str]:
+        """Re-check ``paths`` with one listing per parent directory; returns newly missing paths."""
+        by_dir: Dict[str, List[str]] = defaultdict(list)
+        for path in paths:
+            if path:
+                by_dir[os.path.dirname(_key(path))].append(path)
+        newly_missing = []
+        for directory, members in by_dir.items():
+            try:
+                names = set(os.listdir(directory))
+            except OSError:
+                names = set()
+            for path in members:
+                present = os.path.basename(path) in names
+                if self.set(path, present) and not present:
+                    newly_missing.append(path)
+        return newly_missing
+
+
+PRESENCE = FilePresenceCache()
+
+
+def flag_missing_files(cache: FilePresenceCache = PRESENCE) -> int:
+    """Store the cached presence on each swept record as ``file_missing``; returns how many changed.
+
+    Records the sweeper has not checked yet keep whatever flag they have.
+    """
+
+    def outdated(item: dict) -> bool:
+        present = cache.lookup(item["path"]) if item.get("path") else None
+        return present is not None and item.get("file_missing") is not (not present)
+
+    if not any(outdated(item) for item in load_screenshots()):
+        return 0
+    changed = 0
+    with screenshots_transaction() as dataset:
+        for item in dataset:
+            if outdated(item):
+                item["file_missing"] = not cache.lookup(item["path"])
+                changed += 1
+    return changed
+
+
+def _start_watcher(cache: FilePresenceCache, directory: Path):
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        logger.info("ℹ️ watchdog not installed; file presence refreshes every %.0fs", cache.ttl)
+        return None
+
+    class _Handler(FileSystemEventHandler):
+        def on_created(self, event):  # noqa: D401 - watchdog callback
+            if not event.is_directory:
+                cache.set(event.src_path, True)
+
+        def on_deleted(self, event):
+            if not event.is_directory:
+                cache.set(event.src_path, False)
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                cache.set(event.src_path, False)
+                cache.set(event.dest_path, True)
+
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(_Handler(), str(directory), recursive=True)
+    observer.start()
+    return observer
+
+
+class PresenceMonitor:
+    """Startup scan, optional watcher and periodic missing-files sweep on one daemon thread."""
+
+    def __init__(
+        self,
+        directory: Path,
+        paths: Callable[[], Iterable[Optional[str]]],
+        *,
+        cache: FilePresenceCache = PRESENCE,
+        interval: float = SWEEP_INTERVAL_SECONDS,
+        flag: Optional[Callable[[FilePresenceCache], int]] = None,
+    ) -> None:
+        self.directory = directory
+        self.paths = paths
+        self.cache = cache
+        self.interval = interval
+        self.flag = flag
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self) -> None:
+        if self.directory.exists():
+            self._observer = _start_watcher(self.cache, self.directory)
+        self._thread = threading.Thread(target=self._run, name="file-presence", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def sweep(self) -> List[str]:
+        paths = [path for path in self.paths() if path]
+        newly_missing = self.cache.refresh(self.cache.stale(paths))
+        if newly_missing:
+            logger.warning("⚠️ %d screenshots missing on disk (e.g. %s)", len(newly_missing), newly_missing[0])
+        if self.flag is not None:
+            flagged = self.flag(self.cache)
+            if flagged:
+                logger.info("🏷️ Updated file_missing on %d screenshots", flagged)
+        return newly_missing
+
+    def _run(self) -> None:
+        if self.directory.exists():
+            started = time.perf_counter()
+            found = self.cache.scan(self.directory)
+            logger.info("📂 Indexed %d screenshot files in %.1fs", found, time.perf_counter() - started)
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:  # pragma: no cover - keep the sweeper alive
+                logger.exception("File presence sweep failed")
+            self._stop.wait(self.interval)
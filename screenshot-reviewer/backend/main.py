@@ -13,11 +13,20 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 # ✅ Use absolute imports since we’re running from project root with `uvicorn backend.main:app`
-from backend.routes import categories, lexicon, screenshots, state
+from backend.columns import dataset_columns
+from backend.compression import CompressionMiddleware
+from backend.executors import pool_metrics, shutdown_pools
+from backend.file_presence import PresenceMonitor, flag_missing_files
+from backend.metrics import TimingMiddleware
+from backend.profiling import ENABLED as PROFILING_ENABLED, ProfilingMiddleware
+from backend.routes import categories, lexicon, metrics, screenshots, state
+from backend.serialization import orjson
+from backend.static_files import CachedStaticFiles, hashed_assets
 from backend.state_manager import load_selection_state, save_selection_state
+from backend.storage import close_write_buffers, load_screenshots
 
 # ─────────────────────────────────────────────
 # Logging Configuration
@@ -62,6 +71,12 @@ async def _handle_exit(sig: signal.Signals | int) -> None:
 async def lifespan(app: FastAPI):
     logger.info("🚀 Application startup")
     load_selection_state()
+    presence = PresenceMonitor(
+        SCREENSHOTS_DIR,
+        lambda: [item.get("path") for item in dataset_columns(load_screenshots).records],
+        flag=flag_missing_files,
+    )
+    presence.start()
 
     try:
         loop = asyncio.get_running_loop()
@@ -75,7 +90,11 @@ async def lifespan(app: FastAPI):
 
     yield
     logger.info("🛑 Application shutdown")
+    presence.stop()
     await save_selection_state()
+    # Force out coalesced screenshot edits before the process exits
+    close_write_buffers()
+    shutdown_pools(wait=False)
 
 # ─────────────────────────────────────────────
 # CORS Configuration
@@ -108,6 +127,7 @@ def _create_app() -> FastAPI:
         title="Screenshot Reviewer API",
         version="2.1.0",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
     )
     app.debug = os.getenv("DEBUG", "false").lower() in {"1", "true", "yes"}
 
@@ -124,6 +144,12 @@ def _create_app() -> FastAPI:
     app.router.redirect_trailing_slash = True  # ✅ add this line
 
     app.add_middleware(CORSMiddleware, **cors_kwargs)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(TimingMiddleware)
+    if PROFILING_ENABLED:
+        # Only installed when opted in, so normal deployments pay nothing for it.
+        app.add_middleware(ProfilingMiddleware)
+        logger.info("🔬 Profiling enabled: send X-Profile: 1 or ?profile=1 to capture a request")
 
     # ✅ Include routers
     #app.include_router(screenshots.router, prefix="/api/screenshots", tags=["screenshots"])
@@ -131,6 +157,9 @@ def _create_app() -> FastAPI:
     #app.include_router(lexicon.router, prefix="/api/lexicon", tags=["lexicon"])
     #app.include_router(state.router, prefix="/api/state", tags=["state"])
 
+    # Registered before the screenshots router so /{screenshot_id} does not shadow it
+    app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+
     # Note: keeping /api prefix for compatibility with existing frontend deployments
     app.include_router(screenshots.router, prefix="/api", tags=["screenshots"])
 
@@ -142,17 +171,21 @@ def _create_app() -> FastAPI:
 
     # ✅ Serve static screenshots
     if SCREENSHOTS_DIR.exists():
-        app.mount("/files", StaticFiles(directory=SCREENSHOTS_DIR), name="files")
+        app.mount("/files", CachedStaticFiles(directory=SCREENSHOTS_DIR), name="files")
 
     # ✅ Healthcheck
     @app.get("/api/health")
     def healthcheck():
-        return {"status": "ok"}
+        return {"status": "ok", "pools": pool_metrics()}
 
     # ✅ Serve frontend build if available
     frontend_dist = Path(__file__).resolve().parent.parent / "frontend" / "dist"
     if frontend_dist.exists():
-        app.mount("/", StaticFiles(directory=frontend_dist, html=True), name="frontend")
+        app.mount(
+            "/",
+            CachedStaticFiles(directory=frontend_dist, html=True, immutable=hashed_assets),
+            name="frontend",
+        )
 
     return app
 
@@ -160,12 +193,14 @@ async def _handle_exit(sig: signal.Signals | int) -> None:
     sig_name = getattr(sig, "name", sig)
     logger.info("📴 Received %s, saving state and cleaning up", sig_name)
     await save_selection_state()
+    # Flush coalesced screenshot edits before anything else can end this process
+    await asyncio.to_thread(close_write_buffers)
     try:
-        # Auto-kill any other uvicorn processes bound to same port
+        # Stop any other uvicorn processes bound to same port; SIGTERM lets them flush too
         current_pid = os.getpid()
         for proc in psutil.process_iter(["pid", "name", "cmdline"]):
             if "uvicorn" in (proc.info["name"] or "") and proc.info["pid"] != current_pid:
-                proc.kill()
+                proc.terminate()
                 logger.info("💀 Terminated lingering uvicorn PID %s", proc.info["pid"])
     except Exception as e:
         logger.warning("Cleanup failed: %s", e)
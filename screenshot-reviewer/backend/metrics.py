@@ -0,0 +1,223 @@
+"""In-process request metrics rendered in the Prometheus text exposition format.
+
+`TimingMiddleware` records a latency histogram per route and adds a
+Server-Timing header. Handlers can break their time down with `StageTimer`, and
+those stages go both into the header and into a per-stage histogram. Caches report
+hits and misses through `record_cache`. Everything lives in this process; with
+several uvicorn workers each worker exposes its own numbers.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "screenshot_reviewer"
+
+Labels = Tuple[str, ...]
+
+# Stages recorded while handling the current request, for the Server-Timing header.
+_REQUEST_STAGES: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = f"{PREFIX}_{name}"
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, labels: Labels = (), value: float = 0.0) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, labels: Labels) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labels, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {int(cumulative)}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+# Callables yielding (name, help, "gauge" | "counter", [(labels dict, value), ...]) at render time.
+COLLECTORS: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+REQUEST_LATENCY = Histogram("request_duration_seconds", "Request latency by route.", ("method", "handler"))
+REQUESTS = Counter("requests_total", "Requests by route and status code.", ("method", "handler", "status"))
+STAGE_LATENCY = Histogram("stage_duration_seconds", "Time spent in each stage of a handler.", ("handler", "stage"))
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+DATASET_ITEMS = Gauge("dataset_items", "Screenshots in the currently cached dataset view.")
+
+
+def record_cache(cache: str, *, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_LOOKUPS.inc((cache, "hit"), hits)
+    if misses:
+        CACHE_LOOKUPS.inc((cache, "miss"), misses)
+
+
+class StageTimer:
+    """Split a handler into named stages: call `mark(stage)` after each one finishes."""
+
+    def __init__(self, handler: str) -> None:
+        self.handler = handler
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed, self._last = now - self._last, now
+        STAGE_LATENCY.observe((self.handler, stage), elapsed)
+        stages = _REQUEST_STAGES.get()
+        if stages is not None:
+            stages.append((stage, elapsed))
+        return elapsed
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in COLLECTORS:
+        for name, help_text, kind, samples in collect():
+            full_name = f"{PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{full_name}{_format_labels(names, tuple(labels.values()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _server_timing(stages: List[Tuple[str, float]], total: float) -> bytes:
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class TimingMiddleware:
+    """ASGI middleware: per-route latency histogram, status counter and Server-Timing header."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages: List[Tuple[str, float]] = []
+        token = _REQUEST_STAGES.set(stages)
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stages, time.perf_counter() - started)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _REQUEST_STAGES.reset(token)
+            # Label by route name (the endpoint function or mount name): stable across
+            # router prefixes, and unmatched paths share one label to bound cardinality.
+            handler = getattr(scope.get("route"), "name", None) or "unmatched"
+            labels = (scope.get("method", ""), handler)
+            REQUEST_LATENCY.observe(labels, time.perf_counter() - started)
+            REQUESTS.inc(labels + (str(status),))
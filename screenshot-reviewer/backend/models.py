@@ -52,6 +52,30 @@ class BatchUpdateRequest(BaseModel):
     payload: ScreenshotUpdate
 
 
+class BulkPatch(ScreenshotUpdate):
+    """One line of a bulk NDJSON body: the target id plus the fields to change."""
+
+    id: str
+
+
+class BulkItemResult(BaseModel):
+    line: int
+    id: Optional[str] = None
+    status: Literal["updated", "not_found", "invalid"]
+    error: Optional[str] = None
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    items: List[BulkItemResult]
+
+
+class SelectionDelta(BaseModel):
+    ids: List[str]
+    timestamp: Optional[str] = None
+
+
 class ReclassifyRequest(BaseModel):
     ids: List[str]
     new_category: Optional[str] = None
@@ -106,6 +130,11 @@ class ScreenshotFilter(str, Enum):
     RE_REVIEW = "re-review"
 
 
+class ScreenshotView(str, Enum):
+    GRID = "grid"
+    DETAIL = "detail"
+
+
 class GroupSummary(BaseModel):
     group_id: str
     size: int
@@ -118,4 +147,31 @@ class GroupsPayload(BaseModel):
     current_index: int = 0
 
 
+class DuplicateCluster(BaseModel):
+    representative_id: str
+    size: int
+    ids: List[str]
+    paths: List[str]
+
+
+class SimilarScreenshot(BaseModel):
+    id: str
+    path: str
+    score: float
+    summary: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+
+
+class SimilarScreenshotsResponse(BaseModel):
+    id: str
+    items: List[SimilarScreenshot]
+
+
+class DuplicateClustersResponse(BaseModel):
+    clusters: List[DuplicateCluster]
+    max_distance: int
+    total_clusters: int
+    redundant: int
+
+
 PaginatedResponse.model_rebuild()
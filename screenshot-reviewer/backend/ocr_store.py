@@ -0,0 +1,98 @@
+"""Read-only access to the content-addressed OCR store written by ocr_screenshots.py."""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .metrics import record_cache
+from .storage import DATA_DIR
+
+# ocr_store.py lives at the repository root; the schema and query helpers are shared from there.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ocr_store import DEFAULT_STORE_NAME, connect_readonly, read_texts  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+OCR_STORE_FILE = Path(os.getenv("OCR_STORE_PATH", str(DATA_DIR / DEFAULT_STORE_NAME)))
+CACHE_SIZE = 4096
+
+_LOCAL = threading.local()
+_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def item_hash(item: dict) -> Optional[str]:
+    """Return the file hash the OCR store is keyed by, if the record carries one."""
+    return item.get("ocr_hash") or item.get("hash")
+
+
+def _connection() -> Optional[sqlite3.Connection]:
+    conn = getattr(_LOCAL, "conn", None)
+    path = getattr(_LOCAL, "path", None)
+    if conn is not None and path == OCR_STORE_FILE:
+        return conn
+    if not OCR_STORE_FILE.exists():
+        return None
+    conn = connect_readonly(OCR_STORE_FILE)
+    _LOCAL.conn = conn
+    _LOCAL.path = OCR_STORE_FILE
+    return conn
+
+
+def get_ocr_texts(hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+    """Fetch OCR text for the given hashes, serving repeats from an in-process LRU."""
+    wanted = [value for value in dict.fromkeys(hashes) if value]
+    found: Dict[str, str] = {}
+    missing = []
+    with _CACHE_LOCK:
+        for value in wanted:
+            if value in _CACHE:
+                _CACHE.move_to_end(value)
+                found[value] = _CACHE[value]
+            else:
+                missing.append(value)
+    record_cache("ocr_text", hits=len(found), misses=len(missing))
+    if not missing:
+        return found
+
+    conn = _connection()
+    if conn is None:
+        return found
+    try:
+        found.update(read_texts(conn, missing))
+    except sqlite3.Error as exc:
+        logger.warning("OCR store lookup failed: %s", exc)
+        return found
+
+    with _CACHE_LOCK:
+        for value in missing:
+            if value in found:
+                _CACHE[value] = found[value]
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return found
+
+
+def get_ocr_text(item: dict) -> str:
+    """Inline ocr_text if present, otherwise the stored text for the record's hash."""
+    if item.get("ocr_text"):
+        return item["ocr_text"]
+    value = item_hash(item)
+    if not value:
+        return ""
+    return get_ocr_texts([value]).get(value, "")
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
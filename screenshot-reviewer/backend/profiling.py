@@ -0,0 +1,165 @@
+"""Opt-in per-request profiling for the offloaded route handlers.
+
+Off unless PROFILING=1 is set at startup; when off, neither the middleware nor the
+handler wrapper is installed. When on, a request carrying ``X-Profile: 1`` or
+``?profile=1`` runs its handler under a profiler and the output is written to
+PROFILES_DIR, keeping the newest PROFILE_RETENTION files. The response names the
+file in an ``X-Profile-File`` header.
+
+PROFILER_MODE=sample (default) samples the handler thread's stack every
+PROFILE_INTERVAL_MS and writes ``.folded`` stacks that flamegraph.pl, speedscope and
+inferno read directly. PROFILER_MODE=cprofile writes a cProfile ``.prof`` dump for
+pstats or snakeviz instead.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from .storage import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("PROFILING", "false").lower() in {"1", "true", "yes"}
+MODE = os.getenv("PROFILER_MODE", "sample").lower()
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", str(DATA_DIR / "profiles")))
+RETENTION = int(os.getenv("PROFILE_RETENTION", "20"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "2")) / 1000
+
+_TRUTHY = {"1", "true", "yes"}
+# Set by the middleware for requests that asked to be profiled: {"label": ..., "file": ...}.
+_REQUEST: ContextVar[Optional[Dict[str, Any]]] = ContextVar("profile_request", default=None)
+
+
+class StackSampler:
+    """Counts root→leaf stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id: int, *, interval: float = SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _prune(directory: Path, keep: int) -> None:
+    profiles = sorted(
+        (path for path in directory.iterdir() if path.suffix in {".folded", ".prof"}),
+        key=lambda path: (path.stat().st_mtime_ns, path.name),
+    )
+    for path in profiles[: max(len(profiles) - keep, 0)]:
+        path.unlink(missing_ok=True)
+
+
+def _run_profiled(request: Dict[str, Any], func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    stem = f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S-%f}-{request['label']}"
+    started = time.perf_counter()
+    if MODE == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            path = PROFILES_DIR / f"{stem}.prof"
+            PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            _finish(request, path, started)
+
+    sampler = StackSampler(threading.get_ident())
+    try:
+        with sampler:
+            return func(*args, **kwargs)
+    finally:
+        path = PROFILES_DIR / f"{stem}.folded"
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(sampler.folded(), encoding="utf-8")
+        _finish(request, path, started)
+
+
+def _finish(request: Dict[str, Any], path: Path, started: float) -> None:
+    request["file"] = path.name
+    _prune(PROFILES_DIR, RETENTION)
+    logger.info("🔬 Profiled %s in %.1f ms → %s", request["label"], (time.perf_counter() - started) * 1000, path)
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a sync handler so it runs under the profiler when its request asked for it."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        request = _REQUEST.get()
+        if request is None:
+            return func(*args, **kwargs)
+        return _run_profiled(request, func, args, kwargs)
+
+    return wrapper
+
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile" and value.decode("latin-1").lower() in _TRUTHY:
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.lower() in _TRUTHY for value in query.get("profile", []))
+
+
+class ProfilingMiddleware:
+    """Marks opted-in requests for profiling and reports the written file in a header."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        label = re.sub(r"[^a-z0-9]+", "-", f"{scope.get('method', '')} {scope.get('path', '')}".lower()).strip("-")
+        request: Dict[str, Any] = {"label": label[:80], "file": None}
+        token = _REQUEST.set(request)
+
+        async def send_with_profile(message) -> None:
+            if message["type"] == "http.response.start" and request["file"]:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", request["file"].encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _REQUEST.reset(token)
@@ -0,0 +1,171 @@
+"""Compact in-memory screenshot records.
+
+`ScreenshotRecord` keeps the hot fields in `__slots__` instead of a per-item dict,
+interns status/category/tag strings so repeated values share one object, and holds
+heavy fields lazily: `llama_result` stays as compact JSON bytes until read, and a
+missing `ocr_text` is fetched from the LRU-cached OCR store when accessed. Keys the
+class does not know about survive round trips in a small `_extra` dict.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Screenshot
+from .ocr_store import get_ocr_text
+from .serialization import dumps, loads
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING: Any = _Missing()
+
+# Plain string fields, in the order they appear in screenshots.json.
+_STRING_FIELDS = (
+    "id",
+    "filename",
+    "path",
+    "summary",
+    "created_at",
+    "updated_at",
+    "defer_until",
+    "group_id",
+    "hash",
+    "ocr_hash",
+    "phash",
+    "dhash",
+    "propagated_from",
+    "validated",
+)
+# Low-cardinality strings worth interning.
+_INTERNED_FIELDS = ("status", "primary_category", "year_month")
+_TAG_FIELDS = ("tags", "tags_ai", "suggestions")
+_OTHER_FIELDS = ("confidence", "processed", "year")
+_KNOWN = frozenset(_STRING_FIELDS + _INTERNED_FIELDS + _TAG_FIELDS + _OTHER_FIELDS + ("ocr_text", "llama_result"))
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class ScreenshotRecord:
+    __slots__ = (
+        *_STRING_FIELDS,
+        *_INTERNED_FIELDS,
+        *_TAG_FIELDS,
+        *_OTHER_FIELDS,
+        "_ocr_text",
+        "_llama_result",
+        "_extra",
+    )
+
+    def __init__(self) -> None:
+        for name in self.__slots__:
+            object.__setattr__(self, name, _MISSING)
+        self._extra = None
+
+    # ── conversion ─────────────────────────────
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScreenshotRecord":
+        record = cls()
+        extra: Optional[Dict[str, Any]] = None
+        for key, value in data.items():
+            if key in _INTERNED_FIELDS:
+                setattr(record, key, _intern(value))
+            elif key in _TAG_FIELDS:
+                setattr(record, key, tuple(_intern(tag) for tag in value) if isinstance(value, list) else value)
+            elif key == "ocr_text":
+                record._ocr_text = value
+            elif key == "llama_result":
+                record._llama_result = dumps(value, pretty=False)
+            elif key in _KNOWN:
+                setattr(record, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[sys.intern(key)] = value
+        record._extra = extra
+        return record
+
+    def _items(self, *, include_heavy: bool) -> Iterator[Tuple[str, Any]]:
+        for name in (*_STRING_FIELDS, *_INTERNED_FIELDS, *_OTHER_FIELDS):
+            value = getattr(self, name)
+            if value is not _MISSING:
+                yield name, value
+        for name in _TAG_FIELDS:
+            value = getattr(self, name)
+            if value is not _MISSING:
+                yield name, list(value) if isinstance(value, tuple) else value
+        if include_heavy:
+            if self._ocr_text is not _MISSING:
+                yield "ocr_text", self._ocr_text
+            if self._llama_result is not _MISSING:
+                yield "llama_result", self.llama_result
+        if self._extra:
+            yield from self._extra.items()
+
+    def to_dict(self, *, include_heavy: bool = True) -> Dict[str, Any]:
+        """The JSON shape this record was built from (key order aside)."""
+        return dict(self._items(include_heavy=include_heavy))
+
+    def to_model(self, **overrides: Any) -> Screenshot:
+        data = self.to_dict(include_heavy=False)
+        data["ocr_text"] = self.ocr_text or None
+        data.update(overrides)
+        return Screenshot.model_validate(data)
+
+    # ── heavy fields ───────────────────────────
+    @property
+    def llama_result(self) -> Any:
+        if self._llama_result is _MISSING:
+            return None
+        return loads(self._llama_result)
+
+    @property
+    def ocr_text(self) -> str:
+        """Inline OCR text, otherwise the OCR store's text for this record's hash."""
+        if self._ocr_text is _MISSING:
+            return get_ocr_text(self)
+        return self._ocr_text or ""
+
+    # ── dict-style read access ─────────────────
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "ocr_text":
+            # Mirror dict semantics: only inline text counts as present.
+            return default if self._ocr_text is _MISSING else self._ocr_text
+        if key == "llama_result":
+            return default if self._llama_result is _MISSING else self.llama_result
+        if key in _KNOWN:
+            value = getattr(self, key)
+            if value is _MISSING:
+                return default
+            return list(value) if key in _TAG_FIELDS and isinstance(value, tuple) else value
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __repr__(self) -> str:
+        return f"ScreenshotRecord(id={self.get('id')!r}, path={self.get('path')!r})"
+
+
+def to_records(items: Iterable[Dict[str, Any]]) -> List[ScreenshotRecord]:
+    return [ScreenshotRecord.from_dict(item) for item in items]
+
+
+def as_dict(item: Any, *, include_heavy: bool = True) -> Dict[str, Any]:
+    """Shallow dict copy of a record or a plain dict.
+
+    ``include_heavy=False`` leaves out a record's ocr_text and llama_result.
+    """
+    if isinstance(item, ScreenshotRecord):
+        return item.to_dict(include_heavy=include_heavy)
+    return dict(item)
@@ -7,12 +7,13 @@ from datetime import datetime
 from typing import List
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
+from fastapi import HTTPException
 
+from ..executors import OffloadingRouter, cpu_bound
 from ..models import Category, CategoryCreate, CategoryUpdate, ScreenshotStatus
-from ..storage import get_item_or_404, load_categories, load_screenshots, save_categories
+from ..storage import categories_transaction, get_item_or_404, load_categories, load_screenshots
 
-router = APIRouter()
+router = OffloadingRouter()
 logger = logging.getLogger(__name__)
 
 FALLBACK_CATEGORIES = [
@@ -39,6 +40,7 @@ def _annotate_counts(categories: List[dict]) -> List[Category]:
 
 
 @router.get("/", response_model=List[Category])
+@cpu_bound
 def list_categories():
     try:
         categories = load_categories()
@@ -59,17 +61,16 @@ def list_categories():
 @router.post("/", response_model=Category, status_code=201)
 def create_category(payload: CategoryCreate):
     try:
-        categories = load_categories()
-        if any(cat.get("name", "").lower() == payload.name.lower() for cat in categories):
-            raise HTTPException(status_code=409, detail="Category name already exists")
-        category = {
-            "id": uuid4().hex,
-            "name": payload.name,
-            "description": payload.description,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        categories.append(category)
-        save_categories(categories)
+        with categories_transaction() as categories:
+            if any(cat.get("name", "").lower() == payload.name.lower() for cat in categories):
+                raise HTTPException(status_code=409, detail="Category name already exists")
+            category = {
+                "id": uuid4().hex,
+                "name": payload.name,
+                "description": payload.description,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            categories.append(category)
         return _annotate_counts([category])[0]
     except HTTPException:
         raise
@@ -81,16 +82,15 @@ def create_category(payload: CategoryCreate):
 @router.put("/{category_id}", response_model=Category)
 def update_category(category_id: str, payload: CategoryUpdate):
     try:
-        categories = load_categories()
-        category = get_item_or_404(categories, category_id, entity="Category")
-        update_data = payload.model_dump(exclude_unset=True)
-        if "name" in update_data:
-            candidate = update_data["name"].lower()
-            if any(cat.get("id") != category_id and cat.get("name", "").lower() == candidate for cat in categories):
-                raise HTTPException(status_code=409, detail="Category name already exists")
-        category.update(update_data)
-        category["updated_at"] = datetime.utcnow().isoformat()
-        save_categories(categories)
+        with categories_transaction() as categories:
+            category = get_item_or_404(categories, category_id, entity="Category")
+            update_data = payload.model_dump(exclude_unset=True)
+            if "name" in update_data:
+                candidate = update_data["name"].lower()
+                if any(cat.get("id") != category_id and cat.get("name", "").lower() == candidate for cat in categories):
+                    raise HTTPException(status_code=409, detail="Category name already exists")
+            category.update(update_data)
+            category["updated_at"] = datetime.utcnow().isoformat()
         return _annotate_counts([category])[0]
     except HTTPException:
         raise
@@ -102,10 +102,9 @@ def update_category(category_id: str, payload: CategoryUpdate):
 @router.delete("/{category_id}", response_model=dict)
 def delete_category(category_id: str):
     try:
-        categories = load_categories()
-        category = get_item_or_404(categories, category_id, entity="Category")
-        categories = [cat for cat in categories if cat.get("id") != category_id]
-        save_categories(categories)
+        with categories_transaction() as categories:
+            get_item_or_404(categories, category_id, entity="Category")
+            categories[:] = [cat for cat in categories if cat.get("id") != category_id]
         return {"deleted": category_id}
     except HTTPException:
         raise
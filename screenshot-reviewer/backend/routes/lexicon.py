@@ -1,9 +1,11 @@
 """Routes for lexicon CRUD operations."""
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import HTTPException
 
-router = APIRouter()
+from ..executors import OffloadingRouter
+
+router = OffloadingRouter()
 
 import logging
 from datetime import datetime
@@ -11,7 +13,7 @@ from typing import List
 from uuid import uuid4
 
 from ..models import LexiconCreate, LexiconEntry
-from ..storage import get_item_or_404, load_lexicon, save_lexicon
+from ..storage import get_item_or_404, lexicon_transaction, load_lexicon
 
 #router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -45,18 +47,17 @@ def list_entries():
 @router.post("/", response_model=LexiconEntry, status_code=201)
 def create_entry(payload: LexiconCreate):
     try:
-        entries = load_lexicon()
         keyword = payload.keyword.strip().lower()
-        if any(entry.get("keyword", "").lower() == keyword for entry in entries):
-            raise HTTPException(status_code=409, detail="Keyword already exists")
-        entry = {
-            "id": uuid4().hex,
-            "keyword": payload.keyword.strip(),
-            "tags": payload.tags,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        entries.append(entry)
-        save_lexicon(entries)
+        with lexicon_transaction() as entries:
+            if any(entry.get("keyword", "").lower() == keyword for entry in entries):
+                raise HTTPException(status_code=409, detail="Keyword already exists")
+            entry = {
+                "id": uuid4().hex,
+                "keyword": payload.keyword.strip(),
+                "tags": payload.tags,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            entries.append(entry)
         return LexiconEntry.model_validate(entry)
     except HTTPException:
         raise
@@ -68,10 +69,9 @@ def create_entry(payload: LexiconCreate):
 @router.delete("/{entry_id}", response_model=dict)
 def delete_entry(entry_id: str):
     try:
-        entries = load_lexicon()
-        get_item_or_404(entries, entry_id, entity="Lexicon entry")
-        entries = [entry for entry in entries if entry.get("id") != entry_id]
-        save_lexicon(entries)
+        with lexicon_transaction() as entries:
+            get_item_or_404(entries, entry_id, entity="Lexicon entry")
+            entries[:] = [entry for entry in entries if entry.get("id") != entry_id]
         return {"deleted": entry_id}
     except HTTPException:
         raise
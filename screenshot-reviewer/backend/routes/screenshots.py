@@ -1,93 +1,122 @@
 """Routes for screenshot CRUD and batch operations."""
 from __future__ import annotations
 
-from fastapi import APIRouter
+from ..executors import IO_POOL, OffloadingRouter, cpu_bound
 
-router = APIRouter()
+router = OffloadingRouter()
 
 # Path to screenshots.json for simple listing endpoint
 from pathlib import Path
-import json
 SCREENSHOTS_FILE = Path(__file__).parent / "data" / "screenshots.json"
 
 import logging
 import os
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import quote
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Query
+import numpy as np
+from fastapi import HTTPException, Query, Request, Response
+from pydantic import ValidationError
 
+from ..columns import dataset_columns, group_id_for, parse_group_id
+from ..duplicates import DEFAULT_MAX_DISTANCE, cluster_near_duplicates
+from ..file_presence import PRESENCE
+from ..metrics import StageTimer
 from ..models import (
     BatchUpdateRequest,
-    GroupsPayload,
-    GroupSummary,
+    BulkItemResult,
+    BulkPatch,
+    BulkUpdateResponse,
+    DuplicateCluster,
+    DuplicateClustersResponse,
     PaginatedResponse,
     Screenshot,
     ScreenshotFilter,
     ScreenshotStatus,
     ScreenshotUpdate,
+    ScreenshotView,
     ReclassifyRequest,
+    SimilarScreenshot,
+    SimilarScreenshotsResponse,
 )
-from ..storage import load_lexicon, load_screenshots, save_screenshots
+from ..ocr_store import get_ocr_text, get_ocr_texts, item_hash
+from ..serialization import dumps, load_file
+from ..similarity import get_index
+from ..storage import DURABILITY_SYNC, load_lexicon, load_screenshots, screenshots_transaction
+from ..validation import mark_validated, screenshot_payload
 
 #router = APIRouter()
 logger = logging.getLogger(__name__)
 
-LOW_CONFIDENCE_THRESHOLD = 0.6
-GROUP_WINDOW_MINUTES = 3
 FILES_BASE_URL = os.getenv("BACKEND_PUBLIC_URL", "http://127.0.0.1:8000")
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "2000"))
+
+# Item fields returned by each named view of the list endpoint; ``fields=`` overrides.
+VIEW_FIELDS: Dict[ScreenshotView, Tuple[str, ...]] = {
+    ScreenshotView.GRID: ("id", "path", "url", "summary", "primary_category", "status", "confidence", "group_id"),
+    ScreenshotView.DETAIL: tuple(Screenshot.model_fields),
+}
 
 
 def _enrich_screenshot(item: dict, base_url: str = FILES_BASE_URL) -> dict:
     path = item.get("path")
     enriched = item.copy()
+    enriched.pop("file_missing", None)
+    present = PRESENCE.check(path) if path else False
+    if present is None:
+        # Not swept in this process (e.g. a pool worker): use the flag the sweeper stored
+        present = item.get("file_missing") is False
 
-    if path and os.path.exists(path):
+    if present:
         filename = os.path.basename(path)
         base = base_url.rstrip("/")
         FILES_BASE_URL = os.getenv("BACKEND_PUBLIC_URL", "http://localhost:8000")
         #enriched["url"] = f"{base}/files/{quote(filename)}"
     else:
-        logger.warning("Missing file for screenshot %s: %s", item.get("id"), path)
+        if PRESENCE.report_missing(path or ""):
+            logger.warning("Missing file for screenshot %s: %s", item.get("id"), path)
         enriched["url"] = None
 
     return enriched
 
 
-def _match_filter(item: dict, *, filter_mode: ScreenshotFilter) -> bool:
-    status = str(item.get("status", ScreenshotStatus.PENDING.value))
-    confidence = float(item.get("confidence", 0) or 0)
-    if filter_mode == ScreenshotFilter.ALL:
-        return True
-    if filter_mode == ScreenshotFilter.PENDING:
-        no_category = not (item.get("primary_category") or "").strip()
-        return status in {ScreenshotStatus.PENDING.value, ScreenshotStatus.DEFERRED.value} or no_category
-    if filter_mode == ScreenshotFilter.DEFERRED:
-        return status == ScreenshotStatus.DEFERRED.value
-    if filter_mode == ScreenshotFilter.RE_REVIEW:
-        return status == ScreenshotStatus.RE_REVIEW.value
-    if filter_mode == ScreenshotFilter.LOW_CONFIDENCE:
-        return confidence < LOW_CONFIDENCE_THRESHOLD
-    return True
-
-
-def _apply_search(item: dict, search: str) -> bool:
+def _apply_search(item: dict, search: str, ocr_text: Optional[str] = None) -> bool:
     haystack = " ".join(
         [
-            item.get("path", ""),
-            item.get("summary", ""),
-            " ".join(item.get("tags", [])),
-            item.get("ocr_text", ""),
+            item.get("path") or "",
+            item.get("summary") or "",
+            " ".join(item.get("tags") or []),
+            (ocr_text if ocr_text is not None else item.get("ocr_text")) or "",
         ]
     ).lower()
     return search.lower() in haystack
 
 
-def _generate_suggestions(item: dict) -> List[str]:
-    lexicon = load_lexicon()
-    text = f"{item.get('path', '')} {item.get('ocr_text', '')}".lower()
+def _search(items: List[dict], search: str) -> List[dict]:
+    """Match cheap fields first and fetch stored OCR text only for records still unmatched."""
+    matched = {id(item) for item in items if _apply_search(item, search)}
+    pending = [item for item in items if id(item) not in matched and not item.get("ocr_text")]
+    texts = get_ocr_texts(item_hash(item) for item in pending)
+    for item in pending:
+        text = texts.get(item_hash(item) or "")
+        if text and _apply_search(item, search, text):
+            matched.add(id(item))
+    return [item for item in items if id(item) in matched]
+
+
+def _generate_suggestions(
+    item: dict,
+    *,
+    lexicon: Optional[List[dict]] = None,
+    ocr_text: Optional[str] = None,
+) -> List[str]:
+    if lexicon is None:
+        lexicon = load_lexicon()
+    if ocr_text is None:
+        ocr_text = get_ocr_text(item)
+    text = f"{item.get('path') or ''} {ocr_text}".lower()
     suggestions: List[str] = []
     for entry in lexicon:
         keyword = entry.get("keyword", "").lower()
@@ -105,86 +134,23 @@ def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
         return None
 
 
-def _bucket_id(created_at: Optional[datetime]) -> str:
-    if created_at is None:
-        return "grp-unknown"
-    window_seconds = GROUP_WINDOW_MINUTES * 60
-    bucket = int(created_at.timestamp()) // window_seconds
-    return f"grp-{bucket}"
-
-
-def _infer_groups(items: List[dict]) -> GroupsPayload:
-    if not items:
-        return GroupsPayload(items=[], current_index=0)
-
-    groups: dict[str, List[dict]] = {}
-    for entry in items:
-        created_at = _parse_datetime(entry.get("created_at"))
-        group_key = _bucket_id(created_at)
-        groups.setdefault(group_key, []).append(entry)
-        entry["group_id"] = group_key
-
-    summaries: List[GroupSummary] = []
-    for group_id, group_items in groups.items():
-        group_items.sort(
-            key=lambda entry: _parse_datetime(entry.get("created_at")) or datetime.min.replace(tzinfo=timezone.utc)
-        )
-        summaries.append(
-            GroupSummary(
-                group_id=group_id,
-                size=len(group_items),
-                start=_parse_datetime(group_items[0].get("created_at")),
-                end=_parse_datetime(group_items[-1].get("created_at")),
-            )
-        )
-
-    summaries.sort(key=lambda summary: summary.start or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-    return GroupsPayload(items=summaries, current_index=0)
-
-
-def _with_groups(items: List[dict], group_id: Optional[str]) -> tuple[List[dict], GroupsPayload]:
-    payload = _infer_groups(items)
-    if group_id:
-        for index, group in enumerate(payload.items):
-            if group.group_id == group_id:
-                payload.current_index = index
-                filtered = [entry for entry in items if entry.get("group_id") == group_id]
-                return filtered, payload
-        return [], payload
-    return items, payload
+def _resolve_fields(view: ScreenshotView, fields: Optional[str]) -> Tuple[str, ...]:
+    """Item fields for a list request; ``id`` is always included."""
+    if fields is None:
+        return VIEW_FIELDS[view]
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(Screenshot.model_fields))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *requested]))
 
 
-def _paginate(items: List[dict], page: int, page_size: int) -> List[dict]:
+def _paginate(items: Sequence, page: int, page_size: int) -> Sequence:
     start = max(page - 1, 0) * page_size
     end = start + page_size
     return items[start:end]
 
 
-def _build_progress(dataset: List[dict]) -> dict:
-    total = len(dataset)
-    reviewed = sum(
-        1 for item in dataset if str(item.get("status")) == ScreenshotStatus.REVIEWED.value
-    )
-    deferred = sum(
-        1 for item in dataset if str(item.get("status")) == ScreenshotStatus.DEFERRED.value
-    )
-    re_review = sum(
-        1 for item in dataset if str(item.get("status")) == ScreenshotStatus.RE_REVIEW.value
-    )
-    deleted = sum(
-        1 for item in dataset if str(item.get("status")) == ScreenshotStatus.DELETED.value
-    )
-    remaining = total - reviewed - deleted
-    return {
-        "total": total,
-        "reviewed": reviewed,
-        "deferred": deferred,
-        "re_review": re_review,
-        "deleted": deleted,
-        "remaining": remaining,
-    }
-
-
 @router.get("/ping", summary="Health check")
 def ping():
     return {"status": "ok", "route": "screenshots"}
@@ -194,13 +160,13 @@ def ping():
 def list_screenshots_simple():
     if not SCREENSHOTS_FILE.exists():
         raise HTTPException(status_code=404, detail="screenshots.json not found")
-    with open(SCREENSHOTS_FILE, "r") as f:
-        data = json.load(f)
+    data = load_file(SCREENSHOTS_FILE)
     return {"count": len(data), "items": data[:10]}
 
 
 # The original paginated/filtered endpoint remains unchanged below.
 @router.get("/", response_model=PaginatedResponse)
+@cpu_bound
 def list_screenshots(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
@@ -208,76 +174,148 @@ def list_screenshots(
     category: Optional[str] = None,
     search: Optional[str] = None,
     group_id: Optional[str] = None,
+    view: ScreenshotView = ScreenshotView.DETAIL,
+    fields: Optional[str] = None,
 ):
+    selected_fields = _resolve_fields(view, fields)
+    wanted = set(selected_fields)
     try:
-        dataset = load_screenshots()
-
-        # Filter by category
-        if category:
-            dataset = [item for item in dataset if item.get("primary_category") == category]
-
-        # Pending filter
-        if filter == ScreenshotFilter.PENDING:
-            dataset = [item for item in dataset if not (item.get("primary_category") or "").strip()]
+        timer = StageTimer("list_screenshots")
+        dataset_view = dataset_columns(load_screenshots)
+        timer.mark("load")
 
-        # Match filter mode
-        dataset = [item for item in dataset if _match_filter(item, filter_mode=filter)]
+        # Category, filter mode and confidence as vectorised masks
+        indices = np.flatnonzero(dataset_view.filter_mask(filter, category=category))
+        timer.mark("filter")
 
         # Search filter
         if search:
-            dataset = [item for item in dataset if _apply_search(item, search)]
+            candidates = [dataset_view.records[row] for row in indices]
+            matched = {id(item) for item in _search(candidates, search)}
+            indices = np.array(
+                [row for row, item in zip(indices, candidates) if id(item) in matched], dtype=np.int64
+            )
+            timer.mark("search")
 
         # Sort newest first
-        dataset.sort(
-            key=lambda entry: _parse_datetime(entry.get("created_at"))
-            or datetime.min.replace(tzinfo=timezone.utc),
-            reverse=True,
-        )
-
-        # Add IDs and suggestions
-        for item in dataset:
-            item.setdefault("id", uuid4().hex)
-            item["suggestions"] = _generate_suggestions(item)
+        indices = dataset_view.newest_first(indices)
+        timer.mark("sort")
 
         # Handle grouping and pagination
-        paginated_source, groups = _with_groups(dataset, group_id)
-        total = len(paginated_source)
+        groups, keys = dataset_view.groups(indices)
+        if group_id:
+            position = next((i for i, group in enumerate(groups.items) if group.group_id == group_id), None)
+            if position is not None:
+                groups.current_index = position
+            group_mask = keys == parse_group_id(group_id) if position is not None else np.zeros(len(keys), bool)
+            indices = indices[group_mask]
+            keys = keys[group_mask]
+        timer.mark("group")
+        total = len(indices)
         total_pages = max((total - 1) // page_size + 1, 1)
         page = min(page, total_pages)
-        page_items = _paginate(paginated_source, page, page_size)
-
-        # Enrich and validate
-        enriched_items = [_enrich_screenshot(item) for item in page_items]
-        screenshots = [Screenshot.model_validate(enriched) for enriched in enriched_items]
+        page_rows = _paginate(indices, page, page_size)
+        # OCR text is only needed for the ocr_text field itself or to compute suggestions
+        page_items = dataset_view.materialize(page_rows, include_heavy=bool(wanted & {"ocr_text", "suggestions"}))
+        for item, key in zip(page_items, _paginate(keys, page, page_size)):
+            if "id" not in item:
+                item["id"] = uuid4().hex
+            item["group_id"] = group_id_for(int(key))
+        timer.mark("paginate")
+
+        # Suggestions only for the visible page, with stored OCR fetched in one query
+        if "suggestions" in wanted:
+            lexicon = load_lexicon()
+            ocr_texts = get_ocr_texts(item_hash(item) for item in page_items if not item.get("ocr_text"))
+            for item in page_items:
+                ocr_text = item.get("ocr_text") or ocr_texts.get(item_hash(item) or "", "")
+                item["suggestions"] = _generate_suggestions(item, lexicon=lexicon, ocr_text=ocr_text)
+            timer.mark("suggest")
+
+        # Enrich; records validated at write time skip pydantic entirely
+        projection_fields = None if wanted.issuperset(Screenshot.model_fields) else selected_fields
+        screenshots = [
+            screenshot_payload(
+                _enrich_screenshot(item) if "url" in wanted else item,
+                trusted=bool(dataset_view.validated[row]),
+                fields=projection_fields,
+            )
+            for item, row in zip(page_items, page_rows)
+        ]
+        timer.mark("validate")
 
-        # Build progress even if dataset empty
-        progress = _build_progress(load_screenshots())
         groups.current_index = min(groups.current_index, max(len(groups.items) - 1, 0))
 
-        # ✅ Always return 200, even if no items
-        return PaginatedResponse(
-            items=screenshots,
-            page=page,
-            page_size=page_size,
-            total=total,
-            total_pages=total_pages,
-            progress=progress,
-            groups=groups,
-        )
+        # ✅ Always return 200, even if no items. The body is serialized here rather than
+        # re-validated through response_model, which stays on the route for the schema.
+        payload = {
+            "items": screenshots,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": total_pages,
+            "progress": dataset_view.progress(),
+            "groups": groups.model_dump(mode="json"),
+        }
+        body = dumps(payload, pretty=False)
+        timer.mark("serialize")
+        return Response(content=body, media_type="application/json")
 
+    except HTTPException:
+        raise
     except Exception as exc:  # pragma: no cover
         logger.exception("Error in list_screenshots")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@router.get("/duplicates", response_model=DuplicateClustersResponse)
+@cpu_bound
+def list_duplicate_clusters(
+    max_distance: int = Query(DEFAULT_MAX_DISTANCE, ge=0, le=64),
+    include_deleted: bool = False,
+):
+    """Near-duplicate clusters by perceptual hash, oldest shot first in each cluster."""
+    try:
+        dataset = load_screenshots()
+        if not include_deleted:
+            dataset = [
+                item for item in dataset if str(item.get("status")) != ScreenshotStatus.DELETED.value
+            ]
+        dataset.sort(
+            key=lambda entry: _parse_datetime(entry.get("created_at"))
+            or datetime.min.replace(tzinfo=timezone.utc)
+        )
+        clusters = [
+            DuplicateCluster(
+                representative_id=str(members[0].get("id")),
+                size=len(members),
+                ids=[str(member.get("id")) for member in members],
+                paths=[member.get("path") or "" for member in members],
+            )
+            for members in cluster_near_duplicates(dataset, max_distance=max_distance)
+        ]
+        clusters.sort(key=lambda cluster: cluster.size, reverse=True)
+        return DuplicateClustersResponse(
+            clusters=clusters,
+            max_distance=max_distance,
+            total_clusters=len(clusters),
+            redundant=sum(cluster.size - 1 for cluster in clusters),
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.exception("Error in list_duplicate_clusters")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
 @router.get("/{screenshot_id}", response_model=Screenshot)
 def get_screenshot(screenshot_id: str):
     try:
         dataset = load_screenshots()
         for item in dataset:
             if item.get("id") == screenshot_id:
-                item["suggestions"] = _generate_suggestions(item)
+                ocr_text = get_ocr_text(item)
+                item["suggestions"] = _generate_suggestions(item, ocr_text=ocr_text)
                 enriched = _enrich_screenshot(item)
+                enriched["ocr_text"] = ocr_text or None
                 return Screenshot.model_validate(enriched)
         raise HTTPException(status_code=404, detail="Screenshot not found")
     except HTTPException:
@@ -287,23 +325,57 @@ def get_screenshot(screenshot_id: str):
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@router.get("/{screenshot_id}/similar", response_model=SimilarScreenshotsResponse)
+@cpu_bound
+def similar_screenshots(screenshot_id: str, k: int = Query(10, ge=1, le=100)):
+    """Screenshots whose tags, summary and OCR text are closest by cosine similarity."""
+    try:
+        dataset = load_screenshots()
+        by_id = {item.get("id"): item for item in dataset if item.get("id")}
+        if screenshot_id not in by_id:
+            raise HTTPException(status_code=404, detail="Screenshot not found")
+        index = get_index(dataset)
+        items = []
+        for key, score in index.similar(screenshot_id, k):
+            item = by_id.get(key)
+            if item is None or str(item.get("status")) == ScreenshotStatus.DELETED.value:
+                continue
+            items.append(
+                SimilarScreenshot(
+                    id=key,
+                    path=item.get("path") or "",
+                    score=round(score, 4),
+                    summary=item.get("summary"),
+                    tags=item.get("tags") or [],
+                )
+            )
+        return SimilarScreenshotsResponse(id=screenshot_id, items=items)
+    except HTTPException:
+        raise
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.exception("Error in similar_screenshots")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
 @router.put("/{screenshot_id}", response_model=Screenshot)
 def update_screenshot(screenshot_id: str, payload: ScreenshotUpdate):
     try:
-        dataset = load_screenshots()
         updated_item = None
-        for item in dataset:
-            if item.get("id") == screenshot_id:
-                update_data = payload.model_dump(exclude_unset=True)
-                if isinstance(update_data.get("status"), ScreenshotStatus):
-                    update_data["status"] = update_data["status"].value
-                item.update(update_data)
-                item["updated_at"] = datetime.now(timezone.utc).isoformat()
-                updated_item = item
-                break
-        if not updated_item:
-            raise HTTPException(status_code=404, detail="Screenshot not found")
-        save_screenshots(dataset)
+        with screenshots_transaction() as dataset:
+            for item in dataset:
+                if item.get("id") == screenshot_id:
+                    update_data = payload.model_dump(exclude_unset=True)
+                    if isinstance(update_data.get("status"), ScreenshotStatus):
+                        update_data["status"] = update_data["status"].value
+                    item.update(update_data)
+                    item["updated_at"] = datetime.now(timezone.utc).isoformat()
+                    mark_validated(item)
+                    # Copy: the record may be the write buffer's live working copy, and the
+                    # response-only fields added below must never be persisted.
+                    updated_item = dict(item)
+                    break
+            if not updated_item:
+                raise HTTPException(status_code=404, detail="Screenshot not found")
         updated_item["suggestions"] = _generate_suggestions(updated_item)
         enriched = _enrich_screenshot(updated_item)
         return Screenshot.model_validate(enriched)
@@ -317,7 +389,6 @@ def update_screenshot(screenshot_id: str, payload: ScreenshotUpdate):
 @router.post("/batch", response_model=dict)
 def batch_update(batch_request: BatchUpdateRequest):
     try:
-        dataset = load_screenshots()
         id_set = set(batch_request.ids)
         if not id_set:
             raise HTTPException(status_code=400, detail="No screenshot ids provided")
@@ -329,14 +400,15 @@ def batch_update(batch_request: BatchUpdateRequest):
 
         updated = 0
         timestamp = datetime.now(timezone.utc).isoformat()
-        for item in dataset:
-            if item.get("id") in id_set:
-                item.update(update_data)
-                item["updated_at"] = timestamp
-                updated += 1
-        if not updated:
-            raise HTTPException(status_code=404, detail="No screenshots updated")
-        save_screenshots(dataset)
+        with screenshots_transaction() as dataset:
+            for item in dataset:
+                if item.get("id") in id_set:
+                    item.update(update_data)
+                    item["updated_at"] = timestamp
+                    mark_validated(item)
+                    updated += 1
+            if not updated:
+                raise HTTPException(status_code=404, detail="No screenshots updated")
         return {"updated": updated}
     except HTTPException:
         raise
@@ -345,10 +417,100 @@ def batch_update(batch_request: BatchUpdateRequest):
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """(1-based line number, line) for each non-blank line of a streamed NDJSON body."""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+class _NoMatches(Exception):
+    """Aborts a bulk transaction that would not change anything, skipping the write."""
+
+
+def _apply_bulk_patches(patches: List[Tuple[int, BulkPatch]]) -> List[BulkItemResult]:
+    results: List[BulkItemResult] = []
+    timestamp = datetime.now(timezone.utc).isoformat()
+    try:
+        with screenshots_transaction(durability=DURABILITY_SYNC) as dataset:
+            wanted = {patch.id for _, patch in patches}
+            index = {item.get("id"): item for item in dataset if item.get("id") in wanted}
+            touched: Dict[int, dict] = {}
+            for line, patch in patches:
+                item = index.get(patch.id)
+                if item is None:
+                    results.append(BulkItemResult(line=line, id=patch.id, status="not_found"))
+                    continue
+                update_data = patch.model_dump(exclude_unset=True, exclude={"id"})
+                if isinstance(update_data.get("status"), ScreenshotStatus):
+                    update_data["status"] = update_data["status"].value
+                item.update(update_data)
+                item["updated_at"] = timestamp
+                touched[id(item)] = item
+                results.append(BulkItemResult(line=line, id=patch.id, status="updated"))
+            if not touched:
+                raise _NoMatches
+            # Several patches may target one id; validate each record once, after all of them.
+            for item in touched.values():
+                mark_validated(item)
+    except _NoMatches:
+        pass
+    return results
+
+
+@router.post("/bulk", response_model=BulkUpdateResponse)
+async def bulk_update(request: Request):
+    """Apply per-id patches from an NDJSON body in one read-modify-write.
+
+    Each line is ``{"id": ..., <ScreenshotUpdate fields>}``; lines are applied in
+    order. Bad lines and unknown ids are reported per item instead of failing the
+    whole request, and the file is written once for all matching patches, before
+    the response is sent (together with any coalesced edits still queued).
+    """
+    try:
+        patches: List[Tuple[int, BulkPatch]] = []
+        results: List[BulkItemResult] = []
+        async for line, raw in _ndjson_lines(request.stream()):
+            if len(patches) + len(results) >= BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} patches per request")
+            try:
+                patch = BulkPatch.model_validate_json(raw)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                where = ".".join(str(part) for part in error["loc"])
+                message = f"{where}: {error['msg']}" if where else error["msg"]
+                results.append(BulkItemResult(line=line, status="invalid", error=message))
+                continue
+            if not patch.model_fields_set - {"id"}:
+                results.append(BulkItemResult(line=line, id=patch.id, status="invalid", error="No updates provided"))
+                continue
+            patches.append((line, patch))
+        if not patches and not results:
+            raise HTTPException(status_code=400, detail="No patches provided")
+
+        if patches:
+            results.extend(await IO_POOL.run(_apply_bulk_patches, patches))
+        results.sort(key=lambda result: result.line)
+        updated = sum(result.status == "updated" for result in results)
+        return BulkUpdateResponse(updated=updated, failed=len(results) - updated, items=results)
+    except HTTPException:
+        raise
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.exception("Error in bulk_update")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
 @router.post("/reclassify", response_model=dict)
 def reclassify_screenshots(payload: ReclassifyRequest):
     try:
-        dataset = load_screenshots()
         target_ids = {identifier for identifier in payload.ids if identifier}
         if not target_ids:
             return {"status": "ok", "updated": 0}
@@ -363,17 +525,18 @@ def reclassify_screenshots(payload: ReclassifyRequest):
         desired_category = (payload.new_category or "").strip()
         clear_category = not desired_category or desired_category.lower() == ScreenshotStatus.PENDING.value
 
-        for item in dataset:
-            if item.get("id") in target_ids:
-                item["primary_category"] = None if clear_category else desired_category
-                item["status"] = new_status
-                item["updated_at"] = timestamp
-                updated += 1
+        with screenshots_transaction() as dataset:
+            for item in dataset:
+                if item.get("id") in target_ids:
+                    item["primary_category"] = None if clear_category else desired_category
+                    item["status"] = new_status
+                    item["updated_at"] = timestamp
+                    mark_validated(item)
+                    updated += 1
 
-        if not updated:
-            raise HTTPException(status_code=404, detail="No screenshots reclassified")
+            if not updated:
+                raise HTTPException(status_code=404, detail="No screenshots reclassified")
 
-        save_screenshots(dataset)
         return {"status": "ok", "updated": updated}
     except HTTPException:
         raise
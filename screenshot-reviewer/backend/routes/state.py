@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 import logging
+from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException
 from .. import state_manager
+from ..models import SelectionDelta
 
 router = APIRouter()
 logger = logging.getLogger("screenshot_reviewer")
@@ -15,12 +17,12 @@ def get_state() -> dict:
 
 @router.post("/save", summary="Persist selection state")
 async def save_state(payload: dict) -> dict:
-    """Persist the provided selection state to disk."""
+    """Replace the selection; it is written to disk once changes settle."""
     try:
         if not isinstance(payload, dict):
             raise HTTPException(status_code=400, detail="Invalid state payload")
         state_manager.set_current_state(payload)
-        await state_manager.save_selection_state()
+        state_manager.schedule_save()
         return {"status": "saved", "state": state_manager.get_current_state()}
     except HTTPException:
         raise
@@ -38,4 +40,31 @@ async def clear_state() -> dict:
         return {"status": "cleared", "state": state_manager.get_current_state()}
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("Failed to clear selection state: %s", exc)
-        raise HTTPException(status_code=500, detail=str(exc))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(exc))
+
+def _delta_timestamp(delta: SelectionDelta) -> str:
+    return delta.timestamp or datetime.now(timezone.utc).isoformat()
+
+@router.post("/add", summary="Add ids to the selection")
+async def add_to_selection(delta: SelectionDelta) -> dict:
+    """Append ids to the selection without resending it; returns size and version only."""
+    try:
+        added = state_manager.add_selected(delta.ids, _delta_timestamp(delta))
+        if added:
+            state_manager.schedule_save()
+        return {"status": "ok", "changed": added, **state_manager.selection_info()}
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.error("Failed to add to selection: %s", exc)
+        raise HTTPException(status_code=500, detail=str(exc))
+
+@router.post("/remove", summary="Remove ids from the selection")
+async def remove_from_selection(delta: SelectionDelta) -> dict:
+    """Drop ids from the selection without resending it; returns size and version only."""
+    try:
+        removed = state_manager.remove_selected(delta.ids, _delta_timestamp(delta))
+        if removed:
+            state_manager.schedule_save()
+        return {"status": "ok", "changed": removed, **state_manager.selection_info()}
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.error("Failed to remove from selection: %s", exc)
+        raise HTTPException(status_code=500, detail=str(exc))
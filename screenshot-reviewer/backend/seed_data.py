@@ -8,12 +8,12 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from uuid import uuid4
 
-THIS_DIR = Path(__file__).resolve().parent
-if str(THIS_DIR) not in sys.path:
-    sys.path.insert(0, str(THIS_DIR))
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
 
 try:
-    from storage import (  # type: ignore
+    from backend.storage import (  # type: ignore
         load_categories,
         load_lexicon,
         load_screenshots,
@@ -21,6 +21,7 @@ try:
         save_lexicon,
         save_screenshots,
     )
+    from backend.validation import mark_validated  # type: ignore
 except ModuleNotFoundError as exc:  # pragma: no cover - defensive
     raise SystemExit(f"Unable to import storage helpers: {exc}")
 
@@ -106,6 +107,8 @@ def _ensure_screenshots(categories: list[dict]) -> list[dict]:
                     "updated_at": captured.isoformat(),
                 }
             )
+    for item in seeded:
+        mark_validated(item)
     save_screenshots(seeded)
     return seeded
 
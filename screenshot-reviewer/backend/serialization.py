@@ -0,0 +1,21 @@
+"""JSON encoding for on-disk datasets and state.
+
+json_io.py lives at the repository root so the metadata scripts and the reviewer
+share one implementation (orjson when installed, JSON_PRETTY for indented files);
+this module re-exports it under the names the backend uses.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from json_io import BACKEND, PRETTY_DEFAULT, dumps, loads, orjson  # noqa: E402
+from json_io import load as load_file  # noqa: E402
+from json_io import save as write_file_atomic  # noqa: E402
+
+__all__ = ["BACKEND", "PRETTY_DEFAULT", "dumps", "load_file", "loads", "orjson", "write_file_atomic"]
@@ -0,0 +1,51 @@
+"""On-disk text similarity index for the reviewer, kept in sync with screenshots.json.
+
+Every uvicorn worker and process-pool child opens the same files, so rows are only
+appended under the cross-process lock on ``index.json``, after reloading whatever
+another process saved, and each lookup first reloads if the file changed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from .ocr_store import get_ocr_texts, item_hash
+from .storage import DATA_DIR, _file_lock
+
+# similarity_index.py lives at the repository root so the enricher shares the same format.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from similarity_index import META_FILE, SimilarityIndex  # noqa: E402
+
+INDEX_DIR = Path(os.getenv("SIMILARITY_INDEX_DIR", str(DATA_DIR / "similarity")))
+
+_LOCK = threading.Lock()
+_INDEX: Optional[SimilarityIndex] = None
+
+
+def get_index(dataset: List[dict]) -> SimilarityIndex:
+    """Open the index once and append/refresh rows for records that changed since last call."""
+    global _INDEX
+    with _LOCK:
+        if _INDEX is None or _INDEX.directory != INDEX_DIR:
+            _INDEX = SimilarityIndex(INDEX_DIR)
+        else:
+            _INDEX.reload()
+        stale = [item for item in dataset if not _INDEX.is_current(item)]
+        if stale:
+            texts = get_ocr_texts(item_hash(item) for item in stale if not item.get("ocr_text"))
+            with _file_lock(INDEX_DIR / META_FILE):
+                if _INDEX.reload():
+                    stale = [item for item in stale if not _INDEX.is_current(item)]
+                _INDEX.upsert(
+                    stale,
+                    ocr_text=lambda item: item.get("ocr_text") or texts.get(item_hash(item) or "", ""),
+                )
+                _INDEX.save()
+        return _INDEX
@@ -1,16 +1,32 @@
-"""Centralized selection state management for the backend."""
+"""Centralized selection state management for the backend.
+
+The selection is kept as an insertion-ordered set (dict keys) with an in-memory
+version counter that moves whenever the selection changes. Route handlers change it
+through `set_current_state` or the `add_selected` / `remove_selected` deltas and
+call `schedule_save`. A background writer then persists the state once no changes
+have arrived for STATE_SAVE_DEBOUNCE_MS (or STATE_SAVE_MAX_DELAY_MS after the first
+unsaved change), and skips the write if the version is already on disk.
+`save_selection_state` still writes immediately; shutdown uses it so the final
+state always reaches disk.
+"""
 
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .serialization import loads, write_file_atomic
 
 logger = logging.getLogger("screenshot_reviewer")
 
 STATE_FILE = Path(__file__).resolve().parent / "state.json"
+STATE_SAVE_DEBOUNCE_SECONDS = float(os.getenv("STATE_SAVE_DEBOUNCE_MS", "500")) / 1000
+STATE_SAVE_MAX_DELAY_SECONDS = float(os.getenv("STATE_SAVE_MAX_DELAY_MS", "5000")) / 1000
 
 
 def _default_state() -> Dict[str, Any]:
@@ -32,55 +48,167 @@ def _normalize_state(raw: Dict[str, Any]) -> Dict[str, Any]:
     return {"selected": deduped_selected, "timestamp": timestamp}
 
 
-current_state: Dict[str, Any] = _default_state()
+class SelectionState:
+    """Selected ids as an ordered set, with a version bumped on every change."""
+
+    def __init__(self) -> None:
+        self._selected: Dict[Any, None] = {}
+        self.timestamp: Any = None
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._selected)
+
+    def replace(self, selected: Iterable[Any], timestamp: Any) -> None:
+        selected = dict.fromkeys(selected)
+        with self._lock:
+            if list(selected) != list(self._selected) or timestamp != self.timestamp:
+                self._selected = selected
+                self.timestamp = timestamp
+                self.version += 1
+
+    def add(self, ids: Iterable[Any], timestamp: Any) -> int:
+        with self._lock:
+            before = len(self._selected)
+            self._selected.update(dict.fromkeys(ids))
+            added = len(self._selected) - before
+            if added:
+                self.timestamp = timestamp
+                self.version += 1
+            return added
+
+    def remove(self, ids: Iterable[Any], timestamp: Any) -> int:
+        with self._lock:
+            removed = 0
+            for identifier in ids:
+                if self._selected.pop(identifier, _ABSENT) is not _ABSENT:
+                    removed += 1
+            if removed:
+                self.timestamp = timestamp
+                self.version += 1
+            return removed
+
+    def snapshot(self) -> Tuple[Dict[str, Any], int]:
+        with self._lock:
+            return {"selected": list(self._selected), "timestamp": self.timestamp}, self.version
+
+
+_ABSENT = object()
+_selection = SelectionState()
+
+# Debounced writer state
+_saved_version = 0
+_write_lock = threading.Lock()
+_writer_cond = threading.Condition()
+_save_due: Optional[float] = None
+_first_request: Optional[float] = None
+_writer_thread: Optional[threading.Thread] = None
 
 
 def load_selection_state() -> Dict[str, Any]:
     """Populate the in-memory state from disk if available, returning the state."""
-    global current_state
+    global _saved_version
 
+    state = _default_state()
     if STATE_FILE.exists():
         try:
-            payload = json.loads(STATE_FILE.read_text())
+            payload = loads(STATE_FILE.read_bytes())
             if not isinstance(payload, dict):
                 raise ValueError("state file must contain a JSON object")
-            current_state = _normalize_state(payload)
-            logger.info("✅ Loaded state (%d items)", len(current_state.get("selected", [])))
+            state = _normalize_state(payload)
+            logger.info("✅ Loaded state (%d items)", len(state["selected"]))
         except Exception as exc:  # pragma: no cover - defensive
-            current_state = _default_state()
             logger.warning("⚠️ Failed to load state.json: %s", exc)
     else:
-        current_state = _default_state()
         logger.info("ℹ️ No existing state.json, using defaults")
 
-    return current_state
+    with _write_lock:
+        _selection.replace(state["selected"], state["timestamp"])
+        _saved_version = _selection.version
+    return get_current_state()
+
+
+def _persist(*, force: bool = False) -> bool:
+    """Write the current state unless that version is already on disk (or ``force``)."""
+    global _saved_version
+    with _write_lock:
+        snapshot, version = _selection.snapshot()
+        if not force and version == _saved_version:
+            return False
+        _write_state_file(snapshot)
+        _saved_version = version
+    return True
 
 
 async def save_selection_state() -> None:
-    """Persist the current state to disk asynchronously."""
-    snapshot = _normalize_state(current_state)
+    """Persist the current state to disk now, whether or not a save is scheduled."""
     try:
-        await asyncio.to_thread(_write_state_file, snapshot)
-        logger.info("💾 Saved state (%d items)", len(snapshot.get("selected", [])))
+        await asyncio.to_thread(_persist, force=True)
+        logger.info("💾 Saved state (%d items)", len(_selection))
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("❌ Save failed: %s", exc)
 
 
 def _write_state_file(state: Dict[str, Any] | None = None) -> None:
     """Write the provided state (or current state) to disk atomically."""
-    payload = _normalize_state(state or current_state)
+    payload = _normalize_state(state) if state is not None else _selection.snapshot()[0]
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = STATE_FILE.with_suffix(".tmp")
-    tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
-    tmp_path.replace(STATE_FILE)
+    write_file_atomic(STATE_FILE, payload)
+
+
+def schedule_save() -> None:
+    """Persist the state in the background once changes stop arriving."""
+    global _save_due, _first_request, _writer_thread
+    with _writer_cond:
+        now = time.monotonic()
+        if _save_due is None:
+            _first_request = now
+        _save_due = min(now + STATE_SAVE_DEBOUNCE_SECONDS, _first_request + STATE_SAVE_MAX_DELAY_SECONDS)
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="state-writer", daemon=True)
+            _writer_thread.start()
+        _writer_cond.notify()
+
+
+def _writer_loop() -> None:
+    global _save_due
+    while True:
+        with _writer_cond:
+            while _save_due is None:
+                _writer_cond.wait()
+            while (remaining := _save_due - time.monotonic()) > 0:
+                _writer_cond.wait(remaining)
+            _save_due = None
+        try:
+            if _persist():
+                logger.debug("💾 Saved state (%d items, version %d)", len(_selection), _selection.version)
+        except Exception:  # pragma: no cover - keep the writer alive
+            logger.exception("Debounced state save failed")
 
 
 def get_current_state() -> Dict[str, Any]:
-    """Return the in-memory state reference."""
-    return current_state
+    """Return a snapshot of the in-memory state, including its version."""
+    snapshot, version = _selection.snapshot()
+    return {**snapshot, "version": version}
 
 
 def set_current_state(new_state: Dict[str, Any]) -> None:
-    """Replace the in-memory state, primarily used for tests."""
-    global current_state
-    current_state = _normalize_state(new_state)
+    """Replace the in-memory state with a full selection."""
+    state = _normalize_state(new_state)
+    _selection.replace(state["selected"], state["timestamp"])
+
+
+def add_selected(ids: Iterable[Any], timestamp: Any = None) -> int:
+    """Add ids to the end of the selection, skipping ones already selected; returns how many were new."""
+    return _selection.add(ids, timestamp)
+
+
+def remove_selected(ids: Iterable[Any], timestamp: Any = None) -> int:
+    """Remove ids from the selection; returns how many were selected."""
+    return _selection.remove(ids, timestamp)
+
+
+def selection_info() -> Dict[str, int]:
+    """Size and version of the selection without copying it."""
+    return {"count": len(_selection), "version": _selection.version}
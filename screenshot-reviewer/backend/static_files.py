@@ -0,0 +1,58 @@
+"""StaticFiles with cache headers for screenshots and the built frontend.
+
+Screenshots never change once captured, and Vite emits its bundles under
+``assets/`` with content hashes in the file names, so both are served as
+``immutable`` for STATIC_MAX_AGE seconds. Other frontend files (``index.html``)
+get ``no-cache`` so a new build is picked up on the next load. ETags are derived
+from the nanosecond mtime and size, nginx-style, and Range requests are handled
+by Starlette's FileResponse.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", str(365 * 24 * 3600)))
+IMMUTABLE = f"public, max-age={STATIC_MAX_AGE}, immutable"
+REVALIDATE = "no-cache"
+
+
+def strong_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def hashed_assets(path: str) -> bool:
+    """Vite build layout: only files under ``assets/`` carry a content hash."""
+    return path.replace(os.sep, "/").lstrip("/").startswith("assets/")
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles adding strong ETags and Cache-Control chosen per path.
+
+    ``immutable`` decides which request paths may be cached forever; by default
+    everything under this mount is.
+    """
+
+    def __init__(self, *args, immutable: Optional[Callable[[str], bool]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable or (lambda path: True)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        cache_control = IMMUTABLE if status_code == 200 and self.immutable(self.get_path(scope)) else REVALIDATE
+        headers = {"etag": strong_etag(stat_result), "cache-control": cache_control}
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,14 +1,51 @@
-"""Persistence layer helpers for reading and writing JSON datasets."""
+"""Persistence layer helpers for reading and writing JSON datasets.
+
+Writes are serialised across threads and across uvicorn worker processes with an
+fcntl advisory lock on a sibling ``.lock`` file. Each screenshots.json save also
+bumps an integer revision in ``screenshots.json.rev`` so every worker can tell
+cheaply that its cached view is stale. Readers take no lock, because files are
+replaced atomically.
+
+Screenshot edits are coalesced by default (STORAGE_DURABILITY=deferred). A
+transaction changes an in-memory working copy that this process reads from at
+once, and a background writer saves the file after WRITE_DEBOUNCE_MS without
+further edits, WRITE_MAX_DELAY_MS after the first unsaved edit, or as soon as
+WRITE_MAX_PENDING edits have queued up. If another process saved the file in the
+meantime, only the fields this process changed are applied to the newer file, so
+concurrent edits of different fields by other workers are kept. Callers
+that need the write on disk before they return pass ``durability="sync"``, which
+also commits any queued edits in the same write. `close_write_buffers` flushes
+everything on shutdown.
+
+Unsaved edits live only in the process that made them. Other uvicorn workers read
+the file, so they see a deferred edit up to WRITE_MAX_DELAY_MS late (use
+STORAGE_DURABILITY=sync if that lag matters). The CPU_POOL_PROCESSES pool does not
+lag: `executors.BoundedPool` calls `flush_screenshots` before handing work to a
+child process, and forked children drop the parent's buffers and read the file.
+"""
 
 from __future__ import annotations
 
-import json
+import atexit
+import logging
+import os
 import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Iterable, List
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: thread lock only
+    fcntl = None
 
 from fastapi import HTTPException
 
+from .serialization import load_file, loads, write_file_atomic
+
+logger = logging.getLogger(__name__)
+
 DATA_DIR = Path(__file__).resolve().parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -16,14 +53,57 @@ _SCREENSHOTS_FILE = DATA_DIR / "screenshots.json"
 _CATEGORIES_FILE = DATA_DIR / "categories.json"
 _LEXICON_FILE = DATA_DIR / "lexicon.json"
 
+DURABILITY_SYNC = "sync"
+DURABILITY_DEFERRED = "deferred"
+DEFAULT_DURABILITY = os.getenv("STORAGE_DURABILITY", DURABILITY_DEFERRED).lower()
+WRITE_DEBOUNCE_SECONDS = float(os.getenv("WRITE_DEBOUNCE_MS", "300")) / 1000
+WRITE_MAX_DELAY_SECONDS = float(os.getenv("WRITE_MAX_DELAY_MS", "2000")) / 1000
+WRITE_MAX_PENDING = int(os.getenv("WRITE_MAX_PENDING", "50"))
+
 _LOCK = threading.Lock()
 
 
 def _atomic_write(path: Path, payload: Any) -> None:
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
-    tmp_path.replace(path)
+    write_file_atomic(path, payload)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock for ``path`` shared by threads of this process and other processes."""
+    lock_path = path.with_suffix(path.suffix + ".lock")
+    with _LOCK, lock_path.open("a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _revision_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".rev")
+
+
+def _read_revision(path: Path) -> int:
+    try:
+        return int(_revision_path(path).read_text(encoding="utf-8") or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _bump_revision(path: Path) -> int:
+    revision = _read_revision(path) + 1
+    rev_path = _revision_path(path)
+    tmp_path = rev_path.with_suffix(rev_path.suffix + ".tmp")
+    tmp_path.write_text(str(revision), encoding="utf-8")
+    tmp_path.replace(rev_path)
+    return revision
+
+
+def _file_version(path: Path) -> tuple[int, int, int]:
+    stat = path.stat()
+    return _read_revision(path), stat.st_mtime_ns, stat.st_size
 
 
 def _ensure_files() -> None:
@@ -35,34 +115,313 @@ def _ensure_files() -> None:
 _ensure_files()
 
 
+# ─────────────────────────────────────────────
+# Write coalescing
+# ─────────────────────────────────────────────
+class _WriteBuffer:
+    """Working copy of one JSON list file plus the edits not yet written to it.
+
+    Lock order is always file lock, then ``self.lock``; deferred transactions only
+    take ``self.lock``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.RLock()
+        self._changed = threading.Condition(self.lock)
+        self.working: Optional[List[dict]] = None
+        self._base: Dict[Any, dict] = {}
+        self._base_version: Optional[tuple[int, int, int]] = None
+        self.pending = 0
+        self.generation = 0
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ── working copy ───────────────────────────
+    def _checkout(self) -> List[dict]:
+        if self.working is None:
+            while True:
+                version = _file_version(self.path)
+                raw = self.path.read_bytes()
+                if _file_version(self.path) == version:
+                    break
+            self.working = loads(raw)
+            # A second parse is the merge base: cheaper than deep-copying the first.
+            self._base = {item.get("id"): item for item in loads(raw)}
+            self._base_version = version
+        return self.working
+
+    def _merged(self) -> List[dict]:
+        """The working copy, reconciled with saves other processes made since checkout.
+
+        Only the fields this process changed (relative to its checkout) are applied
+        to the records on disk, so edits other workers made to other fields of the
+        same screenshot survive. Records edited here but deleted elsewhere stay
+        deleted. A merged record whose ``validated`` marker no longer matches is
+        simply re-validated on read.
+        """
+        working = self.working or []
+        if _file_version(self.path) == self._base_version:
+            return working
+        seen = set()
+        added: Dict[Any, dict] = {}
+        changes: Dict[Any, Tuple[Dict[str, Any], Set[str]]] = {}
+        for item in working:
+            key = item.get("id")
+            seen.add(key)
+            base = self._base.get(key)
+            if base is None:
+                added[key] = item
+            elif base != item:
+                updated = {name: value for name, value in item.items() if name not in base or base[name] != value}
+                changes[key] = (updated, base.keys() - item.keys())
+        removed = self._base.keys() - seen
+        merged = []
+        for item in load_file(self.path):
+            key = item.get("id")
+            if key in removed:
+                continue
+            if key in added:
+                item = added.pop(key)
+            elif key in changes:
+                updated, dropped = changes.pop(key)
+                item.update(updated)
+                for name in dropped:
+                    item.pop(name, None)
+            merged.append(item)
+        merged.extend(added.values())
+        logger.info("🔀 Merged %d pending screenshot edits with a newer %s", self.pending, self.path.name)
+        return merged
+
+    def _reset(self) -> None:
+        self.working = None
+        self._base = {}
+        self._base_version = None
+        self.pending = 0
+
+    def _commit(self, dataset: List[dict]) -> None:
+        _atomic_write(self.path, dataset)
+        _bump_revision(self.path)
+        self._reset()
+
+    # ── transactions ───────────────────────────
+    @contextmanager
+    def deferred(self) -> Iterator[List[dict]]:
+        with self.lock:
+            dataset = self._checkout()
+            try:
+                yield dataset
+            except BaseException:
+                # Nothing queued yet, so dropping the copy also drops any partial edits.
+                # With edits queued, partial edits stay and are written with them.
+                if not self.pending:
+                    self._reset()
+                raise
+            now = time.monotonic()
+            if not self.pending:
+                self._first_change = now
+            self._last_change = now
+            self.pending += 1
+            self.generation += 1
+            self._start_writer()
+            self._changed.notify()
+
+    @contextmanager
+    def synchronous(self) -> Iterator[List[dict]]:
+        with _file_lock(self.path), self.lock:
+            dataset = self._merged() if self.pending else load_file(self.path)
+            yield dataset
+            self._commit(dataset)
+
+    def replace(self, dataset: List[dict]) -> None:
+        with _file_lock(self.path), self.lock:
+            if self.pending:
+                logger.warning("⚠️ Discarding %d unsaved edits: %s replaced wholesale", self.pending, self.path.name)
+            self._commit(dataset)
+
+    def flush(self) -> int:
+        """Write queued edits now; returns how many transactions the write covered."""
+        with _file_lock(self.path), self.lock:
+            count = self.pending
+            if count:
+                self._commit(self._merged())
+                logger.debug("💾 Flushed %d coalesced edits to %s", count, self.path.name)
+            return count
+
+    # ── background writer ──────────────────────
+    def _start_writer(self) -> None:
+        # Also restarts the writer in a forked child, where the parent's thread is gone.
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+            self._thread.start()
+
+    def _due(self) -> float:
+        return min(self._last_change + WRITE_DEBOUNCE_SECONDS, self._first_change + WRITE_MAX_DELAY_SECONDS)
+
+    def _run(self) -> None:
+        while True:
+            with self.lock:
+                while not self.pending:
+                    if self._stopping:
+                        return
+                    self._changed.wait()
+                while self.pending and self.pending < WRITE_MAX_PENDING and not self._stopping:
+                    remaining = self._due() - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - keep the writer alive, retry after a pause
+                logger.exception("Deferred write of %s failed", self.path.name)
+                time.sleep(WRITE_DEBOUNCE_SECONDS)
+
+    def close(self) -> int:
+        with self.lock:
+            self._stopping = True
+            self._changed.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=10)
+        return self.flush()
+
+
+_BUFFERS: Dict[Path, _WriteBuffer] = {}
+_BUFFERS_LOCK = threading.Lock()
+
+
+def _write_buffer(path: Path) -> _WriteBuffer:
+    with _BUFFERS_LOCK:
+        buffer = _BUFFERS.get(path)
+        if buffer is None:
+            buffer = _BUFFERS[path] = _WriteBuffer(path)
+        return buffer
+
+
+def flush_screenshots() -> int:
+    """Write any coalesced screenshot edits now; returns how many were pending."""
+    buffer = _BUFFERS.get(_SCREENSHOTS_FILE)
+    if buffer is None or not buffer.pending:
+        return 0
+    return buffer.flush()
+
+
+def close_write_buffers() -> None:
+    """Stop the background writers and flush what they hold (shutdown / exit)."""
+    for buffer in list(_BUFFERS.values()):
+        try:
+            count = buffer.close()
+        except Exception:  # pragma: no cover - defensive at shutdown
+            logger.exception("Failed to flush pending writes for %s", buffer.path)
+            continue
+        if count:
+            logger.info("💾 Flushed %d pending edits to %s", count, buffer.path.name)
+
+
+atexit.register(close_write_buffers)
+# A forked child (process pool, multiprocessing) must not serve or write the parent's
+# unsaved working copy; it reads the file like any other process.
+os.register_at_fork(after_in_child=_BUFFERS.clear)
+
+
+# ─────────────────────────────────────────────
+# Datasets
+# ─────────────────────────────────────────────
 def load_screenshots() -> List[dict]:
-    with _SCREENSHOTS_FILE.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    buffer = _BUFFERS.get(_SCREENSHOTS_FILE)
+    working = buffer.working if buffer is not None and buffer.pending else None
+    if working is not None:
+        # Unsaved edits: serve them, as copies so callers cannot modify the working copy.
+        return [dict(item) for item in working]
+    return load_file(_SCREENSHOTS_FILE)
+
+
+def screenshots_revision() -> int:
+    """Save counter for screenshots.json, bumped under the file lock by every save."""
+    return _read_revision(_SCREENSHOTS_FILE)
+
+
+def screenshots_version() -> tuple[int, int, int, int]:
+    """(revision, mtime_ns, size, generation); changes on every save, by us or another
+    tool, and on every coalesced edit this process has not written yet."""
+    buffer = _BUFFERS.get(_SCREENSHOTS_FILE)
+    return (*_file_version(_SCREENSHOTS_FILE), buffer.generation if buffer is not None else 0)
 
 
 def save_screenshots(dataset: Iterable[dict]) -> None:
-    with _LOCK:
-        _atomic_write(_SCREENSHOTS_FILE, list(dataset))
+    """Replace screenshots.json outright; unsaved edits from this process are dropped."""
+    _write_buffer(_SCREENSHOTS_FILE).replace(list(dataset))
+
+
+@contextmanager
+def screenshots_transaction(durability: Optional[str] = None) -> Iterator[List[dict]]:
+    """Read-modify-write the screenshots dataset.
+
+    ``durability`` is ``"deferred"`` (coalesced, the STORAGE_DURABILITY default) or
+    ``"sync"``. A sync transaction re-reads the file under the cross-process lock
+    and saves it when the block exits normally. In both modes, raising (e.g.
+    HTTPException for a missing id) before anything is queued leaves the data
+    untouched.
+    """
+    mode = (durability or DEFAULT_DURABILITY).lower()
+    buffer = _write_buffer(_SCREENSHOTS_FILE)
+    if mode == DURABILITY_SYNC:
+        transaction = buffer.synchronous()
+    elif mode == DURABILITY_DEFERRED:
+        transaction = buffer.deferred()
+    else:
+        raise ValueError(f"Unknown durability mode: {mode!r}")
+    with transaction as dataset:
+        yield dataset
+
+
+@contextmanager
+def _list_transaction(path: Path) -> Iterator[List[dict]]:
+    """Load, modify and save a small JSON list file under its cross-process lock.
+
+    The file is written (and its revision bumped) only when the block exits
+    normally, so raising HTTPException inside it leaves the file untouched.
+    """
+    with _file_lock(path):
+        dataset = load_file(path)
+        yield dataset
+        _atomic_write(path, dataset)
+        _bump_revision(path)
+
+
+def _save_list(path: Path, dataset: Iterable[dict]) -> None:
+    with _file_lock(path):
+        _atomic_write(path, list(dataset))
+        _bump_revision(path)
 
 
 def load_categories() -> List[dict]:
-    with _CATEGORIES_FILE.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return load_file(_CATEGORIES_FILE)
 
 
 def save_categories(dataset: Iterable[dict]) -> None:
-    with _LOCK:
-        _atomic_write(_CATEGORIES_FILE, list(dataset))
+    _save_list(_CATEGORIES_FILE, dataset)
+
+
+def categories_transaction() -> ContextManager[List[dict]]:
+    """Read-modify-write categories.json; no other worker can save it in between."""
+    return _list_transaction(_CATEGORIES_FILE)
 
 
 def load_lexicon() -> List[dict]:
-    with _LEXICON_FILE.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return load_file(_LEXICON_FILE)
 
 
 def save_lexicon(dataset: Iterable[dict]) -> None:
-    with _LOCK:
-        _atomic_write(_LEXICON_FILE, list(dataset))
+    _save_list(_LEXICON_FILE, dataset)
+
+
+def lexicon_transaction() -> ContextManager[List[dict]]:
+    """Read-modify-write lexicon.json; no other worker can save it in between."""
+    return _list_transaction(_LEXICON_FILE)
 
 
 def get_item_or_404(dataset: List[dict], item_id: str, *, entity: str) -> dict:
@@ -0,0 +1,70 @@
+"""Bulk NDJSON patch endpoint tests."""
+
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import storage
+from backend.routes import screenshots
+from backend.validation import is_validated
+
+
+def _client(tmp_path, monkeypatch) -> TestClient:
+    path = tmp_path / "screenshots.json"
+    dataset = [{"id": name, "path": f"/{name}.png", "tags": []} for name in ("a", "b", "c")]
+    path.write_text(json.dumps(dataset), encoding="utf-8")
+    monkeypatch.setattr(storage, "_SCREENSHOTS_FILE", path)
+    app = FastAPI()
+    app.include_router(screenshots.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_streamed_patches_apply_in_one_write(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+    lines = [
+        {"id": "a", "tags": ["x"], "summary": "first"},
+        {"id": "b", "primary_category": "Work", "status": "reviewed"},
+        {"id": "missing", "summary": "nope"},
+        {"id": "a", "summary": "second"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n\nnot json\n" + json.dumps({"id": "c"})
+
+    def chunks():
+        # Chunk boundaries fall mid-line, as they do on a real stream
+        encoded = body.encode()
+        for start in range(0, len(encoded), 7):
+            yield encoded[start:start + 7]
+
+    response = client.post("/api/bulk", content=chunks(), headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["updated"], payload["failed"]) == (3, 3)
+    assert [(item["line"], item["status"]) for item in payload["items"]] == [
+        (1, "updated"), (2, "updated"), (3, "not_found"), (4, "updated"), (6, "invalid"), (7, "invalid"),
+    ]
+    assert storage.screenshots_revision() == 1
+
+    saved = {item["id"]: item for item in storage.load_screenshots()}
+    assert saved["a"]["tags"] == ["x"] and saved["a"]["summary"] == "second"
+    assert saved["b"]["status"] == "reviewed" and saved["b"]["primary_category"] == "Work"
+    assert is_validated(saved["a"]) and is_validated(saved["b"])
+    assert "updated_at" not in saved["c"]
+
+
+def test_no_matching_ids_skips_the_write(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+    response = client.post("/api/bulk", content=b'{"id": "zzz", "summary": "s"}\n')
+    assert response.json()["items"][0]["status"] == "not_found"
+    assert storage.screenshots_revision() == 0
+
+    assert client.post("/api/bulk", content=b"\n").status_code == 400
+
+
+def test_too_many_patches_are_rejected(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+    monkeypatch.setattr(screenshots, "BULK_MAX_ITEMS", 2)
+    body = b"".join(b'{"id": "a", "summary": "s"}\n' for _ in range(3))
+    assert client.post("/api/bulk", content=body).status_code == 413
+    assert storage.screenshots_revision() == 0
@@ -0,0 +1,119 @@
+"""Columnar dataset view tests."""
+
+import json
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from backend import columns
+from backend.models import ScreenshotFilter, ScreenshotView
+from backend.routes import screenshots
+
+
+def _records():
+    return [
+        {"id": "a", "path": "/a.png", "status": "reviewed", "primary_category": "Work", "confidence": 0.9,
+         "created_at": "2025-01-01T10:00:00Z"},
+        {"id": "b", "path": "/b.png", "status": "deferred", "confidence": "0.2",
+         "created_at": "2025-01-01T10:01:00Z"},
+        {"id": "c", "path": "/c.png", "status": "re-review", "primary_category": " ", "confidence": None,
+         "created_at": "2025-01-01T12:00:00"},
+        {"id": "d", "path": "/d.png", "status": "deleted", "primary_category": "Work"},
+        {"id": "e", "path": "/e.png", "status": "custom"},
+    ]
+
+
+def test_masks_match_filter_modes():
+    view = columns.DatasetColumns(_records())
+
+    def ids(mask):
+        return [view.records[row]["id"] for row in np.flatnonzero(mask)]
+
+    assert ids(view.filter_mask(ScreenshotFilter.PENDING)) == ["b", "c", "e"]
+    assert ids(view.filter_mask(ScreenshotFilter.DEFERRED)) == ["b"]
+    assert ids(view.filter_mask(ScreenshotFilter.RE_REVIEW)) == ["c"]
+    assert ids(view.filter_mask(ScreenshotFilter.LOW_CONFIDENCE)) == ["b", "c", "d", "e"]
+    assert ids(view.filter_mask(category="Work")) == ["a", "d"]
+    assert view.progress() == {
+        "total": 5, "reviewed": 1, "deferred": 1, "re_review": 1, "deleted": 1, "remaining": 3,
+    }
+    assert view.status_counts()["custom"] == 1
+
+
+def test_ordering_and_groups():
+    view = columns.DatasetColumns(_records())
+    ordered = view.newest_first(np.arange(len(view)))
+    assert [view.records[row]["id"] for row in ordered] == ["c", "b", "a", "d", "e"]
+
+    groups, keys = view.groups(ordered)
+    assert [(group.group_id, group.size) for group in groups.items][-1] == ("grp-unknown", 2)
+    assert keys[1] == keys[2]  # a and b fall into the same 3-minute bucket
+    assert columns.parse_group_id(groups.items[0].group_id) == keys[0]
+
+
+def test_list_endpoint_materializes_only_the_page(monkeypatch):
+    records = _records()
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [])
+
+    response = screenshots.list_screenshots(
+        page=1, page_size=2, filter=ScreenshotFilter.ALL, category=None, search=None, group_id=None
+    )
+
+    body = json.loads(response.body)
+    assert [item["id"] for item in body["items"]] == ["c", "b"]
+    assert body["total"] == 5
+    assert body["progress"]["deleted"] == 1
+    assert all("suggestions" not in record for record in records)
+
+
+def test_grid_view_skips_suggestions_and_ocr(monkeypatch):
+    records = _records()
+    records[0]["ocr_text"] = "inline text"
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: pytest.fail("grid view loaded the lexicon"))
+    monkeypatch.setattr(screenshots, "get_ocr_texts", lambda hashes: pytest.fail("grid view fetched OCR"))
+
+    response = screenshots.list_screenshots(
+        page=1, page_size=3, filter=ScreenshotFilter.ALL, category=None, search=None, group_id=None,
+        view=ScreenshotView.GRID,
+    )
+
+    items = json.loads(response.body)["items"]
+    assert set(items[0]) == set(screenshots.VIEW_FIELDS[ScreenshotView.GRID])
+    assert all("ocr_text" not in item and "suggestions" not in item for item in items)
+
+
+def test_fields_parameter_projects_items(monkeypatch):
+    monkeypatch.setattr(screenshots, "load_screenshots", _records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [])
+
+    def listing(fields):
+        return screenshots.list_screenshots(
+            page=1, page_size=3, filter=ScreenshotFilter.ALL, category=None, search=None, group_id=None,
+            fields=fields,
+        )
+
+    items = json.loads(listing("status, confidence").body)["items"]
+    assert [set(item) for item in items] == [{"id", "status", "confidence"}] * 3
+
+    with pytest.raises(HTTPException) as excinfo:
+        listing("status,llama_result")
+    assert excinfo.value.status_code == 422
+
+
+def test_projection_survives_group_filter(monkeypatch):
+    monkeypatch.setattr(screenshots, "load_screenshots", _records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [])
+    group = columns.group_id_for(int(columns.DatasetColumns(_records()).group_keys(np.array([0]))[0]))
+
+    for projection in ({"view": ScreenshotView.GRID}, {"fields": "status"}):
+        response = screenshots.list_screenshots(
+            page=1, page_size=5, filter=ScreenshotFilter.ALL, category=None, search=None, group_id=group,
+            **projection,
+        )
+        items = json.loads(response.body)["items"]
+        assert [item["id"] for item in items] == ["b", "a"]
+        expected = set(screenshots.VIEW_FIELDS[ScreenshotView.GRID]) if "view" in projection else {"id", "status"}
+        assert all(set(item) == expected for item in items)
@@ -0,0 +1,66 @@
+"""JSON response compression tests."""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from backend import compression
+from backend.compression import CompressionMiddleware, configured_encodings, negotiate
+
+BODY = b'{"items": [' + b",".join(b'{"ocr_text": "some repeated text"}' for _ in range(200)) + b"]}"
+
+
+def _client(encodings=("gzip",)) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    def big():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(BODY, media_type="image/png")
+
+    app.add_middleware(CompressionMiddleware, encodings=encodings, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_negotiation_respects_preference_and_q_values():
+    assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate("*", ("gzip",)) == "gzip"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert configured_encodings("off") == ()
+    assert configured_encodings("zstd,gzip") == ("gzip",)
+
+
+def test_large_json_is_gzipped_and_other_responses_are_not():
+    client = _client()
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY  # httpx decodes transparently
+
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_gzip_body_round_trips():
+    assert gzip.decompress(compression._gzip(BODY)) == BODY
+
+
+def test_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    response = _client(("br", "gzip")).get("/big", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(compression._brotli(BODY)) == BODY
@@ -0,0 +1,25 @@
+"""Near-duplicate cluster endpoint tests."""
+
+from backend.routes import screenshots
+
+
+def test_duplicate_clusters_group_close_hashes(monkeypatch):
+    dataset = [
+        {"id": "late", "path": "/s/2.png", "phash": "00000000000000ff", "created_at": "2025-01-01T10:00:05Z"},
+        {"id": "early", "path": "/s/1.png", "phash": "00000000000000fe", "created_at": "2025-01-01T10:00:00Z"},
+        {"id": "other", "path": "/s/3.png", "phash": "ffffffffffff0000", "created_at": "2025-01-01T11:00:00Z"},
+        {"id": "gone", "path": "/s/4.png", "phash": "00000000000000ff", "status": "deleted"},
+        {"id": "nohash", "path": "/s/5.png"},
+    ]
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: [dict(item) for item in dataset])
+
+    response = screenshots.list_duplicate_clusters(max_distance=2, include_deleted=False)
+
+    assert response.total_clusters == 1
+    assert response.redundant == 1
+    cluster = response.clusters[0]
+    assert cluster.representative_id == "early"
+    assert cluster.ids == ["early", "late"]
+
+    with_deleted = screenshots.list_duplicate_clusters(max_distance=2, include_deleted=True)
+    assert with_deleted.clusters[0].size == 3
@@ -0,0 +1,67 @@
+"""Bounded pool and offloading router tests."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.executors import BoundedPool, OffloadingRouter, cpu_bound
+from backend.routes import screenshots
+
+
+def test_pool_reports_queue_depth_and_rejects_when_full():
+    pool = BoundedPool("test", 1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = pool.submit(release.wait, 5)
+        waiting = pool.submit(lambda: "queued")
+        assert pool.metrics()["queued"] == 1
+        with pytest.raises(HTTPException) as excinfo:
+            pool.submit(lambda: "rejected")
+        assert excinfo.value.status_code == 503
+        release.set()
+        assert running.result(5) and waiting.result(5) == "queued"
+    finally:
+        release.set()
+        pool.shutdown()
+
+    metrics = pool.metrics()
+    assert (metrics["in_flight"], metrics["completed"], metrics["rejected"], metrics["peak_queued"]) == (0, 2, 1, 1)
+
+
+def test_router_offloads_sync_endpoints_by_kind(monkeypatch):
+    router = OffloadingRouter()
+
+    @router.get("/io")
+    def io_endpoint(value: int = 1):
+        return {"thread": threading.current_thread().name, "value": value}
+
+    @router.get("/cpu")
+    @cpu_bound
+    def cpu_endpoint():
+        return {"thread": threading.current_thread().name}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        body = client.get("/io?value=3").json()
+        assert body["thread"].startswith("io") and body["value"] == 3
+        assert client.get("/cpu").json()["thread"].startswith("cpu")
+
+    # Module-level names stay plain sync functions
+    assert not asyncio.iscoroutinefunction(io_endpoint)
+    assert not asyncio.iscoroutinefunction(screenshots.list_screenshots)
+    routes = {route.path: route for route in router.routes}
+    assert asyncio.iscoroutinefunction(routes["/cpu"].endpoint)
+
+
+def test_process_pool_round_trips_http_errors():
+    pool = BoundedPool("proc", 1, processes=True)
+    try:
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(pool.run(screenshots.get_screenshot, "does-not-exist"))
+    finally:
+        pool.shutdown()
+    assert excinfo.value.status_code == 404
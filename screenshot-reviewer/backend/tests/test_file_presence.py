@@ -0,0 +1,91 @@
+"""File-presence cache and sweeper tests."""
+
+import json
+import logging
+import os
+
+from backend import file_presence
+from backend.file_presence import FilePresenceCache, PresenceMonitor
+from backend.routes import screenshots
+
+
+def test_scan_refresh_and_ttl(tmp_path):
+    now = [0.0]
+    cache = FilePresenceCache(ttl=10, clock=lambda: now[0])
+    (tmp_path / "day").mkdir()
+    kept, removed = tmp_path / "day" / "a.png", tmp_path / "day" / "b.png"
+    kept.write_bytes(b"x")
+    removed.write_bytes(b"x")
+
+    assert cache.scan(tmp_path) == 2
+    removed.unlink()
+    assert cache.lookup(str(removed)) is True  # cached until refreshed
+
+    paths = [str(kept), str(removed), str(tmp_path / "gone" / "c.png")]
+    assert cache.stale(paths) == [paths[2]]
+    now[0] = 11
+    assert cache.stale(paths) == paths
+    assert cache.refresh(paths) == [str(removed), paths[2]]
+    assert cache.missing() == {str(removed), paths[2]}
+
+    cache.scan(tmp_path)
+    removed.write_bytes(b"x")
+    cache.scan(tmp_path)
+    assert cache.lookup(str(removed)) is True
+
+
+def test_enrich_never_stats_and_warns_once(monkeypatch, caplog):
+    cache = FilePresenceCache()
+    cache.set("/missing/volume/x.png", False)
+    monkeypatch.setattr(screenshots, "PRESENCE", cache)
+    stats = []
+    real_exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda path: stats.append(path) or real_exists(path))
+    caplog.set_level(logging.WARNING)
+
+    for _ in range(3):
+        enriched = screenshots._enrich_screenshot({"id": "x", "path": "/missing/volume/x.png"})
+    # Unknown paths fall back to the flag stored on the record
+    flagged = screenshots._enrich_screenshot({"id": "y", "path": "/unseen/y.png", "file_missing": True})
+
+    assert enriched["url"] is None
+    assert flagged["url"] is None and "file_missing" not in flagged
+    assert stats == []
+    assert caplog.text.lower().count("missing file") == 2
+
+
+def test_monitor_sweeps_dataset_paths(tmp_path, caplog):
+    cache = FilePresenceCache(ttl=0)
+    present = tmp_path / "a.png"
+    present.write_bytes(b"x")
+    monitor = PresenceMonitor(tmp_path, lambda: [str(present), str(tmp_path / "b.png"), None], cache=cache)
+    caplog.set_level(logging.WARNING, logger=file_presence.__name__)
+
+    assert monitor.sweep() == [str(tmp_path / "b.png")]
+    assert monitor.sweep() == []
+    assert "1 screenshots missing" in caplog.text
+
+
+def test_sweep_flags_missing_records_for_other_processes(tmp_path, monkeypatch):
+    from backend import storage
+
+    present = tmp_path / "a.png"
+    present.write_bytes(b"x")
+    dataset_file = tmp_path / "screenshots.json"
+    dataset = [
+        {"id": "a", "path": str(present), "file_missing": True},
+        {"id": "b", "path": str(tmp_path / "b.png")},
+        {"id": "c", "path": str(tmp_path / "unswept" / "c.png")},
+    ]
+    dataset_file.write_text(json.dumps(dataset), encoding="utf-8")
+    monkeypatch.setattr(storage, "_SCREENSHOTS_FILE", dataset_file)
+    cache = FilePresenceCache(ttl=0)
+    paths = [str(present), str(tmp_path / "b.png")]
+    monitor = PresenceMonitor(tmp_path, lambda: paths, cache=cache, flag=file_presence.flag_missing_files)
+
+    monitor.sweep()
+    storage.flush_screenshots()
+
+    flags = {item["id"]: item.get("file_missing") for item in json.loads(dataset_file.read_text(encoding="utf-8"))}
+    assert flags == {"a": False, "b": True, "c": None}
+    assert file_presence.flag_missing_files(cache) == 0
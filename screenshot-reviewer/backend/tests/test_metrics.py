@@ -0,0 +1,68 @@
+"""Timing middleware and Prometheus rendering tests."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import metrics
+from backend.executors import OffloadingRouter
+from backend.models import ScreenshotFilter
+from backend.routes import screenshots
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_render_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(("a",), value)
+        lines = histogram.render()
+    finally:
+        metrics.REGISTRY.remove(histogram)
+
+    assert 'screenshot_reviewer_test_render_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'screenshot_reviewer_test_render_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'screenshot_reviewer_test_render_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'screenshot_reviewer_test_render_seconds_sum{stage="a"} 5.55' in lines
+    assert 'screenshot_reviewer_test_render_seconds_count{stage="a"} 3' in lines
+
+
+def test_middleware_adds_server_timing_from_pool_threads():
+    router = OffloadingRouter()
+
+    @router.get("/work")
+    def timed_work():
+        timer = metrics.StageTimer("timed_work")
+        timer.mark("prepare")
+        timer.mark("finish")
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(metrics.TimingMiddleware)
+    before = metrics.REQUEST_LATENCY.count(("GET", "timed_work"))
+
+    with TestClient(app) as client:
+        response = client.get("/work")
+        client.get("/nowhere")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("prepare;dur=") and ", finish;dur=" in timing and ", total;dur=" in timing
+    assert metrics.REQUEST_LATENCY.count(("GET", "timed_work")) == before + 1
+    assert metrics.REQUESTS.value(("GET", "unmatched", "404")) >= 1
+    assert 'handler="timed_work"' in metrics.render()
+
+
+def test_list_screenshots_records_stages_and_cache_hits(monkeypatch):
+    records = [{"id": "a", "path": "/a.png", "created_at": "2025-01-01T10:00:00Z"}]
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [])
+    hits = metrics.CACHE_LOOKUPS.value(("dataset_columns", "hit"))
+
+    for _ in range(2):
+        screenshots.list_screenshots(
+            page=1, page_size=10, filter=ScreenshotFilter.ALL, category=None, search="a", group_id=None
+        )
+
+    stages = {"load", "filter", "search", "sort", "group", "paginate", "suggest", "validate", "serialize"}
+    assert all(metrics.STAGE_LATENCY.count(("list_screenshots", stage)) >= 2 for stage in stages)
+    assert metrics.CACHE_LOOKUPS.value(("dataset_columns", "hit")) >= hits + 1
+    assert metrics.DATASET_ITEMS.value() == 1
@@ -0,0 +1,45 @@
+"""Lazy OCR lookups against the content-addressed store."""
+
+import sys
+from pathlib import Path
+
+from backend import ocr_store
+from backend.routes import screenshots
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ocr_store import OCRRecord, OCRStore  # noqa: E402
+
+
+def _use_store(monkeypatch, tmp_path, records):
+    path = tmp_path / "ocr.sqlite3"
+    with OCRStore(path) as store:
+        store.put_many(records)
+    monkeypatch.setattr(ocr_store, "OCR_STORE_FILE", path)
+    ocr_store.clear_cache()
+
+
+def test_search_fetches_stored_ocr_for_unmatched_items(monkeypatch, tmp_path):
+    _use_store(monkeypatch, tmp_path, [OCRRecord("h1", "Quarterly invoice total")])
+    items = [
+        {"id": "a", "path": "/x/a.png", "hash": "h1"},
+        {"id": "b", "path": "/x/invoice.png"},
+        {"id": "c", "path": "/x/c.png", "ocr_text": "nothing here"},
+    ]
+
+    assert [item["id"] for item in screenshots._search(items, "invoice")] == ["a", "b"]
+    assert "ocr_text" not in items[0]
+
+
+def test_detail_text_prefers_inline_and_tolerates_missing_store(monkeypatch, tmp_path):
+    _use_store(monkeypatch, tmp_path, [OCRRecord("h1", "stored")])
+
+    assert ocr_store.get_ocr_text({"ocr_hash": "h1"}) == "stored"
+    assert ocr_store.get_ocr_text({"hash": "h1", "ocr_text": "inline"}) == "inline"
+    assert ocr_store.get_ocr_text({"hash": "unknown"}) == ""
+
+    monkeypatch.setattr(ocr_store, "OCR_STORE_FILE", tmp_path / "absent.sqlite3")
+    ocr_store.clear_cache()
+    assert ocr_store.get_ocr_text({"hash": "h1"}) == ""
@@ -0,0 +1,74 @@
+"""Opt-in request profiling tests."""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import profiling
+from backend.executors import OffloadingRouter
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+@pytest.fixture
+def profiled_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "RETENTION", 2)
+    monkeypatch.setattr(profiling, "MODE", "sample")
+    monkeypatch.setattr(profiling, "SAMPLE_INTERVAL", 0.001)
+
+    router = OffloadingRouter()
+
+    @router.get("/work")
+    def work():
+        return {"loops": _busy(0.05)}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(profiling.ProfilingMiddleware)
+    return app
+
+
+def test_only_opted_in_requests_are_profiled(profiled_app, tmp_path):
+    with TestClient(profiled_app) as client:
+        plain = client.get("/work")
+        assert plain.status_code == 200 and "x-profile-file" not in plain.headers
+        assert list(tmp_path.iterdir()) == []
+
+        response = client.get("/work", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+
+    name = response.headers["x-profile-file"]
+    assert name.endswith("-get-work.folded")
+    lines = (tmp_path / name).read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_busy (test_profiling.py" in line for line in lines)
+
+
+def test_cprofile_mode_and_retention(profiled_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "MODE", "cprofile")
+    with TestClient(profiled_app) as client:
+        names = [client.get("/work?profile=1").headers["x-profile-file"] for _ in range(3)]
+
+    assert all(name.endswith(".prof") for name in names)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(names[1:])
+
+
+def test_disabled_profiling_leaves_handlers_unwrapped(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    router = OffloadingRouter()
+
+    @router.get("/work")
+    def work():
+        return {}
+
+    assert router.routes[0].endpoint.__wrapped__ is work
@@ -0,0 +1,47 @@
+"""Slotted ScreenshotRecord tests."""
+
+from backend.records import ScreenshotRecord, as_dict, to_records
+
+
+def _item(**extra):
+    return {
+        "id": "a",
+        "path": "/s/a.png",
+        "tags": ["work", "jira"],
+        "status": "reviewed",
+        "primary_category": "Work",
+        "confidence": 0.8,
+        "llama_result": {"tags_ai": ["jira"], "confidence": 0.8},
+        "ocr_text": "Sprint board",
+        "created_at": "2025-01-01T10:00:00Z",
+        **extra,
+    }
+
+
+def test_round_trip_preserves_json_shape():
+    item = _item(custom_field={"nested": [1, 2]})
+    record = ScreenshotRecord.from_dict(item)
+
+    assert record.to_dict() == item
+    assert as_dict(record) == item
+    assert "llama_result" not in record.to_dict(include_heavy=False)
+    assert not hasattr(record, "__dict__")
+
+
+def test_strings_are_interned_and_reads_match_dict_semantics():
+    first, second = to_records([_item(), _item(id="b", tags=["jira"])])
+
+    assert first.status is second.status
+    assert first.get("tags")[1] is second.get("tags")[0]
+    assert first.get("missing", "default") == "default"
+    assert first.get("llama_result") == {"tags_ai": ["jira"], "confidence": 0.8}
+    assert "summary" not in first and "path" in first
+
+
+def test_to_model_builds_screenshot():
+    model = ScreenshotRecord.from_dict(_item()).to_model(suggestions=["x"])
+
+    assert model.id == "a"
+    assert model.tags == ["work", "jira"]
+    assert model.ocr_text == "Sprint board"
+    assert model.suggestions == ["x"]
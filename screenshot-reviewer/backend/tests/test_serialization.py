@@ -0,0 +1,25 @@
+"""Serializer layer tests."""
+
+import json
+
+from backend import serialization
+
+
+def test_compact_and_pretty_files_round_trip(tmp_path):
+    payload = [{"id": "a", "summary": "Café ✅", "tags": ["x"], "confidence": 0.5}]
+    path = tmp_path / "screenshots.json"
+
+    serialization.write_file_atomic(path, payload, pretty=False)
+    compact = path.read_text(encoding="utf-8")
+    assert "\n" not in compact and "Café ✅" in compact
+    assert serialization.load_file(path) == payload
+
+    serialization.write_file_atomic(path, payload, pretty=True)
+    assert path.read_text(encoding="utf-8").startswith('[\n  {\n    "id"')
+    assert json.loads(path.read_text(encoding="utf-8")) == payload
+    assert not path.with_suffix(".json.tmp").exists()
+
+
+def test_sort_keys_and_non_string_keys():
+    encoded = serialization.dumps({"b": 1, "a": {1: "one"}}, pretty=False, sort_keys=True)
+    assert encoded == b'{"a":{"1":"one"},"b":1}'
@@ -0,0 +1,60 @@
+"""Similar-screenshots endpoint tests."""
+
+import pytest
+from fastapi import HTTPException
+
+from backend import similarity
+from backend.routes import screenshots
+
+
+def test_similar_endpoint_returns_neighbours(monkeypatch, tmp_path):
+    dataset = [
+        {"id": "a", "path": "/s/a.png", "tags": ["jira"], "summary": "sprint board tickets"},
+        {"id": "b", "path": "/s/b.png", "tags": ["jira"], "summary": "tickets in the sprint board"},
+        {"id": "c", "path": "/s/c.png", "tags": ["gaming"], "summary": "skyrim map"},
+        {"id": "d", "path": "/s/d.png", "tags": ["jira"], "summary": "sprint tickets", "status": "deleted"},
+    ]
+    monkeypatch.setattr(similarity, "INDEX_DIR", tmp_path / "similarity")
+    monkeypatch.setattr(similarity, "_INDEX", None)
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: [dict(item) for item in dataset])
+
+    response = screenshots.similar_screenshots("a", k=5)
+
+    assert response.items[0].id == "b"
+    assert "d" not in [item.id for item in response.items]
+    assert (tmp_path / "similarity" / "vectors.f32").exists()
+
+    with pytest.raises(HTTPException) as excinfo:
+        screenshots.similar_screenshots("missing", k=5)
+    assert excinfo.value.status_code == 404
+
+
+def _index_own_records(worker: int) -> None:
+    records = [
+        {"id": f"w{worker}-{index}", "path": f"/s/{worker}-{index}.png", "summary": f"worker{worker}"}
+        for index in range(5)
+    ]
+    for count in range(1, len(records) + 1):
+        similarity.get_index(records[:count])
+
+
+def test_workers_appending_to_one_index_keep_every_row(monkeypatch, tmp_path):
+    import multiprocessing
+
+    from similarity_index import SimilarityIndex
+
+    monkeypatch.setattr(similarity, "INDEX_DIR", tmp_path / "similarity")
+    monkeypatch.setattr(similarity, "_INDEX", None)
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_index_own_records, args=(worker,)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    index = SimilarityIndex(tmp_path / "similarity")
+    assert sorted(index.ids) == sorted(f"w{worker}-{item}" for worker in range(4) for item in range(5))
+    # Each row still holds its own record's vector, not one another worker wrote over it
+    for key in index.ids:
+        assert index.similar(key, k=1)[0][0].split("-")[0] == key.split("-")[0]
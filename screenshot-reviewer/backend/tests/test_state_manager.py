@@ -1,5 +1,6 @@
 import asyncio
 import json
+import time
 
 import pytest
 
@@ -34,3 +35,44 @@ def test_set_current_state_deduplicates(temp_state_file):
     saved = json.loads(temp_state_file.read_text())
     assert saved["selected"] == ["a", "b"]
     assert saved["timestamp"] == 123
+
+
+def test_deltas_keep_order_and_only_bump_version_on_change(temp_state_file):
+    state_manager.set_current_state({"selected": ["a", "b"], "timestamp": None})
+    version = state_manager.selection_info()["version"]
+
+    assert state_manager.add_selected(["c", "a", "d"], "t1") == 2
+    assert state_manager.remove_selected(["b", "zzz"], "t2") == 1
+    assert state_manager.add_selected(["a"], "t3") == 0
+
+    state = state_manager.get_current_state()
+    assert state["selected"] == ["a", "c", "d"]
+    assert state["timestamp"] == "t2"
+    assert state["version"] == version + 2
+
+
+def test_scheduled_saves_are_debounced_into_one_write(temp_state_file, monkeypatch):
+    writes = []
+    original = state_manager._write_state_file
+    monkeypatch.setattr(state_manager, "_write_state_file", lambda state=None: (writes.append(1), original(state)))
+    monkeypatch.setattr(state_manager, "STATE_SAVE_DEBOUNCE_SECONDS", 0.05)
+
+    for index in range(20):
+        state_manager.add_selected([f"id-{index}"], "now")
+        state_manager.schedule_save()
+
+    deadline = time.monotonic() + 5
+    while not temp_state_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(writes) == 1
+    assert json.loads(temp_state_file.read_text())["selected"] == [f"id-{index}" for index in range(20)]
+
+    # Nothing changed since, so a further scheduled save does not rewrite the file
+    state_manager.schedule_save()
+    time.sleep(0.15)
+    assert len(writes) == 1
+
+    # An explicit save always writes, so shutdown never loses the final state
+    asyncio.run(state_manager.save_selection_state())
+    assert len(writes) == 2
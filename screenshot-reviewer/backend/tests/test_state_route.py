@@ -1,8 +1,11 @@
+import asyncio
 import json
 
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from backend import main, state_manager
+from backend.routes import state
 
 
 def test_state_route_get_and_clear(tmp_path, monkeypatch):
@@ -41,3 +44,25 @@ def test_state_save_endpoint(tmp_path, monkeypatch):
         assert state_file.exists()
         saved = json.loads(state_file.read_text())
         assert saved["selected"] == ["alpha"]
+
+
+def test_selection_delta_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_manager, "STATE_FILE", tmp_path / "state.json")
+    state_manager.set_current_state({"selected": ["a"], "timestamp": None})
+    app = FastAPI()
+    app.include_router(state.router, prefix="/api/state")
+
+    with TestClient(app) as client:
+        added = client.post("/api/state/add", json={"ids": ["b", "c", "a"]}).json()
+        assert (added["changed"], added["count"]) == (2, 3)
+        removed = client.post("/api/state/remove", json={"ids": ["a"], "timestamp": "t"}).json()
+        assert (removed["changed"], removed["count"], removed["version"]) == (1, 2, added["version"] + 1)
+        assert "selected" not in removed
+
+        body = client.get("/api/state/").json()
+        assert body["selected"] == ["b", "c"] and body["timestamp"] == "t"
+        assert client.post("/api/state/add", json={"ids": "b"}).status_code == 422
+
+    # Write the pending version here so the background writer has nothing left to save
+    asyncio.run(state_manager.save_selection_state())
+    assert json.loads((tmp_path / "state.json").read_text())["selected"] == ["b", "c"]
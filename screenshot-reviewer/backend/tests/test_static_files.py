@@ -0,0 +1,49 @@
+"""Static file caching header tests."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.static_files import IMMUTABLE, REVALIDATE, CachedStaticFiles, hashed_assets
+
+
+def _client(tmp_path) -> TestClient:
+    screenshots = tmp_path / "shots"
+    screenshots.mkdir()
+    (screenshots / "shot.png").write_bytes(bytes(range(256)) * 4)
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<html></html>")
+    (dist / "assets" / "index-3f2a.js").write_text("console.log(1)")
+
+    app = FastAPI()
+    app.mount("/files", CachedStaticFiles(directory=screenshots), name="files")
+    app.mount("/", CachedStaticFiles(directory=dist, html=True, immutable=hashed_assets), name="frontend")
+    return TestClient(app)
+
+
+def test_screenshots_are_immutable_with_strong_etag(tmp_path):
+    client = _client(tmp_path)
+    response = client.get("/files/shot.png")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    cached = client.get("/files/shot.png", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag and cached.headers["cache-control"] == IMMUTABLE
+
+
+def test_range_requests_return_partial_content(tmp_path):
+    client = _client(tmp_path)
+    response = client.get("/files/shot.png", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.content == bytes(range(10, 20))
+
+
+def test_frontend_only_caches_hashed_assets(tmp_path):
+    client = _client(tmp_path)
+    assert client.get("/assets/index-3f2a.js").headers["cache-control"] == IMMUTABLE
+    assert client.get("/").headers["cache-control"] == REVALIDATE
+    assert client.get("/index.html").headers["cache-control"] == REVALIDATE
@@ -0,0 +1,118 @@
+"""Cross-process locking tests for storage."""
+
+import json
+import multiprocessing
+
+import pytest
+
+from backend import storage
+from backend.models import BatchUpdateRequest, CategoryCreate, LexiconCreate, ScreenshotUpdate
+from backend.routes import categories, lexicon, screenshots
+
+WORKERS = 4
+ROUNDS = 25
+
+pytestmark = pytest.mark.skipif(storage.fcntl is None, reason="fcntl locks are POSIX-only")
+
+
+# Each worker also edits its own field of one shared record
+SHARED_FIELDS = (
+    lambda round_number: {"primary_category": f"cat-{round_number}"},
+    lambda round_number: {"status": "reviewed" if round_number % 2 else "deferred"},
+    lambda round_number: {"confidence": round_number / 100},
+    lambda round_number: {"tags": [f"t{round_number}"]},
+)
+
+
+def _hammer(worker: int) -> None:
+    ids = [f"w{worker}-{index}" for index in range(3)]
+    for round_number in range(ROUNDS):
+        screenshots.batch_update(
+            BatchUpdateRequest(ids=ids, payload=ScreenshotUpdate(summary=f"{worker}:{round_number}"))
+        )
+        screenshots.batch_update(
+            BatchUpdateRequest(ids=["shared"], payload=ScreenshotUpdate(**SHARED_FIELDS[worker](round_number)))
+        )
+    # Forked workers exit without atexit hooks, so flush like the lifespan shutdown does
+    storage.close_write_buffers()
+
+
+@pytest.mark.parametrize("durability", [storage.DURABILITY_SYNC, storage.DURABILITY_DEFERRED])
+def test_concurrent_batch_updates_lose_nothing(tmp_path, monkeypatch, durability):
+    path = tmp_path / "screenshots.json"
+    dataset = [
+        {"id": f"w{worker}-{index}", "path": f"/{worker}-{index}.png", "summary": None}
+        for worker in range(WORKERS)
+        for index in range(3)
+    ]
+    dataset.append({"id": "shared", "path": "/shared.png"})
+    path.write_text(json.dumps(dataset), encoding="utf-8")
+    monkeypatch.setattr(storage, "_SCREENSHOTS_FILE", path)
+    monkeypatch.setattr(storage, "DEFAULT_DURABILITY", durability)
+    # Short windows so deferred flushes from different workers interleave
+    monkeypatch.setattr(storage, "WRITE_DEBOUNCE_SECONDS", 0.005)
+    monkeypatch.setattr(storage, "WRITE_MAX_DELAY_SECONDS", 0.02)
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_hammer, args=(worker,)) for worker in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    saved = {item["id"]: item for item in json.loads(path.read_text(encoding="utf-8"))}
+    assert {key: item["summary"] for key, item in saved.items() if key != "shared"} == {
+        item["id"]: f"{item['id'][1:].split('-')[0]}:{ROUNDS - 1}" for item in dataset[:-1]
+    }
+    shared = saved["shared"]
+    for update in SHARED_FIELDS:
+        for field, value in update(ROUNDS - 1).items():
+            assert shared[field] == value
+    if durability == storage.DURABILITY_SYNC:
+        assert storage.screenshots_revision() == WORKERS * ROUNDS * 2
+    else:
+        assert WORKERS <= storage.screenshots_revision() < WORKERS * ROUNDS * 2
+
+
+def _create_catalogue_entries(worker: int) -> None:
+    for round_number in range(ROUNDS):
+        categories.create_category(CategoryCreate(name=f"cat-{worker}-{round_number}"))
+        lexicon.create_entry(LexiconCreate(keyword=f"kw-{worker}-{round_number}", tags=["t"]))
+
+
+def test_concurrent_category_and_lexicon_creates_lose_nothing(tmp_path, monkeypatch):
+    for name in ("_SCREENSHOTS_FILE", "_CATEGORIES_FILE", "_LEXICON_FILE"):
+        path = tmp_path / f"{name.strip('_').lower()}.json"
+        path.write_text("[]", encoding="utf-8")
+        monkeypatch.setattr(storage, name, path)
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_create_catalogue_entries, args=(worker,)) for worker in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    expected = {f"{worker}-{round_number}" for worker in range(WORKERS) for round_number in range(ROUNDS)}
+    assert {cat["name"][4:] for cat in storage.load_categories()} == expected
+    assert {entry["keyword"][3:] for entry in storage.load_lexicon()} == expected
+    assert storage._read_revision(storage._CATEGORIES_FILE) == WORKERS * ROUNDS
+
+
+def test_failed_transaction_leaves_file_and_revision_alone(tmp_path, monkeypatch):
+    path = tmp_path / "screenshots.json"
+    path.write_text('[{"id": "a", "path": "/a.png"}]', encoding="utf-8")
+    monkeypatch.setattr(storage, "_SCREENSHOTS_FILE", path)
+    before = storage.screenshots_version()
+
+    with pytest.raises(KeyError):
+        with storage.screenshots_transaction() as dataset:
+            dataset.clear()
+            raise KeyError("boom")
+
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"id": "a", "path": "/a.png"}]
+    assert storage.screenshots_version() == before
+    storage.save_screenshots([])
+    assert storage.screenshots_revision() == 1
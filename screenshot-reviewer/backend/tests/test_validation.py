@@ -0,0 +1,74 @@
+"""Trusted fast path and schema-conformance tests."""
+
+import json
+
+import pytest
+
+from backend import validation
+from backend.models import PaginatedResponse, Screenshot, ScreenshotFilter
+from backend.routes import screenshots
+
+RECORDS = [
+    {"id": "a", "path": "/a.png"},
+    {
+        "id": "b",
+        "path": "/b.png",
+        "summary": "Sprint board",
+        "tags": ["jira", "work"],
+        "confidence": 1,
+        "primary_category": "Work",
+        "status": "re-review",
+        "ocr_text": "Sprint",
+        "created_at": "2025-01-01T10:00:00+00:00",
+        "updated_at": "2025-01-02T10:00:00",
+        "defer_until": "2025-02-01T00:00:00.123456Z",
+        "url": "http://localhost/files/b.png",
+        "hash": "abc",
+    },
+]
+
+
+@pytest.mark.parametrize("record", RECORDS, ids=lambda record: record["id"])
+def test_trusted_payload_conforms_to_schema(record):
+    item = dict(record)
+    assert validation.mark_validated(item)
+    item.update(group_id="grp-1", suggestions=["kpi"])
+
+    trusted = validation.screenshot_payload(item, trusted=True)
+
+    assert validation.is_validated(item)
+    assert trusted == Screenshot.model_validate(item).model_dump(mode="json")
+    assert list(trusted) == list(Screenshot.model_fields)
+
+
+def test_marker_covers_every_stored_field():
+    assert set(validation.STORED_FIELDS) | set(validation.DYNAMIC_FIELDS) == set(Screenshot.model_fields)
+
+
+def test_edited_or_invalid_records_fall_back_to_validation():
+    item = dict(RECORDS[1])
+    validation.mark_validated(item)
+    item["confidence"] = "0.25"  # written by another tool after validation
+
+    assert not validation.is_validated(item)
+    assert validation.screenshot_payload(item)["confidence"] == 0.25
+
+    bad = {"id": "c", "path": "/c.png", "tags": "not-a-list", "validated": "stale"}
+    assert not validation.mark_validated(bad)
+    assert "validated" not in bad
+
+
+def test_list_endpoint_body_matches_response_model(monkeypatch):
+    records = [dict(record) for record in RECORDS]
+    validation.mark_validated(records[1])
+    monkeypatch.setattr(screenshots, "load_screenshots", lambda: records)
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [{"keyword": "sprint", "tags": ["agile"]}])
+
+    response = screenshots.list_screenshots(
+        page=1, page_size=10, filter=ScreenshotFilter.ALL, category=None, search=None, group_id=None
+    )
+
+    body = json.loads(response.body)
+    assert PaginatedResponse.model_validate(body).model_dump(mode="json") == body
+    assert body["items"][0]["suggestions"] == ["agile"]
+    assert body["items"][0]["url"] is None  # file is missing on disk
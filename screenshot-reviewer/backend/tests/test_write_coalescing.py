@@ -0,0 +1,170 @@
+"""Coalesced (deferred) screenshot write tests."""
+
+import json
+import time
+
+import pytest
+
+from backend import storage
+from backend.serialization import write_file_atomic
+
+
+@pytest.fixture
+def dataset_file(tmp_path, monkeypatch):
+    path = tmp_path / "screenshots.json"
+    path.write_text(json.dumps([{"id": name, "path": f"/{name}.png"} for name in "abc"]), encoding="utf-8")
+    monkeypatch.setattr(storage, "_SCREENSHOTS_FILE", path)
+    monkeypatch.setattr(storage, "DEFAULT_DURABILITY", storage.DURABILITY_DEFERRED)
+    # Keep the background writer out of the way unless a test shortens this
+    monkeypatch.setattr(storage, "WRITE_DEBOUNCE_SECONDS", 60)
+    monkeypatch.setattr(storage, "WRITE_MAX_DELAY_SECONDS", 60)
+    yield path
+    storage.close_write_buffers()
+
+
+def _edit(item_id, **changes):
+    with storage.screenshots_transaction() as dataset:
+        next(item for item in dataset if item["id"] == item_id).update(changes)
+
+
+def _on_disk(path):
+    return {item["id"]: item for item in json.loads(path.read_text(encoding="utf-8"))}
+
+
+def _wait_for_revision(revision, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while storage.screenshots_revision() < revision and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return storage.screenshots_revision()
+
+
+def test_edits_are_visible_at_once_and_written_together(dataset_file):
+    before = storage.screenshots_version()
+    _edit("a", summary="one")
+    _edit("b", summary="two")
+
+    assert {item["id"]: item.get("summary") for item in storage.load_screenshots()} == {
+        "a": "one", "b": "two", "c": None,
+    }
+    assert storage.screenshots_version() != before  # cached views rebuild from the working copy
+    assert "summary" not in _on_disk(dataset_file)["a"]
+
+    assert storage.flush_screenshots() == 2
+    assert storage.screenshots_revision() == 1
+    assert _on_disk(dataset_file)["b"]["summary"] == "two"
+    assert storage.flush_screenshots() == 0
+
+
+def test_background_writer_flushes_after_the_debounce(dataset_file, monkeypatch):
+    monkeypatch.setattr(storage, "WRITE_DEBOUNCE_SECONDS", 0.05)
+    for index in range(5):
+        _edit("a", summary=str(index))
+    assert _wait_for_revision(1) == 1
+    assert _on_disk(dataset_file)["a"]["summary"] == "4"
+
+
+def test_max_pending_forces_a_write(dataset_file, monkeypatch):
+    monkeypatch.setattr(storage, "WRITE_MAX_PENDING", 3)
+    for index in range(3):
+        _edit("c", summary=str(index))
+    assert _wait_for_revision(1) == 1
+
+
+def test_sync_transaction_commits_queued_edits_in_the_same_write(dataset_file):
+    _edit("a", summary="queued")
+    with storage.screenshots_transaction(durability=storage.DURABILITY_SYNC) as dataset:
+        dataset[1]["summary"] = "sync"
+    saved = _on_disk(dataset_file)
+    assert (saved["a"]["summary"], saved["b"]["summary"]) == ("queued", "sync")
+    assert storage.screenshots_revision() == 1
+
+
+def test_flush_merges_with_a_save_from_another_process(dataset_file):
+    _edit("a", summary="ours")
+    # Another worker saves b in the meantime
+    other = list(_on_disk(dataset_file).values())
+    other[1]["summary"] = "theirs"
+    write_file_atomic(dataset_file, other)
+    storage._bump_revision(dataset_file)
+
+    storage.flush_screenshots()
+    saved = _on_disk(dataset_file)
+    assert (saved["a"]["summary"], saved["b"]["summary"]) == ("ours", "theirs")
+    assert list(saved) == ["a", "b", "c"]
+
+
+def test_failed_deferred_transaction_is_discarded(dataset_file):
+    with pytest.raises(KeyError):
+        with storage.screenshots_transaction() as dataset:
+            dataset[0]["summary"] = "partial"
+            raise KeyError("boom")
+    assert "summary" not in storage.load_screenshots()[0]
+    assert storage.flush_screenshots() == 0
+
+
+def test_unknown_durability_is_rejected(dataset_file):
+    with pytest.raises(ValueError):
+        with storage.screenshots_transaction(durability="eventually"):
+            pass
+
+
+def test_deferred_put_never_persists_response_fields(dataset_file, monkeypatch):
+    from backend.models import ScreenshotUpdate
+    from backend.routes import screenshots
+    from backend.validation import is_validated
+
+    monkeypatch.setattr(screenshots, "load_lexicon", lambda: [{"keyword": "a.png", "tags": ["found"]}])
+    response = screenshots.update_screenshot("a", ScreenshotUpdate(summary="edited"))
+    assert response.suggestions == ["found"]
+
+    assert "suggestions" not in storage.load_screenshots()[0]
+    storage.flush_screenshots()
+    saved = _on_disk(dataset_file)["a"]
+    assert saved["summary"] == "edited" and "suggestions" not in saved
+    assert is_validated(saved)
+
+
+def test_exit_signal_flushes_edits_before_stopping_sibling_workers(dataset_file, monkeypatch):
+    import asyncio
+    import signal
+    from types import SimpleNamespace
+
+    from backend import main
+
+    calls = []
+
+    class FakeProcess:
+        info = {"pid": -1, "name": "uvicorn", "cmdline": []}
+
+        def terminate(self):
+            calls.append(("terminate", _on_disk(dataset_file)["a"].get("summary")))
+
+        def kill(self):  # pragma: no cover - must not be used
+            calls.append(("kill", None))
+
+    async def no_state_save():
+        return None
+
+    monkeypatch.setattr(main, "save_selection_state", no_state_save)
+    monkeypatch.setattr(main, "psutil", SimpleNamespace(process_iter=lambda attrs: [FakeProcess()]))
+    _edit("a", summary="pending")
+
+    asyncio.run(main._handle_exit(signal.SIGTERM))
+
+    assert calls == [("terminate", "pending")]
+
+
+def test_process_pool_sees_edits_made_just_before_the_call(dataset_file):
+    import asyncio
+
+    from backend.executors import BoundedPool
+
+    _edit("a", summary="fresh")
+    pool = BoundedPool("proc", 1, processes=True)
+    try:
+        items = asyncio.run(pool.run(storage.load_screenshots))
+    finally:
+        pool.shutdown()
+
+    assert {item["id"]: item.get("summary") for item in items}["a"] == "fresh"
+    assert _on_disk(dataset_file)["a"]["summary"] == "fresh"
@@ -0,0 +1,84 @@
+"""Write-time validation markers that let the list endpoint skip per-item pydantic work.
+
+`mark_validated` runs a record through the `Screenshot` model once, stores the
+canonical JSON form of the fields it set, and records a ``validated`` marker made of
+the schema fingerprint plus a CRC of those stored values. On the read path
+`screenshot_payload` rebuilds the response dict straight from the record when the
+marker still matches, and falls back to full validation when it does not — for
+records written by other tools, edited by hand, or validated against an older
+schema.
+"""
+
+from __future__ import annotations
+
+import logging
+import zlib
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from .models import Screenshot
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+VALIDATED_KEY = "validated"
+# Computed per request by the list endpoint, so they are not covered by the marker.
+DYNAMIC_FIELDS = ("group_id", "suggestions")
+STORED_FIELDS: Tuple[str, ...] = tuple(name for name in Screenshot.model_fields if name not in DYNAMIC_FIELDS)
+SCHEMA_FINGERPRINT = f"{zlib.crc32(dumps(Screenshot.model_json_schema(), pretty=False, sort_keys=True)):08x}"
+
+_FIELDS: Tuple[str, ...] = tuple(Screenshot.model_fields)
+_DEFAULTS: Dict[str, Any] = Screenshot.model_construct(id="", path="").model_dump(mode="json")
+
+
+def _default(name: str) -> Any:
+    value = _DEFAULTS[name]
+    return list(value) if isinstance(value, list) else value
+
+
+def _stored_values(item: Mapping[str, Any]) -> Dict[str, Any]:
+    return {name: item.get(name) if name in item else _default(name) for name in STORED_FIELDS}
+
+
+def _marker(values: Dict[str, Any]) -> str:
+    return f"{SCHEMA_FINGERPRINT}:{zlib.crc32(dumps(values, pretty=False)):08x}"
+
+
+def mark_validated(item: Dict[str, Any]) -> bool:
+    """Validate and canonicalise ``item`` in place; returns False (and drops any marker) if invalid."""
+    try:
+        model = Screenshot.model_validate(item)
+    except ValidationError as exc:
+        item.pop(VALIDATED_KEY, None)
+        logger.debug("Screenshot %s failed validation: %s", item.get("id"), exc)
+        return False
+    canonical = model.model_dump(mode="json", exclude_unset=True)
+    item.update({name: value for name, value in canonical.items() if name in STORED_FIELDS})
+    item[VALIDATED_KEY] = _marker(_stored_values(item))
+    return True
+
+
+def is_validated(item: Mapping[str, Any]) -> bool:
+    marker = item.get(VALIDATED_KEY)
+    return bool(marker) and marker == _marker(_stored_values(item))
+
+
+def screenshot_payload(
+    item: Mapping[str, Any],
+    *,
+    trusted: Optional[bool] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """JSON-ready dict matching ``Screenshot.model_dump(mode="json")`` for ``item``.
+
+    ``trusted=None`` checks the marker; callers that already know (the columnar view
+    checks every record once per dataset version) pass it explicitly. ``fields``
+    limits the payload to those model fields.
+    """
+    if trusted is None:
+        trusted = is_validated(item)
+    if not trusted:
+        model = Screenshot.model_validate(item)
+        return model.model_dump(mode="json", include=None if fields is None else set(fields))
+    return {name: item[name] if name in item else _default(name) for name in (_FIELDS if fields is None else fields)}
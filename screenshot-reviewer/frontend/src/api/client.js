@@ -26,8 +26,12 @@ export const fetchScreenshots = async ({
   category,
   search,
   groupId,
+  view,
+  fields,
 }) => {
   const params = { page, page_size: pageSize, filter };
+  if (view) params.view = view;
+  if (fields) params.fields = Array.isArray(fields) ? fields.join(",") : fields;
   if (category) params.category = category;
   if (search) params.search = search;
   if (groupId) params.group_id = groupId;
@@ -0,0 +1,76 @@
+"""Time loading and saving screenshots.json with stdlib json vs the serialization layer.
+
+Run from screenshot-reviewer/:  python scripts/benchmark_json.py --counts 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend import serialization  # noqa: E402
+from benchmark_records import synthetic_payload  # noqa: E402
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def stdlib_save(path: Path, items: list) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump(items, fh, indent=2, ensure_ascii=False)
+
+
+def stdlib_load(path: Path) -> list:
+    with path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🔧 serializer backend: {serialization.BACKEND}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "screenshots.json"
+        for count in args.counts:
+            items = json.loads(synthetic_payload(count))
+            rows = []
+            for label, save in (
+                ("json indent=2", lambda: stdlib_save(path, items)),
+                ("compact", lambda: serialization.write_file_atomic(path, items, pretty=False)),
+                ("pretty", lambda: serialization.write_file_atomic(path, items, pretty=True)),
+            ):
+                save_seconds = best_of(args.repeat, save)
+                size_mb = path.stat().st_size / (1024 * 1024)
+                load = (lambda: stdlib_load(path)) if label.startswith("json") else (lambda: serialization.load_file(path))
+                load_seconds = best_of(args.repeat, load)
+                rows.append((label, size_mb, save_seconds, load_seconds))
+
+            print(f"📦 {count} screenshots")
+            baseline_save, baseline_load = rows[0][2], rows[0][3]
+            for label, size_mb, save_seconds, load_seconds in rows:
+                print(
+                    f"   {label:<14} {size_mb:7.1f} MB  save {save_seconds * 1000:8.1f} ms"
+                    f" ({baseline_save / save_seconds:4.1f}x)  load {load_seconds * 1000:8.1f} ms"
+                    f" ({baseline_load / load_seconds:4.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare resident memory of dict records vs slotted ScreenshotRecord objects.
+
+Run from screenshot-reviewer/:  python scripts/benchmark_records.py --count 100000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.records import to_records  # noqa: E402
+
+STATUSES = ("pending", "reviewed", "deferred", "re-review", "deleted")
+CATEGORIES = ("Gaming", "Coding", "Market Research", "Personal", "Work", None)
+TAGS = "python terminal jira dashboard skyrim inventory invoice chart slack figma docker build".split()
+
+
+def synthetic_payload(count: int, *, seed: int = 0, ocr_chars: int = 600) -> str:
+    """JSON text shaped like backend/data/screenshots.json."""
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        tags = rng.sample(TAGS, 3)
+        items.append(
+            {
+                "id": f"sha1_{index:08x}",
+                "path": f"/Volumes/990_Pro/Screenshots/2025/Screenshot {index:06d}.png",
+                "tags": tags,
+                "summary": f"Screenshot {index} showing {' and '.join(tags)}",
+                "primary_category": rng.choice(CATEGORIES),
+                "status": rng.choice(STATUSES),
+                "confidence": round(rng.random(), 2),
+                "ocr_text": " ".join(rng.choices(TAGS, k=ocr_chars // 7)),
+                "llama_result": {"tags_ai": tags, "summary": "synthetic", "confidence": 0.9, "ask_user": False},
+                "created_at": f"2025-01-{index % 28 + 1:02d}T10:{index % 60:02d}:00Z",
+                "updated_at": "2025-02-01T00:00:00Z",
+            }
+        )
+    return json.dumps(items)
+
+
+def measure(build) -> tuple[float, float, object]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current / (1024 * 1024), seconds, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50_000, help="Number of synthetic screenshots")
+    parser.add_argument("--ocr-chars", type=int, default=600, help="Approximate OCR text length per item")
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.count, ocr_chars=args.ocr_chars)
+    dict_mb, dict_seconds, dicts = measure(lambda: json.loads(payload))
+    record_mb, record_seconds, records = measure(lambda: to_records(json.loads(payload)))
+    assert len(dicts) == len(records)
+
+    # The OCR text is identical in both forms; report the per-record overhead without it too.
+    ocr_mb = sum(sys.getsizeof(item["ocr_text"]) for item in dicts) / (1024 * 1024)
+    saved = (1 - record_mb / dict_mb) * 100 if dict_mb else 0.0
+    print(f"📦 {args.count} screenshots")
+    print(f"   dicts:   {dict_mb:8.1f} MB ({dict_mb * 2**20 / args.count:6.0f} B/item) load {dict_seconds:.2f}s")
+    print(f"   records: {record_mb:8.1f} MB ({record_mb * 2**20 / args.count:6.0f} B/item) load {record_seconds:.2f}s")
+    print(f"   excluding OCR text: {dict_mb - ocr_mb:.1f} MB → {record_mb - ocr_mb:.1f} MB")
+    print(f"✅ records use {saved:.1f}% less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Validate every screenshot in backend/data/screenshots.json and store the result markers.
+
+Run after importing metadata produced elsewhere (screenshot_enricher.py, hand edits)
+so the list endpoint can serve those records without re-validating them per request.
+
+Run from screenshot-reviewer/:  python scripts/validate_dataset.py
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.storage import load_screenshots, save_screenshots  # noqa: E402
+from backend.validation import is_validated, mark_validated  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report counts without saving")
+    args = parser.parse_args()
+
+    dataset = load_screenshots()
+    already = sum(1 for item in dataset if is_validated(item))
+    invalid = [item.get("id") for item in dataset if not mark_validated(item)]
+    print(f"🔍 {len(dataset)} screenshots: {already} already marked, {len(invalid)} invalid")
+    for identifier in invalid[:20]:
+        print(f"   ⚠️ {identifier}")
+    if args.dry_run:
+        return
+    save_screenshots(dataset)
+    print(f"✅ Marked {len(dataset) - len(invalid)} screenshots as validated")
+
+
+if __name__ == "__main__":
+    main()
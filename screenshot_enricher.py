@@ -5,8 +5,11 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import heapq
 import json
 import logging
+import os
 import re
 import signal
 import subprocess
@@ -15,7 +18,12 @@ import time
 from datetime import UTC, datetime, timedelta, timezone
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Mapping
+
+import json_io
+
+if TYPE_CHECKING:
+    from similarity_index import SimilarityIndex
 
 YES_NO_QUESTIONS: list[tuple[str, str]] = [
     ("Is this screenshot related to work or productivity tools?", "work"),
@@ -26,32 +34,49 @@ YES_NO_QUESTIONS: list[tuple[str, str]] = [
 ]
 
 BATCH_SIZE = 5
+MAX_BATCH_SIZE = 25
+TOKEN_BUDGET_DEFAULT = 2048
+TOKEN_BUDGET_MIN = 256
+TOKEN_BUDGET_MAX = 8192
+RESPONSE_TOKENS_PER_ITEM = 64
+CHARS_PER_TOKEN = 4
+OCR_CHAR_BUDGET = 2000
 JSON_FILE = "screenshots.json"
 MODEL = "llama3.2"
 LOG_DIR_DEFAULT = Path("logs")
+CHECKPOINT_SUFFIX = ".checkpoint.ndjson"
+MERGE_EVERY_DEFAULT = 50
+PHASH_DISTANCE_DEFAULT = 6
 
 logger = logging.getLogger(__name__)
 
 
 def load_metadata(file_path: Path) -> list[dict[str, Any]]:
-    with file_path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
-
-
-def build_prompt(batch: list[dict[str, Any]]) -> str:
-    prompt_payload = []
-    for item in batch:
-        prompt_payload.append(
-            {
-                "filename": item.get("filename"),
-                "created_at": item.get("created_at"),
-                "year_month": item.get("year_month"),
-                "ocr_text": item.get("ocr_text", ""),
-            }
-        )
+    return json_io.load(file_path)
+
+
+# Static instructions come first and are byte-identical for every batch so Ollama can
+# reuse the KV cache for this prefix; only the screenshot list at the end varies.
+PROMPT_PREFIX = """
+You are a tagging assistant.
+
+You will receive a JSON array of screenshot objects, one per line. Output a JSON array of objects in the same order.
+
+For each screenshot:
+- Suggest 3–5 topical tags (project/game/tool, category, theme).
+- Write a short one-sentence summary (notes).
+- Include a confidence score (0–1).
+- If you cannot classify or are uncertain, set "ask_user": true and leave "tags_ai" empty.
+
+Return **only** JSON, in this structure:
+[{"filename":"...","tags_ai":["Tag1","Tag2"],"summary":"...","confidence":0.93,"ask_user":false}]
 
-    items_str = json.dumps(prompt_payload, indent=2, ensure_ascii=False)
-    prompt = f"""
+Input screenshots:
+""".strip()
+
+
+# Pre-compaction prompt layout, kept so prompt_token_report can measure the savings.
+LEGACY_PROMPT_TEMPLATE = """
 You are a tagging assistant.
 
 Analyze each screenshot object below and output a JSON array of objects in the same order.
@@ -63,7 +88,7 @@ For each screenshot:
 - If you cannot classify or are uncertain, set "ask_user": true and leave "tags_ai" empty.
 
 Input screenshots:
-{items_str}
+{items}
 
 Return **only** JSON, in this structure:
 [
@@ -76,8 +101,92 @@ Return **only** JSON, in this structure:
   }},
   ...
 ]
-""".strip()
-    return prompt
+"""
+
+
+def normalize_ocr_text(text: str | None, *, max_chars: int = OCR_CHAR_BUDGET) -> str:
+    """Collapse whitespace, drop repeated lines and trim OCR text to `max_chars`.
+
+    Over-budget text keeps its head and tail (2:1) around an ellipsis marker, since
+    window titles and status bars tend to sit at either end of a capture.
+    """
+    if not text:
+        return ""
+    seen: set[str] = set()
+    lines: list[str] = []
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    normalized = "\n".join(lines)
+    if max_chars <= 0 or len(normalized) <= max_chars:
+        return normalized
+    marker = " … "
+    keep = max(max_chars - len(marker), 0)
+    head = keep * 2 // 3
+    tail = keep - head
+    return normalized[:head] + marker + (normalized[-tail:] if tail else "")
+
+
+def _item_ocr_text(item: dict[str, Any], ocr_texts: Mapping[str, str] | None) -> str | None:
+    """Inline ocr_text, falling back to the OCR store text for the item's file hash."""
+    text = item.get("ocr_text")
+    if text or not ocr_texts:
+        return text
+    return ocr_texts.get(item.get("ocr_hash") or item.get("hash") or "")
+
+
+def _prompt_item(
+    item: dict[str, Any],
+    *,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> dict[str, Any]:
+    payload = {
+        "filename": item.get("filename"),
+        "created_at": item.get("created_at"),
+        "year_month": item.get("year_month"),
+        "ocr_text": normalize_ocr_text(_item_ocr_text(item, ocr_texts), max_chars=ocr_char_budget),
+    }
+    return {key: value for key, value in payload.items() if value}
+
+
+def build_legacy_prompt(
+    batch: list[dict[str, Any]],
+    *,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> str:
+    """The prompt as sent before compaction: indented JSON with full, raw OCR text."""
+    payload = [
+        {
+            "filename": item.get("filename"),
+            "created_at": item.get("created_at"),
+            "year_month": item.get("year_month"),
+            "ocr_text": _item_ocr_text(item, ocr_texts) or "",
+        }
+        for item in batch
+    ]
+    items = json.dumps(payload, indent=2, ensure_ascii=False)
+    return LEGACY_PROMPT_TEMPLATE.format(items=items).strip()
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_prompt(
+    batch: list[dict[str, Any]],
+    *,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> str:
+    lines = [
+        _compact_json(_prompt_item(item, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts))
+        for item in batch
+    ]
+    return f"{PROMPT_PREFIX}\n[\n" + ",\n".join(lines) + "\n]"
 
 
 class TimeoutExpired(Exception):
@@ -124,14 +233,20 @@ def prompt_menu(filename: str, confidence: float, *, timeout: int = 30, default_
     return action
 
 
-def build_retry_prompt(item: dict[str, Any], previous_result: dict[str, Any]) -> str:
+def build_retry_prompt(
+    item: dict[str, Any],
+    previous_result: dict[str, Any],
+    *,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> str:
     hint_tags = ", ".join(previous_result.get("tags_ai", []))
     return (
         "\n".join(
             [
                 "You returned low confidence "
                 f"({previous_result.get('confidence', 0)}) for:",
-                json.dumps(item, indent=2, ensure_ascii=False),
+                _compact_json(_prompt_item(item, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts)),
                 "",
                 f"Previous tags: {hint_tags or 'None'}",
                 "",
@@ -169,6 +284,65 @@ def pending_entries(data: list[dict[str, Any]], *, reference: datetime | None =
     return pending
 
 
+class DeferredScheduler:
+    """Track pending entries, holding deferred ones in a min-heap keyed by defer_until.
+
+    Ready entries are handed out by `pop_ready`; deferred entries only move into the
+    ready queue once their defer_until has passed, so callers never rescan the dataset.
+    Only entries with ``processed == 0`` are scheduled; entries without a ``processed``
+    field are left alone, as the enricher has always done.
+    """
+
+    def __init__(self, data: list[dict[str, Any]] | None = None, *, reference: datetime | None = None) -> None:
+        self._heap: list[tuple[float, int, dict[str, Any]]] = []
+        self._ready: list[dict[str, Any]] = []
+        self._seq = 0
+        reference = reference or datetime.now(UTC)
+        for entry in data or []:
+            self.push(entry, reference=reference)
+
+    def push(self, entry: dict[str, Any], *, reference: datetime | None = None) -> None:
+        """Queue an entry: processed ones are dropped, future-deferred ones go on the heap."""
+        if entry.get("processed") != 0:
+            return
+        if entry.get("status") == "deferred":
+            ready_at = parse_iso_utc(entry.get("defer_until", ""))
+            if ready_at > (reference or datetime.now(UTC)):
+                self._seq += 1
+                heapq.heappush(self._heap, (ready_at.timestamp(), self._seq, entry))
+                return
+        self._ready.append(entry)
+
+    def pop_ready(self, *, reference: datetime | None = None) -> list[dict[str, Any]]:
+        """Return all entries eligible at `reference`, moving due items off the heap."""
+        now = (reference or datetime.now(UTC)).timestamp()
+        while self._heap and self._heap[0][0] <= now:
+            ready_at, _, entry = heapq.heappop(self._heap)
+            if entry.get("processed") != 0:
+                continue
+            current = parse_iso_utc(entry.get("defer_until", "")).timestamp()
+            if entry.get("status") == "deferred" and current > ready_at:
+                # defer_until was pushed back after queuing; re-queue at the new time.
+                self._seq += 1
+                heapq.heappush(self._heap, (current, self._seq, entry))
+                continue
+            self._ready.append(entry)
+        ready, self._ready = self._ready, []
+        return ready
+
+    def seconds_until_next(self, *, reference: datetime | None = None) -> float | None:
+        """Seconds until the earliest deferred entry becomes eligible, or None if idle."""
+        if self._ready:
+            return 0.0
+        if not self._heap:
+            return None
+        now = (reference or datetime.now(UTC)).timestamp()
+        return max(self._heap[0][0] - now, 0.0)
+
+    def __len__(self) -> int:
+        return len(self._heap) + len(self._ready)
+
+
 def write_log(log_dir: Path | None, log_id: str, suffix: str, content: str) -> None:
     if not log_dir:
         return
@@ -277,45 +451,366 @@ def group_by_time(entries: list[dict[str, Any]], window: int = 30) -> list[list[
     return groups
 
 
+def _entry_epoch(entry: dict[str, Any]) -> float | None:
+    timestamp = entry.get("created_at") or entry.get("created")
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+class TimeIndex:
+    """Entries sorted by capture time for bisect range queries, plus cached tag sets
+    and an id/filename lookup.
+
+    Build once per run and call `update` after an entry's tags or timestamp change.
+    """
+
+    def __init__(self, data: list[dict[str, Any]]) -> None:
+        self._epochs: dict[int, float] = {}
+        self._tags: dict[int, frozenset[str]] = {}
+        self._by_key: dict[str, dict[str, Any]] = {}
+        pairs: list[tuple[float, dict[str, Any]]] = []
+        for entry in data:
+            self._by_key[entry.get("id") or entry.get("filename")] = entry
+            epoch = _entry_epoch(entry)
+            self._tags[id(entry)] = self._tag_set(entry)
+            if epoch is None:
+                continue
+            self._epochs[id(entry)] = epoch
+            pairs.append((epoch, entry))
+        pairs.sort(key=lambda pair: pair[0])
+        self._keys = [epoch for epoch, _ in pairs]
+        self._entries = [entry for _, entry in pairs]
+
+    @staticmethod
+    def _tag_set(entry: dict[str, Any]) -> frozenset[str]:
+        return frozenset(tag for tag in entry.get("tags_ai") or [] if tag)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Entry whose id (or filename, when it has no id) is `key`."""
+        return self._by_key.get(key)
+
+    def _remove(self, entry: dict[str, Any], epoch: float) -> None:
+        lo = bisect.bisect_left(self._keys, epoch)
+        hi = bisect.bisect_right(self._keys, epoch)
+        for pos in range(lo, hi):
+            if self._entries[pos] is entry:
+                del self._keys[pos]
+                del self._entries[pos]
+                return
+
+    def update(self, entry: dict[str, Any]) -> None:
+        """Refresh cached tags and re-position the entry if its timestamp changed."""
+        key = id(entry)
+        self._tags[key] = self._tag_set(entry)
+        old_epoch = self._epochs.get(key)
+        new_epoch = _entry_epoch(entry)
+        if old_epoch == new_epoch:
+            return
+        if old_epoch is not None:
+            self._remove(entry, old_epoch)
+            del self._epochs[key]
+        if new_epoch is not None:
+            pos = bisect.bisect_right(self._keys, new_epoch)
+            self._keys.insert(pos, new_epoch)
+            self._entries.insert(pos, entry)
+            self._epochs[key] = new_epoch
+
+    def neighbors(self, target: dict[str, Any], window_minutes: int = 5) -> list[dict[str, Any]]:
+        epoch = _entry_epoch(target)
+        if epoch is None:
+            return []
+        window = window_minutes * 60
+        lo = bisect.bisect_left(self._keys, epoch - window)
+        hi = bisect.bisect_right(self._keys, epoch + window)
+        return [entry for entry in self._entries[lo:hi] if entry is not target]
+
+    def tags_for(self, entries: list[dict[str, Any]]) -> list[str]:
+        """Sorted union of the cached tags_ai sets of `entries`."""
+        merged: set[str] = set()
+        for entry in entries:
+            tags = self._tags.get(id(entry))
+            merged.update(tags if tags is not None else self._tag_set(entry))
+        return sorted(merged)
+
+
 def find_similar_entries(
     target: dict[str, Any],
     data: list[dict[str, Any]],
     window_minutes: int = 5,
+    *,
+    index: TimeIndex | None = None,
 ) -> list[dict[str, Any]]:
     """Return entries captured within ±window_minutes of the target timestamp."""
-    timestamp = target.get("created_at") or target.get("created")
-    if not timestamp:
-        return []
-    try:
-        t0 = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-    except Exception:
-        return []
-    start = t0 - timedelta(minutes=window_minutes)
-    end = t0 + timedelta(minutes=window_minutes)
-    similar: list[dict[str, Any]] = []
-    for entry in data:
-        if entry is target:
-            continue
-        ts = entry.get("created_at") or entry.get("created")
-        if not ts:
-            continue
-        try:
-            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except Exception:
-            continue
-        if start <= dt <= end:
-            similar.append(entry)
-    return similar
+    index = index if index is not None else TimeIndex(data)
+    return index.neighbors(target, window_minutes)
 
 
-def build_batches(entries: list[dict[str, Any]], batch_size: int, window: int = 30) -> list[list[dict[str, Any]]]:
-    """Create batches respecting time grouping and batch size."""
+def text_neighbors(
+    target: dict[str, Any],
+    data: list[dict[str, Any]],
+    similarity: SimilarityIndex,
+    *,
+    k: int = 5,
+    ocr_texts: Mapping[str, str] | None = None,
+    index: TimeIndex | None = None,
+) -> list[dict[str, Any]]:
+    """Processed entries whose tags/summary/OCR text are closest to the target's OCR text."""
+    index = index if index is not None else TimeIndex(data)
+    vector = similarity.vectorize(target, ocr_text=_item_ocr_text(target, ocr_texts))
+    hits = similarity.top_k(vector, k, exclude=[target.get("id") or target.get("filename")])[0]
+    neighbors = (index.get(key) for key, _ in hits)
+    return [entry for entry in neighbors if entry is not None and entry is not target]
+
+
+PROPAGATED_FIELDS = ("tags_ai", "summary", "confidence", "llama_result")
+
+
+class DuplicateClusters:
+    """Exact (file hash) and near (perceptual hash) duplicate clusters over `data`.
+
+    Each cluster has one representative that is prompted; the other members are
+    followers that receive its result via `propagate`. A member that was already
+    processed on its own is preferred as representative.
+    """
+
+    def __init__(self, data: list[dict[str, Any]], *, max_distance: int | None = PHASH_DISTANCE_DEFAULT) -> None:
+        parent = list(range(len(data)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        def union(a: int, b: int) -> None:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        first_by_hash: dict[str, int] = {}
+        for index, entry in enumerate(data):
+            file_hash = entry.get("hash")
+            if file_hash:
+                union(first_by_hash.setdefault(file_hash, index), index)
+
+        if max_distance is not None and any(entry.get("phash") for entry in data):
+            from image_hashes import cluster_near_duplicates
+
+            positions = {id(entry): index for index, entry in enumerate(data)}
+            for cluster in cluster_near_duplicates(data, max_distance=max_distance):
+                for member in cluster[1:]:
+                    union(positions[id(cluster[0])], positions[id(member)])
+
+        groups: dict[int, list[dict[str, Any]]] = {}
+        for index, entry in enumerate(data):
+            groups.setdefault(find(index), []).append(entry)
+
+        self._representatives: list[dict[str, Any]] = []
+        self._representative: dict[int, dict[str, Any]] = {}
+        self._followers: dict[int, list[dict[str, Any]]] = {}
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            representative = min(members, key=self._representative_rank)
+            self._representatives.append(representative)
+            self._followers[id(representative)] = [entry for entry in members if entry is not representative]
+            for entry in members:
+                self._representative[id(entry)] = representative
+
+    @staticmethod
+    def _representative_rank(entry: dict[str, Any]) -> tuple[int, float]:
+        independent = entry.get("status") == "processed" and not entry.get("propagated_from")
+        epoch = _entry_epoch(entry)
+        return (0 if independent else 1, epoch if epoch is not None else float("inf"))
+
+    def __len__(self) -> int:
+        return len(self._representatives)
+
+    @property
+    def redundant(self) -> int:
+        return sum(len(followers) for followers in self._followers.values())
+
+    def is_follower(self, entry: dict[str, Any]) -> bool:
+        representative = self._representative.get(id(entry))
+        return representative is not None and representative is not entry
+
+    def propagate(self, representative: dict[str, Any]) -> list[dict[str, Any]]:
+        """Copy a processed representative's result onto its pending followers."""
+        if representative.get("status") != "processed":
+            return []
+        source = representative.get("filename")
+        updated = []
+        for entry in self._followers.get(id(representative), []):
+            if entry.get("status") == "processed" and entry.get("propagated_from") != source:
+                continue
+            for field in PROPAGATED_FIELDS:
+                if field in representative:
+                    entry[field] = representative[field]
+            entry.update({"processed": 1, "status": "processed", "propagated_from": source})
+            entry.pop("ask_user", None)
+            entry.pop("defer_until", None)
+            updated.append(entry)
+        return updated
+
+    def propagate_existing(self) -> list[dict[str, Any]]:
+        """Fill followers of representatives that were processed in an earlier run."""
+        updated = []
+        for representative in self._representatives:
+            updated.extend(self.propagate(representative))
+        return updated
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for Llama-family tokenizers (~4 characters per token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_item_tokens(
+    item: dict[str, Any],
+    *,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> int:
+    """Estimate the prompt and response tokens one screenshot adds to a batch."""
+    payload = _compact_json(_prompt_item(item, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts))
+    return estimate_tokens(payload) + RESPONSE_TOKENS_PER_ITEM
+
+
+def prompt_overhead_tokens() -> int:
+    """Tokens used by the fixed instruction block of `build_prompt`."""
+    return estimate_tokens(build_prompt([]))
+
+
+def prompt_token_report(
+    entries: list[dict[str, Any]],
+    *,
+    batch_size: int = BATCH_SIZE,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+) -> dict[str, float]:
+    """Compare estimated prompt tokens per item for the legacy and compact layouts.
+
+    Both layouts are built for consecutive batches of `batch_size`, with OCR text
+    from `ocr_texts` (the OCR store) standing in for items without inline text.
+    """
+    if not entries:
+        return {"items": 0, "before": 0.0, "after": 0.0, "saved_pct": 0.0}
+    before = 0
+    after = 0
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start : start + batch_size]
+        before += estimate_tokens(build_legacy_prompt(batch, ocr_texts=ocr_texts))
+        after += estimate_tokens(build_prompt(batch, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts))
+    count = len(entries)
+    before_per_item = before / count
+    after_per_item = after / count
+    saved = (1 - after_per_item / before_per_item) * 100 if before_per_item else 0.0
+    return {"items": count, "before": before_per_item, "after": after_per_item, "saved_pct": saved}
+
+
+class TokenBudget:
+    """Self-tuning per-batch token budget.
+
+    Result-count mismatches (the usual symptom of a truncated context) halve the
+    budget. Otherwise the budget hill-climbs on observed items/second, stepping
+    back when a batch exceeds `max_latency` or throughput drops.
+    """
+
+    def __init__(
+        self,
+        initial: int = TOKEN_BUDGET_DEFAULT,
+        *,
+        minimum: int = TOKEN_BUDGET_MIN,
+        maximum: int = TOKEN_BUDGET_MAX,
+        step: int = 256,
+        max_latency: float = 120.0,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.step = step
+        self.max_latency = max_latency
+        self._value = float(min(max(initial, minimum), self.maximum))
+        self._direction = 1
+        self._throughput: float | None = None
+
+    @property
+    def value(self) -> int:
+        return int(self._value)
+
+    def record(self, *, tokens: int, expected: int, returned: int, latency: float) -> None:
+        """Feed back one batch outcome and adjust the budget."""
+        if returned < expected:
+            # The model dropped results; assume the prompt overflowed its context.
+            self._value = max(min(self._value, tokens) / 2, self.minimum)
+            self._direction = 1
+            self._throughput = None
+            logger.info("Token budget reduced to %s after %s/%s results", self.value, returned, expected)
+            return
+
+        if latency > self.max_latency:
+            self._value = max(self._value * 0.8, self.minimum)
+            self._direction = 1
+            self._throughput = None
+            logger.info("Token budget reduced to %s after %.1fs batch", self.value, latency)
+            return
+
+        throughput = expected / latency if latency > 0 else float("inf")
+        if self._throughput is not None and throughput < self._throughput * 0.95:
+            self._direction = -self._direction
+        self._throughput = throughput if self._throughput is None else 0.7 * self._throughput + 0.3 * throughput
+        self._value = min(max(self._value + self._direction * self.step, self.minimum), self.maximum)
+
+
+def build_batches(
+    entries: list[dict[str, Any]],
+    batch_size: int,
+    window: int = 30,
+    *,
+    token_budget: int | None = None,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+    item_costs: dict[str, int] | None = None,
+) -> list[list[dict[str, Any]]]:
+    """Create batches respecting time grouping, batch size and an optional token budget.
+
+    With a token budget, items are packed until the estimated prompt (instruction
+    block plus per-item payload and response allowance) would exceed it. A batch
+    always holds at least one item. `item_costs` caches per-item estimates by id so
+    callers re-planning the same pending list only estimate each item once.
+    """
     batches: list[list[dict[str, Any]]] = []
+    overhead = prompt_overhead_tokens() if token_budget else 0
     for group in group_by_time(entries, window=window):
-        chunk = list(group)
-        while chunk:
-            batches.append(chunk[:batch_size])
-            chunk = chunk[batch_size:]
+        if not token_budget:
+            chunk = list(group)
+            while chunk:
+                batches.append(chunk[:batch_size])
+                chunk = chunk[batch_size:]
+            continue
+        current: list[dict[str, Any]] = []
+        used = overhead
+        for entry in group:
+            key = entry.get("id") or entry.get("filename")
+            cost = item_costs.get(key) if item_costs is not None and key else None
+            if cost is None:
+                cost = estimate_item_tokens(entry, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts)
+                if item_costs is not None and key:
+                    item_costs[key] = cost
+            if current and (len(current) >= batch_size or used + cost > token_budget):
+                batches.append(current)
+                current = []
+                used = overhead
+            current.append(entry)
+            used += cost
+        if current:
+            batches.append(current)
     return batches
 
 
@@ -346,6 +841,11 @@ def call_llama(
         print(stderr_text or stdout_text, file=sys.stderr)
         raise RuntimeError(f"ollama exited with code {process.returncode}")
 
+    return parse_llama_output(stdout_text, log_dir=log_dir, expect_list=expect_list)
+
+
+def parse_llama_output(stdout_text: str, *, log_dir: Path | None, expect_list: bool = True) -> Any:
+    """Coerce raw model output into a result list (batch) or a single object (retry)."""
     parsed = _extract_json_block(stdout_text)
 
     if expect_list:
@@ -382,8 +882,75 @@ def call_llama(
 
 
 def save_metadata(file_path: Path, data: list[dict[str, Any]]) -> None:
-    with file_path.open("w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2, ensure_ascii=False)
+    json_io.save(file_path, data)
+
+
+class CheckpointLog:
+    """Append-only NDJSON log of per-item results, merged into the main JSON periodically.
+
+    Each line is a full item snapshot keyed by filename; later lines win on replay.
+    """
+
+    def __init__(self, json_path: Path, *, fsync_every: int = 1) -> None:
+        self.json_path = json_path
+        self.path = json_path.with_suffix(json_path.suffix + CHECKPOINT_SUFFIX)
+        self.fsync_every = max(fsync_every, 1)
+        self._fh = None
+        self._unsynced = 0
+
+    def append(self, entries: list[dict[str, Any]]) -> None:
+        if self._fh is None:
+            self._fh = self.path.open("a", encoding="utf-8")
+        for entry in entries:
+            self._fh.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._fh is None or not self._unsynced:
+            return
+        os.fsync(self._fh.fileno())
+        self._unsynced = 0
+
+    def replay(self, data: list[dict[str, Any]]) -> int:
+        """Apply logged results onto `data`, returning the number of records applied."""
+        if not self.path.exists():
+            return 0
+        index = {entry.get("filename"): idx for idx, entry in enumerate(data) if entry.get("filename")}
+        applied = 0
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line_no, line in enumerate(fh, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except JSONDecodeError:
+                    # A crash mid-write leaves at most one torn trailing line.
+                    logger.warning("Skipping unreadable checkpoint line %s in %s", line_no, self.path)
+                    continue
+                idx = index.get(record.get("filename")) if isinstance(record, dict) else None
+                if idx is None:
+                    continue
+                data[idx] = record
+                applied += 1
+        return applied
+
+    def merge(self, data: list[dict[str, Any]]) -> None:
+        """Rewrite the main JSON file with `data` and truncate the log."""
+        self.sync()
+        save_metadata(self.json_path, data)
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.sync()
+        self._fh.close()
+        self._fh = None
 
 
 def update_master(data: list[dict[str, Any]], batch: list[dict[str, Any]]) -> None:
@@ -409,15 +976,48 @@ def enrich_batches(
     confirm: bool,
     progress: dict[str, int],
     initial_unprocessed: list[dict[str, Any]] | None = None,
+    checkpoint: CheckpointLog | None = None,
+    merge_every: int = MERGE_EVERY_DEFAULT,
+    scheduler: DeferredScheduler | None = None,
+    token_budget: TokenBudget | None = None,
+    ocr_char_budget: int = OCR_CHAR_BUDGET,
+    ocr_texts: Mapping[str, str] | None = None,
+    call_model: Callable[..., Any] = call_llama,
+    timings: dict[str, float] | None = None,
+    time_index: TimeIndex | None = None,
+    duplicates: DuplicateClusters | None = None,
+    similarity: SimilarityIndex | None = None,
 ) -> None:
-    unprocessed = initial_unprocessed if initial_unprocessed is not None else pending_entries(data)
+    timings = timings if timings is not None else {}
+    for key in ("batching", "model", "persist"):
+        timings.setdefault(key, 0.0)
+    if initial_unprocessed is not None:
+        unprocessed = initial_unprocessed
+    elif scheduler is not None:
+        unprocessed = scheduler.pop_ready()
+    else:
+        unprocessed = pending_entries(data)
+    if duplicates is not None:
+        unprocessed = [entry for entry in unprocessed if not duplicates.is_follower(entry)]
     total = progress.setdefault("total", len(data))
     progress.setdefault("processed", 0)
     progress.setdefault("deferred", 0)
     print(f"{len(unprocessed)} screenshots pending")
+    batches_since_merge = 0
+    # Token estimates depend only on the item and ocr_char_budget, so compute them once per run
+    item_costs: dict[str, int] = {}
 
     while unprocessed:
-        grouped_batches = build_batches(unprocessed, batch_size)
+        started = time.perf_counter()
+        grouped_batches = build_batches(
+            unprocessed,
+            batch_size,
+            token_budget=token_budget.value if token_budget else None,
+            ocr_char_budget=ocr_char_budget,
+            ocr_texts=ocr_texts,
+            item_costs=item_costs,
+        )
+        timings["batching"] += time.perf_counter() - started
         if not grouped_batches:
             break
         batch = grouped_batches[0]
@@ -425,15 +1025,18 @@ def enrich_batches(
         batch_processed = 0
         batch_deferred = 0
         batch_retried = 0
-        prompt = build_prompt(batch)
+        prompt = build_prompt(batch, ocr_char_budget=ocr_char_budget, ocr_texts=ocr_texts)
         log_id = batch[0].get("filename", "batch")
-        llama_results = call_llama(
+        started = time.perf_counter()
+        llama_results = call_model(
             prompt,
             model=model,
             log_dir=log_dir,
             log_id=log_id,
             expect_list=True,
         )
+        latency = time.perf_counter() - started
+        timings["model"] += latency
 
         if isinstance(llama_results, dict):
             llama_results = [llama_results]
@@ -473,6 +1076,14 @@ def enrich_batches(
                     logger.warning("Deferred %s due to missing Llama result", item.get("filename"))
             llama_results = aligned_results
 
+        if token_budget is not None:
+            token_budget.record(
+                tokens=estimate_tokens(prompt) + RESPONSE_TOKENS_PER_ITEM * len(batch),
+                expected=len(batch),
+                returned=sum(1 for result in llama_results if isinstance(result, dict)),
+                latency=latency,
+            )
+
         bad_response_log = Path("logs") / "bad_responses.jsonl"
 
         for index, item in enumerate(batch):
@@ -566,7 +1177,17 @@ def enrich_batches(
 
                 if action == "retry":
                     if interactive:
-                        similar_entries = find_similar_entries(item, data)
+                        time_index = time_index or TimeIndex(data)
+                        similar_entries = find_similar_entries(item, data, index=time_index)
+                        if similarity is not None:
+                            seen = {id(entry) for entry in similar_entries}
+                            similar_entries += [
+                                entry
+                                for entry in text_neighbors(
+                                    item, data, similarity, ocr_texts=ocr_texts, index=time_index
+                                )
+                                if id(entry) not in seen
+                            ]
                         if similar_entries:
                             print("🧭 Nearby screenshots for context:")
                             for neighbor in similar_entries[:5]:
@@ -579,14 +1200,7 @@ def enrich_batches(
                                     f"   - {neighbor.get('filename', '<unknown>')} → "
                                     f"tags: {', '.join(neighbor_tags) or '—'} (conf {conf_display})"
                                 )
-                        suggested_tags = sorted(
-                            {
-                                tag
-                                for entry in similar_entries
-                                for tag in entry.get("tags_ai", [])
-                                if tag
-                            }
-                        )
+                        suggested_tags = time_index.tags_for(similar_entries)
                         if suggested_tags:
                             print(f"💡 Suggested tags: {', '.join(suggested_tags)}")
 
@@ -599,10 +1213,15 @@ def enrich_batches(
                         )
 
                     if confirm_retry.lower().startswith("y"):
-                        retry_prompt = build_retry_prompt(item, result)
+                        retry_prompt = build_retry_prompt(
+                            item,
+                            result,
+                            ocr_char_budget=ocr_char_budget,
+                            ocr_texts=ocr_texts,
+                        )
                         try:
                             retry_log_id = f"{log_id}-retry-{index}"
-                            retry_response = call_llama(
+                            retry_response = call_model(
                                 retry_prompt,
                                 model=model,
                                 log_dir=log_dir,
@@ -643,15 +1262,9 @@ def enrich_batches(
 
                 if action == "manual":
                     if not suggested_tags:
-                        similar_entries = similar_entries or find_similar_entries(item, data)
-                        suggested_tags = sorted(
-                            {
-                                tag
-                                for entry in similar_entries
-                                for tag in entry.get("tags_ai", [])
-                                if tag
-                            }
-                        )
+                        time_index = time_index or TimeIndex(data)
+                        similar_entries = similar_entries or find_similar_entries(item, data, index=time_index)
+                        suggested_tags = time_index.tags_for(similar_entries)
                     include_suggested = False
                     if suggested_tags:
                         print(f"💡 Nearby suggested tags: {', '.join(suggested_tags)}")
@@ -715,9 +1328,33 @@ def enrich_batches(
             item.pop("defer_until", None)
             batch_processed += 1
 
+        propagated: list[dict[str, Any]] = []
+        if duplicates is not None:
+            for entry in batch:
+                propagated.extend(duplicates.propagate(entry))
+            if propagated:
+                print(f"🪞 Copied results to {len(propagated)} near-duplicate screenshots")
+
         update_master(data, batch)
+        if time_index is not None:
+            for entry in [*batch, *propagated]:
+                time_index.update(entry)
+        if similarity is not None:
+            similarity.upsert(
+                [entry for entry in [*batch, *propagated] if entry.get("status") == "processed"],
+                ocr_text=lambda entry: _item_ocr_text(entry, ocr_texts),
+            )
 
-        save_metadata(json_path, data)
+        started = time.perf_counter()
+        if checkpoint is None:
+            save_metadata(json_path, data)
+        else:
+            checkpoint.append([*batch, *propagated])
+            batches_since_merge += 1
+            if merge_every > 0 and batches_since_merge >= merge_every:
+                checkpoint.merge(data)
+                batches_since_merge = 0
+        timings["persist"] += time.perf_counter() - started
         print(f"✅ Processed {len(batch)} screenshots. Saved progress.")
 
         write_batch_summary(
@@ -752,7 +1389,16 @@ def enrich_batches(
             f"{batch_deferred} deferred ({pct_batch_def:.1f}%)"
         )
 
-        unprocessed = pending_entries(data)
+        if scheduler is None:
+            unprocessed = pending_entries(data)
+        else:
+            batch_ids = {id(entry) for entry in batch}
+            unprocessed = [entry for entry in unprocessed if id(entry) not in batch_ids]
+            for entry in batch:
+                scheduler.push(entry)
+            unprocessed.extend(scheduler.pop_ready())
+        if duplicates is not None:
+            unprocessed = [entry for entry in unprocessed if not duplicates.is_follower(entry)]
 
         if interactive and confirm and unprocessed:
             cont = input("Continue with next batch? (y/n): ")
@@ -774,8 +1420,23 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=BATCH_SIZE,
-        help="Number of screenshots per batch",
+        default=None,
+        help=(
+            f"Maximum screenshots per batch (default {MAX_BATCH_SIZE} with a token budget, "
+            f"{BATCH_SIZE} without)"
+        ),
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=TOKEN_BUDGET_DEFAULT,
+        help="Initial estimated tokens per batch; adapts to latency and truncation (0 = fixed batch size)",
+    )
+    parser.add_argument(
+        "--max-batch-latency",
+        type=float,
+        default=120.0,
+        help="Shrink the token budget when a batch takes longer than this many seconds",
     )
     parser.add_argument(
         "--model",
@@ -816,6 +1477,62 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Process all batches without asking to continue",
     )
+    parser.add_argument(
+        "--ocr-chars",
+        type=int,
+        default=OCR_CHAR_BUDGET,
+        help="Maximum OCR characters sent per screenshot after normalization (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--ocr-store",
+        type=Path,
+        default=None,
+        help="OCR store written by ocr_screenshots.py, used when entries have no inline ocr_text",
+    )
+    parser.add_argument(
+        "--prompt-report",
+        action="store_true",
+        help="Print estimated prompt tokens per screenshot before/after compaction and exit",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Prompt one screenshot per duplicate cluster (file hash or phash) and copy its result to the rest",
+    )
+    parser.add_argument(
+        "--dedupe-distance",
+        type=int,
+        default=PHASH_DISTANCE_DEFAULT,
+        help="Maximum perceptual-hash Hamming distance for --dedupe (-1 = exact file hash only)",
+    )
+    parser.add_argument(
+        "--similarity-index",
+        type=Path,
+        default=None,
+        help="Directory of the text similarity index; nearest processed screenshots feed retry hints",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and sleep until the next deferred screenshot becomes eligible",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Rewrite the JSON file after every batch instead of appending to a checkpoint log",
+    )
+    parser.add_argument(
+        "--checkpoint-fsync-every",
+        type=int,
+        default=1,
+        help="Fsync the checkpoint log every N batches",
+    )
+    parser.add_argument(
+        "--merge-every",
+        type=int,
+        default=MERGE_EVERY_DEFAULT,
+        help="Merge the checkpoint log into the JSON file every K batches (0 = only on exit)",
+    )
     parser.add_argument(
         "--no-logs",
         action="store_true",
@@ -836,7 +1553,37 @@ def main() -> None:
     log_dir: Path | None = None if args.no_logs else LOG_DIR_DEFAULT
 
     data = load_metadata(json_path)
+    checkpoint: CheckpointLog | None = None
+    if not args.no_checkpoint:
+        checkpoint = CheckpointLog(json_path, fsync_every=args.checkpoint_fsync_every)
+        replayed = checkpoint.replay(data)
+        if replayed:
+            print(f"♻️  Recovered {replayed} results from {checkpoint.path.name}")
+            checkpoint.merge(data)
     data = sanitize_defer_timestamps(data)
+    ocr_texts: dict[str, str] | None = None
+    if args.ocr_store:
+        from ocr_store import OCRStore
+
+        wanted = [
+            entry.get("ocr_hash") or entry.get("hash")
+            for entry in data
+            if (args.prompt_report or not entry.get("processed")) and not entry.get("ocr_text")
+        ]
+        with OCRStore(args.ocr_store.expanduser().resolve()) as store:
+            ocr_texts = {key: record.text for key, record in store.get_many(filter(None, wanted)).items()}
+        print(f"🔎 Loaded OCR text for {len(ocr_texts)} screenshots from {args.ocr_store}")
+    if args.prompt_report:
+        batch_size = args.batch_size or BATCH_SIZE
+        report = prompt_token_report(
+            data, batch_size=batch_size, ocr_char_budget=args.ocr_chars, ocr_texts=ocr_texts
+        )
+        print(
+            f"\n🧾 Prompt tokens per screenshot ({report['items']} items, batch size {batch_size})"
+            f"\n   Before compaction: {report['before']:.1f}"
+            f"\n   After compaction:  {report['after']:.1f} ({report['saved_pct']:.1f}% fewer)"
+        )
+        return
     total_items = len(data)
     processed_items = sum(1 for entry in data if entry.get("status") == "processed")
     deferred_items = sum(1 for entry in data if entry.get("status") == "deferred")
@@ -853,39 +1600,92 @@ def main() -> None:
         "deferred": deferred_items,
     }
 
-    now = datetime.now(UTC)
-
-    def is_ready(entry: dict[str, Any]) -> bool:
-        if entry.get("processed") != 0:
-            return False
-        if entry.get("status") != "deferred":
-            return True
-        ready_at = parse_iso_utc(entry.get("defer_until"))
-        return ready_at <= now
-
-    initial_unprocessed = [entry for entry in data if is_ready(entry)]
-    confirm_batches = not args.no_confirm and not args.auto
-    try:
-        enrich_batches(
-            data=data,
-            json_path=json_path,
-            batch_size=args.batch_size,
-            model=args.model,
-            sleep_seconds=args.sleep,
-            interactive=not args.no_interactive,
-            log_dir=log_dir,
-            confidence_threshold=args.confidence_threshold,
-            defer_hours=args.defer_hours,
-            auto=args.auto,
-            confirm=confirm_batches,
-            progress=progress,
-            initial_unprocessed=initial_unprocessed,
+    scheduler = DeferredScheduler(data)
+    duplicates: DuplicateClusters | None = None
+    if args.dedupe:
+        duplicates = DuplicateClusters(
+            data,
+            max_distance=args.dedupe_distance if args.dedupe_distance >= 0 else None,
+        )
+        filled = duplicates.propagate_existing()
+        if filled and checkpoint is not None:
+            checkpoint.append(filled)
+        elif filled:
+            save_metadata(json_path, data)
+        print(
+            f"🪞 {len(duplicates)} duplicate clusters: {duplicates.redundant} screenshots will reuse a "
+            f"representative's result ({len(filled)} filled from earlier runs)"
         )
+    time_index = TimeIndex(data) if not args.no_interactive else None
+    similarity: SimilarityIndex | None = None
+    if args.similarity_index:
+        from similarity_index import SimilarityIndex
+
+        similarity = SimilarityIndex(args.similarity_index.expanduser().resolve())
+        added = similarity.upsert(
+            [entry for entry in data if entry.get("status") == "processed"],
+            ocr_text=lambda entry: _item_ocr_text(entry, ocr_texts),
+        )
+        similarity.save()
+        print(f"🧲 Similarity index: {len(similarity)} screenshots ({added} added or refreshed)")
+    token_budget: TokenBudget | None = None
+    if args.token_budget > 0:
+        token_budget = TokenBudget(args.token_budget, max_latency=args.max_batch_latency)
+    batch_size = args.batch_size or (MAX_BATCH_SIZE if token_budget else BATCH_SIZE)
+    confirm_batches = not args.no_confirm and not args.auto and not args.daemon
+    try:
+        while True:
+            enrich_batches(
+                data=data,
+                json_path=json_path,
+                batch_size=batch_size,
+                model=args.model,
+                sleep_seconds=args.sleep,
+                interactive=not args.no_interactive,
+                log_dir=log_dir,
+                confidence_threshold=args.confidence_threshold,
+                defer_hours=args.defer_hours,
+                auto=args.auto,
+                confirm=confirm_batches,
+                progress=progress,
+                checkpoint=checkpoint,
+                merge_every=args.merge_every,
+                scheduler=scheduler,
+                token_budget=token_budget,
+                ocr_char_budget=args.ocr_chars,
+                ocr_texts=ocr_texts,
+                time_index=time_index,
+                duplicates=duplicates,
+                similarity=similarity,
+            )
+            if similarity is not None:
+                similarity.save()
+            if not args.daemon:
+                break
+            wait_seconds = scheduler.seconds_until_next()
+            if wait_seconds is None:
+                print("\n🏁 No deferred screenshots left; daemon exiting")
+                break
+            if checkpoint is not None:
+                checkpoint.merge(data)
+            else:
+                save_metadata(json_path, data)
+            wake_at = isoformat_utc(datetime.now(UTC) + timedelta(seconds=wait_seconds))
+            print(f"\n💤 {len(scheduler)} deferred screenshots; sleeping until {wake_at}")
+            time.sleep(wait_seconds)
     except KeyboardInterrupt:
         print("\n🛑 Interrupted by user. Saving progress before exit...")
-        save_metadata(json_path, data)
+        if similarity is not None:
+            similarity.save()
+        if checkpoint is not None:
+            checkpoint.merge(data)
+        else:
+            save_metadata(json_path, data)
         sys.exit(0)
 
+    if checkpoint is not None:
+        checkpoint.merge(data)
+
     final_processed = progress.get("processed", processed_items)
     final_deferred = progress.get("deferred", deferred_items)
     final_remaining = max(total_items - final_processed - final_deferred, 0)
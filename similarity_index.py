@@ -0,0 +1,287 @@
+"""CPU-only text similarity index over screenshots (hashed TF-IDF in a float32 memmap).
+
+Each screenshot becomes a signed, hashed bag of words over its tags, summary and OCR
+text, weighted by log term frequency and IDF and L2-normalised, so cosine similarity is
+a dot product. Rows live in `vectors.f32` (np.memmap) and ids/document frequencies in
+`index.json`; new or changed screenshots are appended or overwritten in place.
+Writers in different processes must serialise upsert+save under a lock of their own
+and call `reload` first, so rows appended by another process are picked up rather
+than overwritten.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+
+DEFAULT_DIM = 512
+DEFAULT_TOP_K = 10
+QUERY_CHUNK_ROWS = 65_536
+TAG_WEIGHT = 3
+VECTORS_FILE = "vectors.f32"
+META_FILE = "index.json"
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_\-]+")
+_INITIAL_CAPACITY = 1024
+
+
+def entry_key(entry: Mapping[str, Any]) -> str | None:
+    return entry.get("id") or entry.get("filename")
+
+
+def entry_text(entry: Mapping[str, Any], ocr_text: str | None = None) -> tuple[list[str], str]:
+    """Return (tags, free text) for an entry; tags are counted TAG_WEIGHT times."""
+    tags = [str(tag) for tag in [*(entry.get("tags") or []), *(entry.get("tags_ai") or [])] if tag]
+    text = " ".join(
+        part
+        for part in (entry.get("summary"), ocr_text if ocr_text is not None else entry.get("ocr_text"))
+        if part
+    )
+    return tags, text
+
+
+def entry_signature(entry: Mapping[str, Any]) -> int:
+    """Cheap fingerprint of the fields that feed the vector (OCR is identified by its hash)."""
+    tags, _ = entry_text(entry, ocr_text="")
+    parts = [
+        "|".join(tags),
+        entry.get("summary") or "",
+        entry.get("ocr_hash") or entry.get("hash") or "",
+        entry.get("ocr_text") or "",
+    ]
+    return zlib.crc32("\x1f".join(parts).encode("utf-8"))
+
+
+def _tokens(tags: Sequence[str], text: str) -> Counter:
+    counts: Counter = Counter(_TOKEN_RE.findall(text.lower()))
+    for tag in tags:
+        for token in _TOKEN_RE.findall(tag.lower()):
+            counts[token] += TAG_WEIGHT
+    return counts
+
+
+def _hashed_terms(counts: Counter, dim: int) -> dict[int, float]:
+    """Signed feature hashing: crc32 picks the bucket, its top bit picks the sign."""
+    features: dict[int, float] = {}
+    for token, count in counts.items():
+        digest = zlib.crc32(token.encode("utf-8"))
+        sign = -1.0 if digest & 0x80000000 else 1.0
+        bucket = digest % dim
+        features[bucket] = features.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    return features
+
+
+class SimilarityIndex:
+    """Memory-mapped matrix of normalised TF-IDF rows with batched cosine top-k."""
+
+    def __init__(self, directory: Path | None = None, *, dim: int = DEFAULT_DIM) -> None:
+        self.directory = directory
+        self.dim = dim
+        self.ids: list[str] = []
+        self.signatures: list[int] = []
+        self.df = np.zeros(dim, dtype=np.float64)
+        self._rows: dict[str, int] = {}
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._stamp: tuple[int, int] | None = None
+        if directory is not None:
+            self._open(directory)
+
+    # ── persistence ────────────────────────────
+    def _open(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        meta_path = directory / META_FILE
+        vectors_path = directory / VECTORS_FILE
+        self._stamp = self._meta_stamp()
+        if meta_path.exists() and vectors_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("dim") == self.dim:
+                self.ids = list(meta["ids"])
+                self.signatures = list(meta.get("signatures") or [0] * len(self.ids))
+                self.df = np.asarray(meta["df"], dtype=np.float64)
+                self._rows = {key: row for row, key in enumerate(self.ids)}
+        capacity = max(len(self.ids), _INITIAL_CAPACITY)
+        self._map(vectors_path, capacity)
+
+    def _meta_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = (self.directory / META_FILE).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """Re-open the index if another process saved it since we loaded or saved; unsaved rows are dropped."""
+        if self.directory is None or self._meta_stamp() == self._stamp:
+            return False
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        self.ids, self.signatures, self._rows = [], [], {}
+        self.df = np.zeros(self.dim, dtype=np.float64)
+        self._open(self.directory)
+        return True
+
+    def _map(self, path: Path, capacity: int) -> None:
+        size = capacity * self.dim * 4
+        with path.open("a+b") as fh:
+            if fh.seek(0, 2) < size:
+                fh.truncate(size)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2, _INITIAL_CAPACITY)
+        if self.directory is None:
+            grown = np.zeros((new_capacity, self.dim), dtype=np.float32)
+            grown[:capacity] = self._vectors
+            self._vectors = grown
+            return
+        self._vectors.flush()
+        del self._vectors
+        self._map(self.directory / VECTORS_FILE, new_capacity)
+
+    def save(self) -> None:
+        if self.directory is None:
+            return
+        self._vectors.flush()
+        meta = {"dim": self.dim, "ids": self.ids, "signatures": self.signatures, "df": self.df.tolist()}
+        tmp_path = self.directory / (META_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(self.directory / META_FILE)
+        self._stamp = self._meta_stamp()
+
+    # ── vectors ────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def is_current(self, entry: Mapping[str, Any]) -> bool:
+        row = self._rows.get(entry_key(entry) or "")
+        return row is not None and self.signatures[row] == entry_signature(entry)
+
+    def _idf(self) -> np.ndarray:
+        return np.log((1.0 + len(self.ids)) / (1.0 + self.df)) + 1.0
+
+    def _vector(self, features: Mapping[int, float], idf: np.ndarray) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if features:
+            buckets = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+            weights = np.fromiter(features.values(), dtype=np.float64, count=len(features))
+            vector[buckets] = weights * idf[buckets]
+            norm = float(np.linalg.norm(vector))
+            if norm:
+                vector /= norm
+        return vector
+
+    def vectorize(self, entry: Mapping[str, Any], *, ocr_text: str | None = None) -> np.ndarray:
+        """Vector for an entry under the current IDF, without adding it to the index."""
+        return self._vector(_hashed_terms(_tokens(*entry_text(entry, ocr_text)), self.dim), self._idf())
+
+    def upsert(
+        self,
+        entries: Iterable[Mapping[str, Any]],
+        *,
+        ocr_text: Callable[[Mapping[str, Any]], str | None] | None = None,
+    ) -> int:
+        """Append new entries and overwrite changed ones; returns the number of rows written.
+
+        Document frequencies only grow with new ids, so rows written earlier keep the IDF
+        they were built with until `rebuild` re-weights everything.
+        """
+        pending: list[tuple[str, int, dict[int, float]]] = []
+        for entry in entries:
+            key = entry_key(entry)
+            if not key:
+                continue
+            signature = entry_signature(entry)
+            row = self._rows.get(key)
+            if row is not None and self.signatures[row] == signature:
+                continue
+            text = ocr_text(entry) if ocr_text is not None else None
+            features = _hashed_terms(_tokens(*entry_text(entry, text)), self.dim)
+            pending.append((key, signature, features))
+            if row is None:
+                self.ids.append(key)
+                self.signatures.append(signature)
+                self._rows[key] = len(self.ids) - 1
+                if features:
+                    self.df[list(features)] += 1
+        if not pending:
+            return 0
+        self._reserve(len(self.ids))
+        idf = self._idf()
+        for key, signature, features in pending:
+            row = self._rows[key]
+            self.signatures[row] = signature
+            self._vectors[row] = self._vector(features, idf)
+        return len(pending)
+
+    def rebuild(
+        self,
+        entries: Sequence[Mapping[str, Any]],
+        *,
+        ocr_text: Callable[[Mapping[str, Any]], str | None] | None = None,
+    ) -> int:
+        """Drop every row and re-index `entries` with a fresh IDF."""
+        self.ids, self.signatures, self._rows = [], [], {}
+        self.df = np.zeros(self.dim, dtype=np.float64)
+        return self.upsert(entries, ocr_text=ocr_text)
+
+    # ── queries ────────────────────────────────
+    def top_k(
+        self,
+        queries: np.ndarray,
+        k: int = DEFAULT_TOP_K,
+        *,
+        exclude: Sequence[str | None] | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Cosine top-k for each row of `queries`, scanning the matrix in row chunks."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        count = len(self.ids)
+        if not count or k <= 0:
+            return [[] for _ in range(len(queries))]
+        excluded_rows = [self._rows.get(key) if key else None for key in (exclude or [None] * len(queries))]
+        want = k + 1
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, QUERY_CHUNK_ROWS):
+            block = np.asarray(self._vectors[start : min(start + QUERY_CHUNK_ROWS, count)])
+            scores = queries @ block.T
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            if scores.shape[1] > want:
+                keep = np.argpartition(-scores, want - 1, axis=1)[:, :want]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores, best_rows = scores, rows
+
+        results: list[list[tuple[str, float]]] = []
+        for query_index in range(len(queries)):
+            order = np.argsort(-best_scores[query_index])
+            hits = []
+            for position in order:
+                row = int(best_rows[query_index, position])
+                score = float(best_scores[query_index, position])
+                if row == excluded_rows[query_index] or score <= 0:
+                    continue
+                hits.append((self.ids[row], score))
+                if len(hits) == k:
+                    break
+            results.append(hits)
+        return results
+
+    def similar(self, key: str, k: int = DEFAULT_TOP_K) -> list[tuple[str, float]]:
+        """Nearest neighbours of an indexed entry, excluding itself."""
+        row = self._rows.get(key)
+        if row is None:
+            return []
+        return self.top_k(np.asarray(self._vectors[row]), k, exclude=[key])[0]
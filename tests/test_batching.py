@@ -0,0 +1,80 @@
+"""Batch packing tests for screenshot_enricher.build_batches and TokenBudget."""
+
+from screenshot_enricher import (
+    TokenBudget,
+    build_batches,
+    estimate_item_tokens,
+    prompt_overhead_tokens,
+)
+
+
+def _entries(count: int, ocr_chars: int = 0) -> list[dict]:
+    return [
+        {
+            "filename": f"{idx}.png",
+            "created_at": f"2025-01-01T00:00:{idx:02d}Z",
+            "ocr_text": "x" * ocr_chars,
+        }
+        for idx in range(count)
+    ]
+
+
+def test_fixed_batch_size_without_budget():
+    batches = build_batches(_entries(12), 5)
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+
+
+def test_token_budget_packs_by_ocr_length():
+    entries = _entries(6, ocr_chars=2000)
+    budget = prompt_overhead_tokens() + 2 * estimate_item_tokens(entries[0])
+
+    batches = build_batches(entries, 25, token_budget=budget)
+
+    assert [len(batch) for batch in batches] == [2, 2, 2]
+
+
+def test_oversized_item_still_gets_a_batch():
+    entries = _entries(2, ocr_chars=50_000)
+    batches = build_batches(entries, 25, token_budget=512)
+    assert [len(batch) for batch in batches] == [1, 1]
+
+
+def test_budget_halves_on_missing_results():
+    budget = TokenBudget(4000, minimum=256)
+    budget.record(tokens=4000, expected=10, returned=6, latency=5.0)
+    assert budget.value == 2000
+
+
+def test_budget_grows_while_throughput_holds():
+    budget = TokenBudget(1000, step=100)
+    budget.record(tokens=1000, expected=5, returned=5, latency=5.0)
+    budget.record(tokens=1100, expected=6, returned=6, latency=5.5)
+    assert budget.value == 1200
+
+
+def test_budget_backs_off_on_slow_batch():
+    budget = TokenBudget(1000, max_latency=10.0)
+    budget.record(tokens=1000, expected=5, returned=5, latency=30.0)
+    assert budget.value == 800
+
+
+def test_item_costs_are_estimated_once(monkeypatch):
+    import screenshot_enricher
+
+    entries = _entries(6, ocr_chars=2000)
+    budget = prompt_overhead_tokens() + 2 * estimate_item_tokens(entries[0])
+    calls = []
+    original = screenshot_enricher.estimate_item_tokens
+    monkeypatch.setattr(
+        screenshot_enricher,
+        "estimate_item_tokens",
+        lambda entry, **kwargs: calls.append(entry["filename"]) or original(entry, **kwargs),
+    )
+    costs: dict[str, int] = {}
+
+    first = build_batches(entries, 25, token_budget=budget, item_costs=costs)
+    second = build_batches(entries[2:], 25, token_budget=budget, item_costs=costs)
+
+    assert [len(batch) for batch in first] == [2, 2, 2]
+    assert [len(batch) for batch in second] == [2, 2]
+    assert sorted(calls) == sorted(entry["filename"] for entry in entries)
@@ -0,0 +1,25 @@
+"""Smoke tests for the offline enricher benchmark harness."""
+
+from benchmark_enricher import FakeModel, generate_synthetic_metadata, run_benchmark
+
+
+def test_synthetic_metadata_is_deterministic():
+    first = generate_synthetic_metadata(20, seed=3)
+    second = generate_synthetic_metadata(20, seed=3)
+    assert first == second
+    assert len({entry["filename"] for entry in first}) == 20
+
+
+def test_fake_model_drops_item_on_short_list():
+    model = FakeModel(short_list_rate=1.0)
+    prompt = "prefix\n[\n" + ",\n".join(f'{{"filename":"{idx}.png"}}' for idx in range(3)) + "\n]"
+    results = model(prompt, model="fake", log_dir=None, log_id="x")
+    assert [result["filename"] for result in results] == ["0.png", "1.png"]
+
+
+def test_run_benchmark_reports_throughput():
+    result = run_benchmark(50, FakeModel(low_confidence_rate=0.2), seed=1)
+    assert result["completed"]
+    assert result["handled"] == 50
+    assert result["items_per_sec"] > 0
+    assert result["persist_seconds"] > 0
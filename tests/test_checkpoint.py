@@ -0,0 +1,45 @@
+"""Checkpoint log tests for screenshot_enricher.CheckpointLog."""
+
+import json
+
+from screenshot_enricher import CheckpointLog, save_metadata
+
+
+def _dataset():
+    return [
+        {"filename": "a.png", "processed": 0},
+        {"filename": "b.png", "processed": 0},
+    ]
+
+
+def test_replay_recovers_results_after_crash(tmp_path):
+    json_path = tmp_path / "screenshots.json"
+    save_metadata(json_path, _dataset())
+
+    log = CheckpointLog(json_path)
+    log.append([{"filename": "a.png", "processed": 1, "tags_ai": ["x"]}])
+    log.close()
+    with log.path.open("a", encoding="utf-8") as fh:
+        fh.write('{"filename": "b.png", "proc')  # torn write from a crash
+
+    data = json.loads(json_path.read_text())
+    applied = CheckpointLog(json_path).replay(data)
+
+    assert applied == 1
+    assert data[0]["processed"] == 1
+    assert data[0]["tags_ai"] == ["x"]
+    assert data[1]["processed"] == 0
+
+
+def test_merge_rewrites_json_and_truncates_log(tmp_path):
+    json_path = tmp_path / "screenshots.json"
+    data = _dataset()
+    save_metadata(json_path, data)
+
+    log = CheckpointLog(json_path, fsync_every=3)
+    data[1]["processed"] = 1
+    log.append([data[1]])
+    log.merge(data)
+
+    assert not log.path.exists()
+    assert json.loads(json_path.read_text())[1]["processed"] == 1
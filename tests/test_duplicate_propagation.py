@@ -0,0 +1,68 @@
+"""Duplicate-cluster propagation tests for screenshot_enricher."""
+
+import json
+
+from screenshot_enricher import DuplicateClusters, enrich_batches, save_metadata
+
+
+def _entry(name, minute, **extra):
+    return {"filename": name, "created_at": f"2025-01-01T10:{minute:02d}:00Z", "processed": 0, **extra}
+
+
+def test_only_representatives_are_prompted(tmp_path):
+    data = [
+        _entry("a.png", 0, hash="h1"),
+        _entry("b.png", 1, hash="h1"),
+        _entry("c.png", 2, phash="00000000000000f0"),
+        _entry("d.png", 3, phash="00000000000000f1"),
+        _entry("e.png", 4),
+    ]
+    json_path = tmp_path / "screenshots.json"
+    save_metadata(json_path, data)
+    prompted: list[str] = []
+
+    def fake_model(prompt, **_):
+        items = json.loads(prompt[prompt.rfind("\n[\n") + 1 :])
+        prompted.extend(item["filename"] for item in items)
+        return [
+            {"filename": item["filename"], "tags_ai": [item["filename"]], "summary": "s", "confidence": 0.9}
+            for item in items
+        ]
+
+    duplicates = DuplicateClusters(data)
+    enrich_batches(
+        data=data,
+        json_path=json_path,
+        batch_size=5,
+        model="fake",
+        sleep_seconds=0,
+        interactive=False,
+        log_dir=None,
+        confidence_threshold=0.6,
+        defer_hours=1,
+        auto=True,
+        confirm=False,
+        progress={},
+        call_model=fake_model,
+        duplicates=duplicates,
+    )
+
+    assert sorted(prompted) == ["a.png", "c.png", "e.png"]
+    assert data[1]["tags_ai"] == ["a.png"]
+    assert data[1]["propagated_from"] == "a.png"
+    assert data[3]["status"] == "processed"
+    assert data[3]["propagated_from"] == "c.png"
+    assert "propagated_from" not in data[0]
+
+
+def test_previously_processed_member_becomes_representative():
+    data = [
+        _entry("a.png", 0, hash="h1"),
+        _entry("b.png", 1, hash="h1", status="processed", processed=1, tags_ai=["done"], confidence=0.8),
+    ]
+    duplicates = DuplicateClusters(data, max_distance=None)
+
+    assert duplicates.is_follower(data[0])
+    assert duplicates.propagate_existing() == [data[0]]
+    assert data[0]["tags_ai"] == ["done"]
+    assert data[0]["propagated_from"] == "b.png"
@@ -0,0 +1,72 @@
+"""Perceptual hash and BK-tree tests for image_hashes."""
+
+import random
+
+from PIL import Image, ImageDraw
+
+from image_hashes import (
+    BKTree,
+    add_perceptual_hashes,
+    cluster_near_duplicates,
+    format_hash,
+    hamming,
+)
+
+
+def _window(path, *, offset=0, cursor=False):
+    image = Image.new("RGB", (640, 400), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20 + offset, 20, 300 + offset, 200), fill="navy")
+    draw.rectangle((340, 60, 620, 380), fill="darkorange")
+    if cursor:
+        draw.rectangle((500, 300, 504, 310), fill="black")
+    image.save(path)
+    return {"path": str(path)}
+
+
+def test_near_identical_screenshots_hash_close(tmp_path):
+    entries = [
+        _window(tmp_path / "a.png"),
+        _window(tmp_path / "b.png", cursor=True),
+        {"path": str(tmp_path / "c.png")},
+        {"path": str(tmp_path / "missing.png")},
+    ]
+    noise = Image.effect_noise((640, 400), 80).convert("RGB")
+    noise.save(entries[2]["path"])
+
+    assert add_perceptual_hashes(entries, workers=0) == 3
+    assert "phash" not in entries[3]
+    a, b, c = (int(entry["phash"], 16) for entry in entries[:3])
+    assert hamming(a, b) <= 4
+    assert hamming(a, c) > 12
+
+    clusters = cluster_near_duplicates(entries)
+    assert [[entry["path"] for entry in cluster] for cluster in clusters] == [
+        [entries[0]["path"], entries[1]["path"]]
+    ]
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(7)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    values += [value ^ (1 << rng.randrange(64)) for value in values[:50]]
+    tree = BKTree((value, index) for index, value in enumerate(values))
+
+    assert len(tree) == len(values)
+    for probe in values[:20]:
+        expected = sorted(index for index, value in enumerate(values) if hamming(probe, value) <= 3)
+        assert sorted(key for _, key in tree.query(probe, 3)) == expected
+
+
+def test_clusters_are_transitive_and_skip_unhashed():
+    entries = [
+        {"id": "a", "phash": format_hash(0)},
+        {"id": "b", "phash": format_hash(0b111)},
+        {"id": "c", "phash": format_hash(0b111111)},
+        {"id": "d"},
+        {"id": "e", "phash": format_hash(2**64 - 1)},
+    ]
+
+    clusters = cluster_near_duplicates(entries, max_distance=3)
+
+    assert [[entry["id"] for entry in cluster] for cluster in clusters] == [["a", "b", "c"]]
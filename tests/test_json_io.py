@@ -0,0 +1,26 @@
+"""JSON load/save tests for json_io."""
+
+import json
+
+import json_io
+
+
+def test_save_defaults_to_compact_and_loads_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_io, "PRETTY_DEFAULT", False)
+    path = tmp_path / "screenshots.json"
+    payload = [{"filename": "ä.png", "tags": ["x"], "processed": 1}]
+
+    json_io.save(path, payload)
+
+    assert path.read_bytes() == json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert json_io.load(path) == payload
+
+
+def test_pretty_mode_matches_indented_stdlib_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_io, "PRETTY_DEFAULT", True)
+    path = tmp_path / "screenshots.json"
+    payload = {"categories": ["Work", "Café"]}
+
+    json_io.save(path, payload)
+
+    assert path.read_text(encoding="utf-8") == json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
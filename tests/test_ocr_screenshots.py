@@ -0,0 +1,74 @@
+"""OCR pipeline tests for ocr_screenshots.run_ocr (Tesseract is faked)."""
+
+import ocr_screenshots
+from ocr_store import OCRStore
+
+
+def _fake_ocr(job):
+    file_hash, path, _lang, _max_dimension = job
+    return file_hash, f"text from {path.rsplit('/', 1)[-1]}", 0.9, 0.01, None
+
+
+def _entries(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"same-pixels")
+    (tmp_path / "b.png").write_bytes(b"same-pixels")
+    (tmp_path / "c.png").write_bytes(b"other-pixels")
+    return [{"path": str(tmp_path / name)} for name in ("a.png", "b.png", "c.png")]
+
+
+def test_run_ocr_reads_each_hash_once(tmp_path):
+    entries = _entries(tmp_path)
+
+    stats = ocr_screenshots.run_ocr(entries, workers=0, ocr_worker=_fake_ocr)
+
+    assert stats["ocr"] == 2
+    assert stats["copied"] == 3
+    assert entries[0]["ocr_text"] == entries[1]["ocr_text"] == "text from a.png"
+    assert entries[2]["ocr_text"] == "text from c.png"
+    assert entries[0]["ocr_hash"] == entries[1]["ocr_hash"]
+
+
+def test_run_ocr_skips_already_processed_hashes(tmp_path):
+    entries = _entries(tmp_path)
+    ocr_screenshots.run_ocr(entries, workers=0, ocr_worker=_fake_ocr)
+    entries.append({"path": str(tmp_path / "a.png")})
+
+    stats = ocr_screenshots.run_ocr(entries, workers=0, ocr_worker=_fake_ocr)
+
+    assert stats["ocr"] == 0
+    assert stats["skipped"] == 3
+    assert entries[3]["ocr_text"] == "text from a.png"
+
+
+def test_run_ocr_with_store_keeps_text_out_of_entries(tmp_path):
+    entries = _entries(tmp_path)
+    with OCRStore(tmp_path / "ocr.sqlite3") as store:
+        stats = ocr_screenshots.run_ocr(entries, store=store, inline=False, workers=0, ocr_worker=_fake_ocr)
+        record = store.get(entries[2]["hash"])
+
+        assert stats["ocr"] == 2
+        assert len(store) == 2
+        assert "ocr_text" not in entries[0]
+        assert entries[0]["ocr_hash"] == entries[0]["hash"]
+        assert record.text == "text from c.png"
+        assert record.confidence == 0.9
+
+        rerun = [{"path": entry["path"]} for entry in entries]
+        stats = ocr_screenshots.run_ocr(rerun, store=store, inline=True, workers=0, ocr_worker=_fake_ocr)
+
+    assert stats["ocr"] == 0
+    assert rerun[1]["ocr_text"] == "text from a.png"
+
+
+def test_readonly_helpers_read_what_the_store_wrote(tmp_path):
+    from ocr_store import OCRRecord, connect_readonly, read_texts
+
+    path = tmp_path / "ocr.sqlite3"
+    with OCRStore(path) as store:
+        store.put_many([OCRRecord("h1", "Café ✅"), OCRRecord("h2", "second")])
+
+    conn = connect_readonly(path)
+    try:
+        assert read_texts(conn, ["h1", "missing", "h1"]) == {"h1": "Café ✅"}
+    finally:
+        conn.close()
@@ -0,0 +1,67 @@
+"""Prompt compaction tests for screenshot_enricher."""
+
+from screenshot_enricher import (
+    PROMPT_PREFIX,
+    build_legacy_prompt,
+    build_prompt,
+    build_retry_prompt,
+    estimate_tokens,
+    normalize_ocr_text,
+    prompt_token_report,
+)
+
+
+def test_normalize_collapses_whitespace_and_dedupes_lines():
+    text = "  File   Edit  View \n\nFile Edit View\nmain.py\n  main.py  \n"
+    assert normalize_ocr_text(text) == "File Edit View\nmain.py"
+
+
+def test_normalize_keeps_head_and_tail_when_truncating():
+    text = "A" * 600 + "\n" + "Z" * 600
+    result = normalize_ocr_text(text, max_chars=303)
+    assert len(result) == 303
+    assert result.startswith("A" * 200)
+    assert result.endswith("Z" * 100)
+    assert " … " in result
+
+
+def test_prompt_shares_static_prefix_between_batches():
+    first = build_prompt([{"filename": "a.png", "ocr_text": "one"}])
+    second = build_prompt([{"filename": "b.png"}, {"filename": "c.png"}])
+    assert first.startswith(PROMPT_PREFIX)
+    assert second.startswith(PROMPT_PREFIX)
+    assert '{"filename":"b.png"}' in second
+
+
+def test_retry_prompt_omits_non_prompt_fields():
+    item = {"filename": "a.png", "llama_result": {"tags_ai": ["x"]}, "ocr_text": "hi  there"}
+    prompt = build_retry_prompt(item, {"confidence": 0.2, "tags_ai": ["x"]})
+    assert "llama_result" not in prompt
+    assert '"ocr_text":"hi there"' in prompt
+
+
+def test_token_report_shows_savings():
+    entries = [{"filename": f"{idx}.png", "ocr_text": "line\n" * 200} for idx in range(10)]
+    report = prompt_token_report(entries)
+    assert report["items"] == 10
+    assert report["after"] < report["before"]
+
+
+def test_legacy_prompt_keeps_the_pre_compaction_layout():
+    prompt = build_legacy_prompt([{"filename": "a.png", "ocr_text": "hi  there"}])
+    assert prompt.startswith("You are a tagging assistant.\n\nAnalyze each screenshot object below")
+    assert '    "ocr_text": "hi  there"\n' in prompt
+    assert prompt.endswith('    "ask_user": false\n  },\n  ...\n]')
+
+
+def test_token_report_builds_both_layouts_and_counts_stored_ocr():
+    entries = [{"filename": f"{idx}.png", "hash": f"h{idx}"} for idx in range(4)]
+    ocr_texts = {f"h{idx}": "stored text\n" * 50 for idx in range(4)}
+
+    report = prompt_token_report(entries, batch_size=2, ocr_texts=ocr_texts)
+
+    legacy = sum(estimate_tokens(build_legacy_prompt(entries[i : i + 2], ocr_texts=ocr_texts)) for i in (0, 2))
+    compact = sum(estimate_tokens(build_prompt(entries[i : i + 2], ocr_texts=ocr_texts)) for i in (0, 2))
+    assert report["before"] == legacy / 4
+    assert report["after"] == compact / 4
+    assert report["before"] > prompt_token_report(entries, batch_size=2)["before"] + 100
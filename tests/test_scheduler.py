@@ -0,0 +1,52 @@
+"""Deferred scheduling tests for screenshot_enricher.DeferredScheduler."""
+
+from datetime import UTC, datetime, timedelta
+
+from screenshot_enricher import DeferredScheduler, isoformat_utc
+
+NOW = datetime(2025, 10, 4, 12, 0, tzinfo=UTC)
+
+
+def _deferred(name: str, minutes: int) -> dict:
+    return {
+        "filename": name,
+        "processed": 0,
+        "status": "deferred",
+        "defer_until": isoformat_utc(NOW + timedelta(minutes=minutes)),
+    }
+
+
+def test_ready_and_deferred_split():
+    data = [
+        {"filename": "done.png", "processed": 1},
+        {"filename": "unmarked.png"},  # no processed field: skipped, as before the scheduler
+        {"filename": "new.png", "processed": 0},
+        _deferred("past.png", -5),
+        _deferred("later.png", 30),
+    ]
+    scheduler = DeferredScheduler(data, reference=NOW)
+
+    ready = scheduler.pop_ready(reference=NOW)
+
+    assert [entry["filename"] for entry in ready] == ["new.png", "past.png"]
+    assert len(scheduler) == 1
+    assert scheduler.seconds_until_next(reference=NOW) == 30 * 60
+
+
+def test_heap_releases_in_defer_order():
+    data = [_deferred("c.png", 30), _deferred("a.png", 10), _deferred("b.png", 20)]
+    scheduler = DeferredScheduler(data, reference=NOW)
+
+    assert scheduler.pop_ready(reference=NOW) == []
+    released = scheduler.pop_ready(reference=NOW + timedelta(minutes=25))
+    assert [entry["filename"] for entry in released] == ["a.png", "b.png"]
+    assert scheduler.seconds_until_next(reference=NOW + timedelta(minutes=25)) == 5 * 60
+
+
+def test_pushed_back_entry_is_requeued():
+    entry = _deferred("a.png", 10)
+    scheduler = DeferredScheduler([entry], reference=NOW)
+    entry["defer_until"] = isoformat_utc(NOW + timedelta(minutes=60))
+
+    assert scheduler.pop_ready(reference=NOW + timedelta(minutes=15)) == []
+    assert scheduler.seconds_until_next(reference=NOW + timedelta(minutes=15)) == 45 * 60
@@ -0,0 +1,85 @@
+"""Hashed TF-IDF similarity index tests."""
+
+import numpy as np
+
+from similarity_index import SimilarityIndex
+
+
+def _entries():
+    return [
+        {"id": "a", "tags": ["python"], "summary": "traceback in terminal", "ocr_text": "ImportError numpy"},
+        {"id": "b", "tags": ["python"], "summary": "terminal traceback", "ocr_text": "ModuleNotFoundError numpy"},
+        {"id": "c", "tags": ["gaming"], "summary": "skyrim inventory", "ocr_text": "dragon shout level"},
+        {"id": "d", "tags": ["finance"], "summary": "revenue dashboard", "ocr_text": "quarterly chart"},
+    ]
+
+
+def test_similar_ranks_related_text_first(tmp_path):
+    index = SimilarityIndex(tmp_path / "idx", dim=256)
+    assert index.upsert(_entries()) == 4
+
+    hits = index.similar("a", k=2)
+
+    assert hits[0][0] == "b"
+    assert all(key != "a" for key, _ in hits)
+    assert 0 < hits[0][1] <= 1.0001
+
+
+def test_persists_and_appends_incrementally(tmp_path):
+    directory = tmp_path / "idx"
+    index = SimilarityIndex(directory, dim=256)
+    index.upsert(_entries()[:2])
+    index.save()
+
+    reopened = SimilarityIndex(directory, dim=256)
+    assert len(reopened) == 2
+    assert reopened.upsert(_entries()) == 2  # a and b are unchanged
+    changed = dict(_entries()[2], summary="python traceback terminal")
+    assert reopened.upsert([changed]) == 1
+    assert reopened.similar("c", k=1)[0][0] in {"a", "b"}
+
+
+def test_top_k_batches_queries_across_chunks(monkeypatch):
+    import similarity_index
+
+    monkeypatch.setattr(similarity_index, "QUERY_CHUNK_ROWS", 3)
+    entries = [{"id": f"e{i}", "summary": f"word{i} shared"} for i in range(10)]
+    index = SimilarityIndex(dim=128)
+    index.upsert(entries)
+
+    queries = np.stack([index.vectorize({"summary": "word7 shared"}), index.vectorize({"summary": "word2 shared"})])
+    results = index.top_k(queries, k=3)
+
+    assert [hits[0][0] for hits in results] == ["e7", "e2"]
+    assert all(len(hits) == 3 for hits in results)
+
+
+def test_text_neighbors_resolve_hits_through_time_index(tmp_path):
+    from screenshot_enricher import TimeIndex, text_neighbors
+
+    data = _entries()
+    index = SimilarityIndex(tmp_path / "idx", dim=256)
+    index.upsert(data)
+
+    neighbors = text_neighbors(data[0], data, index, k=1, index=TimeIndex(data))
+
+    assert neighbors == [data[1]]
+
+
+def test_reload_picks_up_rows_saved_by_another_writer(tmp_path):
+    directory = tmp_path / "idx"
+    first = SimilarityIndex(directory, dim=256)
+    second = SimilarityIndex(directory, dim=256)
+    entries = _entries()
+
+    first.upsert(entries[:2])
+    first.save()
+    assert not first.reload()
+    assert second.reload()
+    second.upsert(entries[2:])
+    second.save()
+    assert first.reload()
+
+    assert first.ids == ["a", "b", "c", "d"]
+    assert first.similar("c", k=1) == second.similar("c", k=1)
+    assert first.similar("a", k=1)[0][0] == "b"
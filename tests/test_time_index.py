@@ -0,0 +1,49 @@
+"""Neighbour lookup tests for screenshot_enricher.TimeIndex."""
+
+from screenshot_enricher import TimeIndex, find_similar_entries
+
+
+def _entry(name: str, minute: int, tags=None) -> dict:
+    return {"filename": name, "created_at": f"2025-01-01T10:{minute:02d}:00Z", "tags_ai": tags or []}
+
+
+def test_neighbors_within_window():
+    data = [_entry("a", 0), _entry("b", 4, ["x"]), _entry("c", 6, ["y"]), _entry("d", 12)]
+    index = TimeIndex(data)
+
+    names = [entry["filename"] for entry in index.neighbors(data[1], window_minutes=5)]
+
+    assert names == ["a", "c"]
+    assert find_similar_entries(data[1], data) == index.neighbors(data[1])
+
+
+def test_naive_timestamps_and_unparseable_entries():
+    data = [
+        {"filename": "naive", "created_at": "2025-01-01T10:01:00"},
+        {"filename": "bad", "created_at": "not a date"},
+        _entry("target", 0),
+    ]
+    names = [entry["filename"] for entry in TimeIndex(data).neighbors(data[2])]
+    assert names == ["naive"]
+
+
+def test_update_refreshes_tags_and_position():
+    data = [_entry("a", 0, ["old"]), _entry("b", 30)]
+    index = TimeIndex(data)
+
+    data[0]["tags_ai"] = ["new", "tag"]
+    data[0]["created_at"] = "2025-01-01T10:29:00Z"
+    index.update(data[0])
+
+    neighbors = index.neighbors(data[1])
+    assert [entry["filename"] for entry in neighbors] == ["a"]
+    assert index.tags_for(neighbors) == ["new", "tag"]
+
+
+def test_get_looks_up_by_id_then_filename():
+    data = [{"id": "x1", "filename": "a"}, _entry("b", 0)]
+    index = TimeIndex(data)
+
+    assert index.get("x1") is data[0]
+    assert index.get("b") is data[1]
+    assert index.get("missing") is None